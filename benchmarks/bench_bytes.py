@@ -0,0 +1,86 @@
+"""
+Bytes pipeline benchmark.
+
+Parses a generated fixed width report, mostly filler and blank lines, from a
+file, decoding every line to str, and as bytes decoding only the flight columns.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_bytes.py --pages 2000
+"""
+import argparse
+import re
+import tempfile
+import timeit
+from pathlib import Path
+
+from pfmsoft.text_chunk_parser import (
+    ChunkIterator,
+    Parser,
+    ParseResultHandler,
+    ParseSchema,
+    SkipChunk,
+)
+from pfmsoft.text_chunk_parser.fixed_width import Column, FixedWidthChunkParser
+from pfmsoft.text_chunk_parser.sources import open_lines
+
+ROW = "1  1/1 64 2019  DFW 0921/0921  L SFO 1112/1312   3.51          0.50\n"
+FILLER = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit. Ut vel lacinia sem,\n"
+    "\n"
+) * 25
+COLUMNS = [
+    Column("dp", 0, 3, int),
+    Column("flight", 10, 16),
+    Column("departure_station", 16, 20),
+    Column("arrival_station", 33, 37),
+    Column("block", 48, 55, float),
+]
+
+
+class FlightSchema(ParseSchema):
+    def __init__(self, encoding=None):
+        pattern = r"^\d+\s"
+        self.parsers = [
+            FixedWidthChunkParser(
+                COLUMNS,
+                "flight",
+                re.compile(pattern if encoding is None else pattern.encode()),
+                encoding,
+            ),
+            SkipChunk(),
+        ]
+
+    def expected(self, state):
+        return self.parsers
+
+
+class CountingHandler(ParseResultHandler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.count = 0
+
+    def parsed_data(self, parse_result):
+        self.count += 1
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--pages", type=int, default=2000)
+    args = arg_parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "report.txt"
+        path.write_text((FILLER + ROW * 5) * args.pages, encoding="latin-1")
+
+        def run(encoding):
+            parser = Parser(FlightSchema(encoding), retain="none")
+            lines = open_lines(path, encoding="latin-1" if encoding is None else None)
+            parser.parse(CountingHandler(), ChunkIterator(lines))
+
+        print(f"best of 3, {args.pages} pages")
+        for label, encoding in {"str lines": None, "bytes lines": "latin-1"}.items():
+            best = min(timeit.repeat(lambda: run(encoding), number=1, repeat=3))
+            print(f"{label:<28}{best * 1000:>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
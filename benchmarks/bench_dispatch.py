@@ -0,0 +1,82 @@
+"""
+Dispatch benchmark.
+
+Parses a generated report with a compiled schema where most states have one
+candidate parser, or end in a catch all, with the generic attempt loop and with
+the specialized dispatch.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_dispatch.py --pages 2000
+"""
+import argparse
+import timeit
+
+from pfmsoft.text_chunk_parser import (
+    ChunkIterator,
+    Parser,
+    ParseResultHandler,
+    compile_schema,
+)
+
+PAGE = (
+    "PAGE 1\n"
+    "TITLE Flight summary\n"
+    + "ROW 1 DFW SFO 3.51\n" * 20
+    + "END\n"
+    + "Lorem ipsum dolor sit amet, consectetur adipiscing elit.\n" * 5
+)
+DEFINITION = {
+    "parsers": {
+        "page": {"regex": r"^PAGE (?P<page>\d+)", "new_state": "page"},
+        "title": {"regex": r"^TITLE (?P<title>.*)\n", "new_state": "title"},
+        "row": {"regex": r"^ROW (?P<row>\d+) (?P<route>.*)\n", "new_state": "row"},
+        "end": {"regex": r"^END", "new_state": "origin"},
+        "skip": {},
+    },
+    "states": {
+        "origin": ["page", "skip"],
+        "page": ["title"],
+        "title": ["row"],
+        "row": ["row", "end"],
+    },
+}
+
+
+class GenericParser(Parser):
+    """Always uses the generic attempt loop."""
+
+    def _dispatcher(self, parsers):
+        return self._attempt_parse
+
+
+class CountingHandler(ParseResultHandler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.count = 0
+
+    def parsed_data(self, parse_result):
+        self.count += 1
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--pages", type=int, default=2000)
+    args = arg_parser.parse_args()
+    lines = (PAGE * args.pages).splitlines(keepends=True)
+    schema = compile_schema(DEFINITION)
+
+    def run(parser_class):
+        parser = parser_class(schema, retain="none")
+        parser.parse(CountingHandler(), ChunkIterator(lines, chunk_filter=None))
+
+    print(f"best of 5, {args.pages} pages, {len(lines)} lines")
+    for label, parser_class in {
+        "generic loop": GenericParser,
+        "specialized dispatch": Parser,
+    }.items():
+        best = min(timeit.repeat(lambda: run(parser_class), number=1, repeat=5))
+        print(f"{label:<28}{best * 1000:>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
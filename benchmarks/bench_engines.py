@@ -0,0 +1,110 @@
+"""
+Pattern engine benchmark.
+
+Parses a generated report, and a JSON like key value file, with a compiled
+schema using each available pattern engine, then times one line that makes a
+nested repeat backtrack.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_engines.py --pages 1000
+"""
+import argparse
+import timeit
+
+from pfmsoft.text_chunk_parser import (
+    ChunkIterator,
+    Parser,
+    ParseResultHandler,
+    compile_pattern,
+    compile_schema,
+)
+from pfmsoft.text_chunk_parser.pattern_engines import ENGINES
+
+REPORT_PAGE = (
+    "PAGE 1\n"
+    "TITLE Flight summary\n"
+    + "ROW 1 DFW SFO 3.51\n" * 20
+    + "END\n"
+    + "Lorem ipsum dolor sit amet, consectetur adipiscing elit.\n" * 5
+)
+REPORT = {
+    "parsers": {
+        "page": {"regex": r"^PAGE (?P<page>\d+)", "new_state": "page"},
+        "title": {"regex": r"^TITLE (?P<title>.*)\n", "new_state": "title"},
+        "row": {
+            "regex": r"^ROW (?P<row>\d+) (?P<origin>[A-Z]{3}) (?P<to>[A-Z]{3}) "
+            r"(?P<hours>\d+\.\d+)\n$",
+            "new_state": "row",
+        },
+        "end": {"regex": r"^END\n$", "new_state": "origin"},
+        "skip": {},
+    },
+    "states": {
+        "origin": ["page", "skip"],
+        "page": ["title"],
+        "title": ["row"],
+        "row": ["row", "end"],
+    },
+}
+KEY_VALUE_PAGE = "{\n" + '    "key number": "value 1.5",\n' * 30 + "}\n"
+KEY_VALUE = {
+    "parsers": {
+        "start": {"regex": r"^{\n$", "new_state": "start"},
+        "key_value": {
+            "regex": r'^\s*"(?P<key>[\w\s]+)":\s*"(?P<value>[\w\s.]+)",\n$',
+            "new_state": "key_value",
+        },
+        "end": {"regex": r"^}\n$", "new_state": "origin"},
+    },
+    "states": {
+        "origin": ["start"],
+        "start": ["key_value", "end"],
+        "key_value": ["key_value", "end"],
+    },
+}
+NESTED_REPEAT = r"^\s*(\w+\s?)*:\n$"
+
+
+class CountingHandler(ParseResultHandler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.count = 0
+
+    def parsed_data(self, parse_result):
+        self.count += 1
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--pages", type=int, default=1000)
+    arg_parser.add_argument("--word-length", type=int, default=20)
+    args = arg_parser.parse_args()
+    engines = [name for name, engine in ENGINES.items() if engine.available()]
+    formats = {
+        "report": (REPORT, (REPORT_PAGE * args.pages).splitlines(keepends=True)),
+        "key value": (
+            KEY_VALUE,
+            (KEY_VALUE_PAGE * args.pages).splitlines(keepends=True),
+        ),
+    }
+    print(f"best of 5, {args.pages} pages, engines {engines}")
+    for format_name, (definition, lines) in formats.items():
+        for engine in engines:
+            schema = compile_schema(definition, engine=engine)
+
+            def run(schema=schema, lines=lines):
+                parser = Parser(schema, retain="none")
+                parser.parse(CountingHandler(), ChunkIterator(lines, chunk_filter=None))
+
+            best = min(timeit.repeat(run, number=1, repeat=5))
+            print(f"{format_name + ', ' + engine:<28}{best * 1000:>10.2f} ms")
+    line = "a" * args.word_length + "\n"
+    print(f"nested repeat, one {len(line)} character line that does not match")
+    for engine in engines:
+        pattern, _ = compile_pattern(NESTED_REPEAT, engine)
+        best = min(timeit.repeat(lambda: pattern.match(line), number=1, repeat=3))
+        print(f"{engine:<28}{best * 1000:>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
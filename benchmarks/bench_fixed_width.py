@@ -0,0 +1,59 @@
+"""
+Fixed width extraction benchmark.
+
+Compares a named group regex against FixedWidthChunkParser for a flight line
+from a fixed width report.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_fixed_width.py --lines 100000
+"""
+import argparse
+import re
+import timeit
+
+from pfmsoft.text_chunk_parser.fixed_width import Column, FixedWidthChunkParser
+
+ROW = (
+    "1  1/1 64 2019  DFW 0921/0921  L SFO 1112/1312   3.51          0.50"
+    "                    −− −− 11 −− −− −− −−\n"
+)
+REGEX = re.compile(
+    r"^(?P<dp>\d+)\s+(?P<da>\d+/\d+)\s+(?P<eq>\w+)\s+(?P<flight>\d+)\s+"
+    r"(?P<departure_station>[A-Z]{3})\s+(?P<departure_time>\d{4}/\d{4})\s+"
+    r"(?P<meal>\w)?\s*(?P<arrival_station>[A-Z]{3})\s+"
+    r"(?P<arrival_time>\d{4}/\d{4})\s+(?P<block>\d+\.\d+)"
+)
+COLUMNS = [
+    Column("dp", 0, 3),
+    Column("da", 3, 7),
+    Column("eq", 7, 10),
+    Column("flight", 10, 16),
+    Column("departure_station", 16, 20),
+    Column("departure_time", 20, 30),
+    Column("meal", 30, 33),
+    Column("arrival_station", 33, 37),
+    Column("arrival_time", 37, 48),
+    Column("block", 48, 55),
+]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--lines", type=int, default=100000)
+    args = arg_parser.parse_args()
+    lines = [ROW] * args.lines
+    parser = FixedWidthChunkParser(COLUMNS, "flight")
+    assert REGEX.match(ROW).groupdict() == parser.extract(ROW)  # type: ignore
+    timings = {
+        "regex groupdict": lambda: [REGEX.match(line).groupdict() for line in lines],  # type: ignore
+        "fixed width extract": lambda: [parser.extract(line) for line in lines],
+        "fixed width extract_block": lambda: parser.extract_block(lines),
+    }
+    print(f"best of 5, {args.lines} lines")
+    for label, func in timings.items():
+        best = min(timeit.repeat(func, number=1, repeat=5))
+        print(f"{label:<28}{best * 1000:>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Import time benchmark.
+
+Each measurement starts a fresh interpreter, so nothing is cached in sys.modules.
+The baseline is an interpreter that imports nothing, and is subtracted from the
+other timings to give the cost of the import alone.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_import.py --runs 20
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+STATEMENTS = {
+    "baseline": "pass",
+    "package": "import pfmsoft.text_chunk_parser",
+    "package + Parser": "from pfmsoft.text_chunk_parser import Parser",
+    "chunk_parser module": "import pfmsoft.text_chunk_parser.chunk_parser",
+}
+
+
+def time_statement(statement: str, runs: int) -> list[float]:
+    """Time `runs` fresh interpreters executing statement, in seconds."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(sys.path)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True, env=env)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--runs", type=int, default=20)
+    args = arg_parser.parse_args()
+    results = {
+        label: statistics.median(time_statement(statement, args.runs))
+        for label, statement in STATEMENTS.items()
+    }
+    baseline = results["baseline"]
+    print(f"median of {args.runs} runs, interpreter start up subtracted")
+    for label, value in results.items():
+        print(f"{label:<24}{(value - baseline) * 1000:>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
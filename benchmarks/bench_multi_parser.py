@@ -0,0 +1,100 @@
+"""
+Multi schema benchmark.
+
+Parses a generated report with a summary schema and a detail schema, once with a
+separate read and chunk pass for each, and once with a MultiParser sharing one
+chunk stream.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_multi_parser.py --pages 2000
+"""
+import argparse
+import re
+import tempfile
+import timeit
+from pathlib import Path
+
+from pfmsoft.text_chunk_parser import (
+    ChunkIterator,
+    MultiParser,
+    Parser,
+    ParseResultHandler,
+    ParseSchema,
+    SkipChunk,
+)
+from pfmsoft.text_chunk_parser.fixed_width import Column, FixedWidthChunkParser
+from pfmsoft.text_chunk_parser.sources import open_lines
+
+HEADER = "REPORT PAGE  SUMMARY OF FLIGHTS FOR THE MONTH OF JANUARY\n"
+ROW = "1  1/1 64 2019  DFW 0921/0921  L SFO 1112/1312   3.51          0.50\n"
+FILLER = "Lorem ipsum dolor sit amet, consectetur adipiscing elit.\n\n" * 10
+
+
+class SummarySchema(ParseSchema):
+    def __init__(self):
+        self.parsers = [
+            FixedWidthChunkParser(
+                [Column("title", 13, 56)], "page", re.compile(r"^REPORT PAGE")
+            ),
+            SkipChunk(),
+        ]
+
+    def expected(self, state):
+        return self.parsers
+
+
+class DetailSchema(ParseSchema):
+    def __init__(self):
+        self.parsers = [
+            FixedWidthChunkParser(
+                [Column("flight", 10, 16), Column("block", 48, 55, float)],
+                "flight",
+                re.compile(r"^\d+\s"),
+            ),
+            SkipChunk(),
+        ]
+
+    def expected(self, state):
+        return self.parsers
+
+
+class CountingHandler(ParseResultHandler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.count = 0
+
+    def parsed_data(self, parse_result):
+        self.count += 1
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--pages", type=int, default=2000)
+    args = arg_parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "report.txt"
+        path.write_text((HEADER + FILLER + ROW * 10) * args.pages)
+
+        def separate():
+            for schema in (SummarySchema(), DetailSchema()):
+                parser = Parser(schema, retain="none")
+                parser.parse(CountingHandler(), ChunkIterator(open_lines(path)))
+
+        def merged():
+            multi = MultiParser(
+                [
+                    Parser(SummarySchema(), retain="none"),
+                    Parser(DetailSchema(), retain="none"),
+                ]
+            )
+            handlers = [CountingHandler(), CountingHandler()]
+            multi.parse(handlers, ChunkIterator(open_lines(path)))
+
+        print(f"best of 3, {args.pages} pages, 2 schemas")
+        for label, run in {"separate passes": separate, "MultiParser": merged}.items():
+            best = min(timeit.repeat(run, number=1, repeat=3))
+            print(f"{label:<28}{best * 1000:>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
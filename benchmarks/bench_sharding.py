@@ -0,0 +1,151 @@
+"""
+Sharded parsing benchmark.
+
+Parses a generated file of repeated json dicts sequentially, and in shards across
+a process pool, passing the results back by pickle and through shared memory.
+
+The pre-scan runs serially before any shard. Without a pre-scan schema it is a
+full parse with the parser schema, so the pre-scans are timed on their own, and
+the shards with both the full schema and a light schema that only decides the
+next state.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_sharding.py --dicts 20000 --shards 4
+"""
+import argparse
+import tempfile
+import timeit
+from pathlib import Path
+
+from pfmsoft.text_chunk_parser import (
+    ChunkIterator,
+    Parser,
+    ParseResultHandler,
+    compile_schema,
+)
+from pfmsoft.text_chunk_parser.sharding import (
+    parse_sharded,
+    prescan_states,
+    split_shards,
+)
+from pfmsoft.text_chunk_parser.sources import open_lines
+
+JSON_DICT = """
+foo = {
+    "Name": "B. S. Johnson",
+    "Profession": "Engineer",
+    "Location": "Unknown",
+    "Notable Creations": [
+        "Archchancellor's Bathroom",
+        "Colossus of Ankh-Morpork",
+        "Hanging Gardens of Ankh",
+        "Quirm Memorial",
+    ],
+}
+"""
+SCHEMA = {
+    "parsers": {
+        "empty_line": {"regex": r"^[^\S\n]*\n$", "new_state": "empty_line"},
+        "identifier": {
+            "regex": r"^(?P<identifier>\w+)\s+=\s+\{\n$",
+            "new_state": "identifier",
+        },
+        "key_value": {
+            "regex": r'^\s*"(?P<key>[\w\s]+)"\:\s*"(?P<value>[\w\s.]+)",\n$',
+            "new_state": "key_value",
+        },
+        "key_list": {
+            "regex": r'^\s*"(?P<key>[\w\s]+)"\:\s*\[\n$',
+            "new_state": "key_list",
+        },
+        "list_value": {
+            "regex": r'^\s*"(?P<value>[\w\s\'`\-]+)",\n$',
+            "new_state": "list_value",
+        },
+        "list_end": {"regex": r"^\s*\],\n$", "new_state": "list_end"},
+        "dict_end": {"regex": r"^}\n$", "new_state": "dict_end"},
+    },
+    "states": {
+        "origin": ["empty_line", "identifier"],
+        "empty_line": ["identifier", "empty_line"],
+        "identifier": ["key_value"],
+        "key_value": ["key_value", "key_list"],
+        "key_list": ["list_value", "list_end"],
+        "list_value": ["list_value", "list_end"],
+        "list_end": ["dict_end"],
+        "dict_end": ["empty_line"],
+    },
+}
+# The same state transitions, without field extraction or full line matches.
+PRESCAN_SCHEMA = {
+    "parsers": {
+        "empty_line": {"regex": r"^[^\S\n]*\n$", "new_state": "empty_line"},
+        "identifier": {"regex": r"^\w", "new_state": "identifier"},
+        "key_value": {"regex": r'^\s*"[^"]+":\s*"', "new_state": "key_value"},
+        "key_list": {"regex": r'^\s*"[^"]+":\s*\[', "new_state": "key_list"},
+        "list_value": {"regex": r'^\s*"', "new_state": "list_value"},
+        "list_end": {"prefix": "    ]", "regex": r"^\s*\]", "new_state": "list_end"},
+        "dict_end": {"prefix": "}", "regex": r"^}", "new_state": "dict_end"},
+    },
+    "states": SCHEMA["states"],
+}
+# The schema parses the blank lines between dicts.
+CHUNK_OPTIONS = {"chunk_filter": None}
+
+
+class CountingHandler(ParseResultHandler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.count = 0
+
+    def parsed_data(self, parse_result):
+        self.count += 1
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--dicts", type=int, default=20000)
+    arg_parser.add_argument("--shards", type=int, default=4)
+    args = arg_parser.parse_args()
+    parser = Parser(compile_schema(SCHEMA))
+    prescan_schema = compile_schema(PRESCAN_SCHEMA)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "json_dicts.txt"
+        path.write_text(JSON_DICT * args.dicts)
+
+        def sequential():
+            chunks = ChunkIterator(open_lines(path), **CHUNK_OPTIONS)
+            parser.parse(CountingHandler(), chunks)
+
+        def prescan(schema):
+            shards = split_shards(path, args.shards)
+            prescan_states(path, shards, schema, chunk_options=CHUNK_OPTIONS)
+
+        def sharded(transport, schema=None):
+            parse_sharded(
+                path,
+                parser,
+                CountingHandler(),
+                shards=args.shards,
+                prescan_schema=schema,
+                chunk_options=CHUNK_OPTIONS,
+                transport=transport,
+            )
+
+        benchmarks = {
+            "sequential": sequential,
+            "pre-scan, full schema": lambda: prescan(parser.schema),
+            "pre-scan, light schema": lambda: prescan(prescan_schema),
+            "sharded, pickle": lambda: sharded("pickle"),
+            "sharded, shared memory": lambda: sharded("shared_memory"),
+            "sharded, pickle, light": lambda: sharded("pickle", prescan_schema),
+            "sharded, shm, light": lambda: sharded("shared_memory", prescan_schema),
+        }
+        print(f"best of 3, {args.dicts} dicts, {args.shards} shards")
+        for label, func in benchmarks.items():
+            best = min(timeit.repeat(func, number=1, repeat=3))
+            print(f"{label:<28}{best * 1000:>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
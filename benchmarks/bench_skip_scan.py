@@ -0,0 +1,43 @@
+"""
+Skip scan benchmark.
+
+Parses a generated document that is mostly filler, with a few data regions,
+reading every line through ChunkIterator and skip scanning for the anchors.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_skip_scan.py --pages 2000
+"""
+import argparse
+import timeit
+from io import StringIO
+
+from pfmsoft.text_chunk_parser import ChunkIterator
+from pfmsoft.text_chunk_parser.skip_scan import SkipScanner
+
+FILLER = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit. Ut vel lacinia sem,\n"
+) * 60
+DATA = "Some Useful Data\nName: B. S. Johnson\nProfession: Engineer\n"
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--pages", type=int, default=2000)
+    args = arg_parser.parse_args()
+    text = (FILLER + DATA) * args.pages
+    scanner = SkipScanner(["Some Useful Data"], after=2)
+
+    def every_line():
+        return sum(1 for _ in ChunkIterator(StringIO(text)))
+
+    def skip_scan():
+        return sum(1 for _ in ChunkIterator(scanner.scan([text]), enumerated=True))
+
+    print(f"best of 3, {args.pages} pages, {text.count(chr(10))} lines")
+    for label, func in {"every line": every_line, "skip scan": skip_scan}.items():
+        best = min(timeit.repeat(func, number=1, repeat=3))
+        print(f"{label:<28}{best * 1000:>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Compressed source benchmark.
+
+Parses a generated gzip file with ChunkIterator, reading on the parse thread,
+with decompressed blocks read ahead on a background thread, and with reading,
+numbering and filtering all done on a background thread.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_sources.py --lines 200000
+"""
+import argparse
+import gzip
+import tempfile
+import time
+from pathlib import Path
+
+from pfmsoft.text_chunk_parser import ChunkIterator
+from pfmsoft.text_chunk_parser.sources import open_lines
+
+ROW = (
+    "1  1/1 64 2019  DFW 0921/0921  L SFO 1112/1312   3.51          0.50"
+    "                    -- -- 11 -- -- -- --\n"
+)
+
+
+def time_parse(file_path: Path, block_read_ahead: int, line_read_ahead: int) -> float:
+    start = time.perf_counter()
+    lines = open_lines(file_path, read_ahead=block_read_ahead)
+    with ChunkIterator(lines, read_ahead=line_read_ahead) as chunks:
+        for chunk in chunks:
+            chunk.text.split()
+    return time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--lines", type=int, default=200000)
+    args = arg_parser.parse_args()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = Path(temp_dir) / "flight.gz"
+        file_path.write_bytes(gzip.compress((ROW * args.lines).encode()))
+        print(f"best of 3, {args.lines} lines")
+        modes = {
+            "synchronous": (0, 0),
+            "block read ahead": (4, 0),
+            "line pipeline": (0, 4),
+        }
+        for label, (block_read_ahead, line_read_ahead) in modes.items():
+            best = min(
+                time_parse(file_path, block_read_ahead, line_read_ahead)
+                for _ in range(3)
+            )
+            print(f"{label:<28}{best * 1000:>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Shared token cache benchmark.
+
+Parses indented keyword records in a state with many candidate parsers, each
+checking the first token of the line. Compares every parser splitting the line,
+the shared `Chunk.tokens` cache, and declarative `^\\s*KEYWORD` regexes against
+the `first_token` key.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_tokens.py --lines 200000
+"""
+import argparse
+import timeit
+
+from pfmsoft.text_chunk_parser import (
+    ChunkIterator,
+    ChunkParser,
+    Parser,
+    ParseResult,
+    ParseResultHandler,
+    ParseSchema,
+    compile_schema,
+)
+
+KEYWORDS = [f"KEY{index:02}" for index in range(16)]
+
+
+class SplitParser(ChunkParser):
+    """Splits the line itself."""
+
+    def __init__(self, keyword: str) -> None:
+        self.keyword = keyword
+
+    def parse(self, chunk, state, parse_hints=None):
+        tokens = chunk.text.split()
+        if not tokens or tokens[0] != self.keyword:
+            self.raise_parse_fail("Wrong keyword.", chunk, state)
+        return ParseResult(state, {"values": tokens[1:]}, self, chunk)
+
+
+class TokenParser(SplitParser):
+    """Uses the tokens shared through the chunk."""
+
+    def parse(self, chunk, state, parse_hints=None):
+        if chunk.first_token != self.keyword:
+            self.raise_parse_fail("Wrong keyword.", chunk, state)
+        return ParseResult(state, {"values": chunk.tokens[1:]}, self, chunk)
+
+
+class WideSchema(ParseSchema):
+    def __init__(self, parser_class) -> None:
+        self.parsers = tuple(parser_class(keyword) for keyword in KEYWORDS)
+
+    def expected(self, state: str):
+        return self.parsers
+
+
+def regex_definition(first_token: bool):
+    parsers = {}
+    for keyword in KEYWORDS:
+        pattern = r"^\s*\w+ (?P<a>\w+) (?P<b>\w+)"
+        if first_token:
+            parsers[keyword] = {"regex": pattern, "first_token": keyword}
+        else:
+            parsers[keyword] = {"regex": pattern.replace(r"\w+", keyword, 1)}
+    return {"parsers": parsers, "states": {"origin": KEYWORDS}}
+
+
+class CountingHandler(ParseResultHandler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.count = 0
+
+    def parsed_data(self, parse_result):
+        self.count += 1
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--lines", type=int, default=200000)
+    args = arg_parser.parse_args()
+    lines = [
+        f"    {KEYWORDS[index % len(KEYWORDS)]} {index} value{index}\n"
+        for index in range(args.lines)
+    ]
+    schemas = {
+        "each parser splits": WideSchema(SplitParser),
+        "shared tokens": WideSchema(TokenParser),
+        "regex keyword": compile_schema(regex_definition(False)),
+        "regex with first_token": compile_schema(regex_definition(True)),
+    }
+
+    def run(schema):
+        parser = Parser(schema, retain="none")
+        parser.parse(CountingHandler(), ChunkIterator(lines, chunk_filter=None))
+
+    print(f"best of 5, {len(KEYWORDS)} candidates, {len(lines)} lines")
+    for label, schema in schemas.items():
+        best = min(timeit.repeat(lambda: run(schema), number=1, repeat=5))
+        print(f"{label:<28}{best * 1000:>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
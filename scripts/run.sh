@@ -26,6 +26,10 @@ PYTHON_VENV_VERSION="${PYTHON_VENV_VERSION:-3.10}"
 # https://stackoverflow.com/questions/4774054/reliable-way-for-a-bash-script-to-get-the-full-path-to-itself
 SCRIPT_PATH=$(realpath $0)
 
+function benchmark() { ## Takes Arguments. Run a benchmark script, eg. benchmark bench_import.py
+    PYTHONPATH=./src python3 "./benchmarks/${1}" "${@:2}"
+}
+
 function clean() { ## Clean build,python, and test artifacts.
     clean:build
     clean:pyc
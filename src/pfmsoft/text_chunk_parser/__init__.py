@@ -1,18 +1,98 @@
-"""Top-level package for text-chunk-parser."""
-from pfmsoft.text_chunk_parser.chunk_parser import (
-    AllFailedToParseException,
-    Chunk,
-    ChunkIterator,
-    ChunkParser,
-    EmptyLine,
-    FailedParseException,
-    Parser,
-    ParseResult,
-    ParseResultHandler,
-    ParseSchema,
-    SkipChunk,
-)
+"""Top-level package for text-chunk-parser.
+
+Public names are loaded lazily (PEP 562), so importing the package does not
+import the parser stack until one of its names is first accessed.
+"""
+from importlib import import_module
+
+# Avoid importing typing at package import time, mypy still honors this flag.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from pfmsoft.text_chunk_parser.chunk_parser import (
+        AllFailedToParseException,
+        Chunk,
+        ChunkIterator,
+        ChunkParser,
+        EmptyLine,
+        FailedParseException,
+        Parser,
+        ParseResult,
+        ParseResultHandler,
+        ParseSchema,
+        ParseTimeoutException,
+        SkipChunk,
+        SlowParse,
+    )
+    from pfmsoft.text_chunk_parser.columnar import ColumnarResultHandler
+    from pfmsoft.text_chunk_parser.declarative_schema import (
+        CompiledParseSchema,
+        compile_schema,
+        load_schema,
+    )
+    from pfmsoft.text_chunk_parser.fixed_width import FixedWidthChunkParser
+    from pfmsoft.text_chunk_parser.multi_parser import MultiParser
+    from pfmsoft.text_chunk_parser.nested_schema import NestedParseSchema
+    from pfmsoft.text_chunk_parser.pattern_engines import compile_pattern
+    from pfmsoft.text_chunk_parser.profiling import SamplingProfiler
+    from pfmsoft.text_chunk_parser.schema_analysis import (
+        analyze_schema,
+        validate_schema,
+    )
+    from pfmsoft.text_chunk_parser.sharding import parse_sharded
+    from pfmsoft.text_chunk_parser.skip_scan import SkipScanner
+    from pfmsoft.text_chunk_parser.sources import open_lines
+    from pfmsoft.text_chunk_parser.spill import SpillingResultHandler
+    from pfmsoft.text_chunk_parser.string_pool import StringPool
 
 __author__ = """Chad Lowe"""
 __email__ = "pfmsoft@gmail.com"
 __version__ = "0.1.10"
+
+# Maps each public name to the module that defines it.
+_LAZY_ATTRIBUTES = {
+    "AllFailedToParseException": "pfmsoft.text_chunk_parser.chunk_parser",
+    "Chunk": "pfmsoft.text_chunk_parser.chunk_parser",
+    "ChunkIterator": "pfmsoft.text_chunk_parser.chunk_parser",
+    "ChunkParser": "pfmsoft.text_chunk_parser.chunk_parser",
+    "EmptyLine": "pfmsoft.text_chunk_parser.chunk_parser",
+    "FailedParseException": "pfmsoft.text_chunk_parser.chunk_parser",
+    "Parser": "pfmsoft.text_chunk_parser.chunk_parser",
+    "ParseResult": "pfmsoft.text_chunk_parser.chunk_parser",
+    "ParseResultHandler": "pfmsoft.text_chunk_parser.chunk_parser",
+    "ParseSchema": "pfmsoft.text_chunk_parser.chunk_parser",
+    "ParseTimeoutException": "pfmsoft.text_chunk_parser.chunk_parser",
+    "SkipChunk": "pfmsoft.text_chunk_parser.chunk_parser",
+    "SlowParse": "pfmsoft.text_chunk_parser.chunk_parser",
+    "ColumnarResultHandler": "pfmsoft.text_chunk_parser.columnar",
+    "CompiledParseSchema": "pfmsoft.text_chunk_parser.declarative_schema",
+    "compile_schema": "pfmsoft.text_chunk_parser.declarative_schema",
+    "load_schema": "pfmsoft.text_chunk_parser.declarative_schema",
+    "FixedWidthChunkParser": "pfmsoft.text_chunk_parser.fixed_width",
+    "StringPool": "pfmsoft.text_chunk_parser.string_pool",
+    "open_lines": "pfmsoft.text_chunk_parser.sources",
+    "SkipScanner": "pfmsoft.text_chunk_parser.skip_scan",
+    "MultiParser": "pfmsoft.text_chunk_parser.multi_parser",
+    "NestedParseSchema": "pfmsoft.text_chunk_parser.nested_schema",
+    "compile_pattern": "pfmsoft.text_chunk_parser.pattern_engines",
+    "SamplingProfiler": "pfmsoft.text_chunk_parser.profiling",
+    "SpillingResultHandler": "pfmsoft.text_chunk_parser.spill",
+    "parse_sharded": "pfmsoft.text_chunk_parser.sharding",
+    "analyze_schema": "pfmsoft.text_chunk_parser.schema_analysis",
+    "validate_schema": "pfmsoft.text_chunk_parser.schema_analysis",
+}
+
+__all__ = sorted(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRIBUTES.get(name, None)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name), name)
+    # Cache on the package so __getattr__ is only hit once per name.
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -1,15 +1,20 @@
 """
 Convenience functions for logging.
 
+`logging.handlers` is imported on demand, it pulls in a large part of the
+standard library and is not needed unless a file logger is actually configured.
 """
 import logging
-from logging.handlers import RotatingFileHandler
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from logging.handlers import RotatingFileHandler
 
 
 def rotating_file_handler(
     log_dir: Path, file_name: str, log_level: int, format_string: str | None = None
-) -> RotatingFileHandler:
+) -> "RotatingFileHandler":
     """
     Convenience function to init a rotating file handler.
 
@@ -26,6 +31,10 @@ def rotating_file_handler(
         RotatingFileHandler: The confgured RotatingFileHandler.
     """
     # TODO update logging code library,cookie cutter
+    from logging.handlers import (  # pylint: disable=import-outside-toplevel
+        RotatingFileHandler,
+    )
+
     log_dir.mkdir(parents=True, exist_ok=True)
     log_file = log_dir / Path(file_name)
     log_file.with_suffix(".log")
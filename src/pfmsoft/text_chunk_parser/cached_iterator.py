@@ -33,6 +33,11 @@ class CachedIterator:
             self.peek.append(self.place_holder)
         self.peek_primed: bool = False
         self.iter_exhausted: bool = False
+        # Items read past the peek window by lookahead, used before the source.
+        self.extra: Deque = deque()
+        self.source_exhausted: bool = False
+        # The number of items returned so far.
+        self.position: int = 0
 
     def __iter__(self):
         return self
@@ -47,18 +52,48 @@ class CachedIterator:
             # Dont try to add more items after iter exhausted
             if not self.iter_exhausted:
                 self.peek.append(iter_value)
+            self.position += 1
             return return_value
         except IndexError as exc:
             raise StopIteration from exc
 
     def _advance_iter(self):
+        if self.extra:
+            return self.extra.popleft()
         try:
+            if self.source_exhausted:
+                raise StopIteration
             iter_value = next(self.iterable)
             return iter_value
         except StopIteration:
             self.iter_exhausted = True
             return self.place_holder
 
+    def item_at(self, offset: int):
+        """
+        Return the item offset places after the last returned item.
+
+        Offset 0 is the first item in peek. Items past the peek window are read from
+        the source on demand, and kept until the iterator reaches them.
+
+        Raises:
+            IndexError: If the source ends before offset.
+        """
+        if offset < 0:
+            raise IndexError(f"Offset must be positive, got {offset}.")
+        peek_length = len(self.peek)
+        if offset < peek_length:
+            return self.peek[offset]
+        extra_offset = offset - peek_length
+        while len(self.extra) <= extra_offset:
+            if self.iter_exhausted or self.source_exhausted:
+                raise IndexError(f"Source ended before offset {offset}.")
+            try:
+                self.extra.append(next(self.iterable))
+            except StopIteration:
+                self.source_exhausted = True
+        return self.extra[extra_offset]
+
     def _init_peek(self):
         try:
             while not self.peek_primed:
@@ -75,3 +110,5 @@ class CachedIterator:
             # Somehow peek had no values. this should not happen.
             if not self.peek:
                 raise exc
+            # The source is shorter than peek, dont prime again on the next call.
+            self.peek_primed = True
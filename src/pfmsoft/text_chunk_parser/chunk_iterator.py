@@ -8,26 +8,39 @@
 #
 
 import re
+from itertools import chain
 from logging import NullHandler, getLogger
-from typing import Any, Callable, Iterable, Tuple
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Tuple
 
 from pfmsoft.text_chunk_parser.cached_iterator import CachedIterator
 from pfmsoft.text_chunk_parser.enumerated_iterator import Enumerated, EnumeratedIterable
 from pfmsoft.text_chunk_parser.filtered_iterator import FilteredIterable
+from pfmsoft.text_chunk_parser.read_ahead import ReadAheadIterator, batched
+
+if TYPE_CHECKING:
+    from pfmsoft.text_chunk_parser.line_index import LineIndex
 
 logger = getLogger(__name__)
 logger.addHandler(NullHandler())
 
 
+_TOKEN_CACHE_KEYS = ("_tokens", "_stripped")
+_BLANK_LINE = re.compile(r"^[^\S\n]*\n$")
+_BLANK_LINE_BYTES = re.compile(rb"^[^\S\n]*\n$")
+
+
 def blank_lines(value: Enumerated) -> bool:
     """
     An example of a filter function that can be used with ChunkIterator.
-    This function will skip blank lines.
+    This function will skip blank lines, of str or bytes.
     """
-    regex = r"^(?P<whitespace>[^\S\n]*)\n$"
-    empty_line_pattern = re.compile(regex)
-    match = empty_line_pattern.match(value.value)
-    if match:
+    text = value.value
+    if isinstance(text, bytes):
+        blank = _BLANK_LINE_BYTES.match(text) is not None
+    else:
+        blank = _BLANK_LINE.match(text) is not None
+    if blank:
         logger.info(
             "Line number %s has only white space.",
             value.count,
@@ -43,11 +56,81 @@ class Chunk:
         peek: Tuple[Enumerated, ...] = (),
         past: Tuple[Enumerated, ...] = (),
         source: str = "",
+        cache: CachedIterator | None = None,
     ):
+        """
+        Args:
+            value: The value of this chunk.
+            peek: The values following this chunk.
+            past: This value, and the values before it, most recent first.
+            source: The name of the source. Defaults to "".
+            cache: The iterator that provided the chunk, used for lookahead past
+                peek. Defaults to None.
+        """
         self.value = value
         self.peek = peek
         self.past = past
         self.source = source
+        self.cache = cache
+        self._position = None if cache is None else cache.position
+
+    def __getstate__(self):
+        # A copied chunk is detached from its source, lookahead is limited to peek.
+        state = self.__dict__.copy()
+        state["cache"] = None
+        state["_position"] = None
+        # The token cache is cheap to rebuild, and would double the size.
+        for key in _TOKEN_CACHE_KEYS:
+            state.pop(key, None)
+        return state
+
+    def _lookahead_item(self, offset: int) -> Enumerated:
+        """Get a following value, reading from the source if needed."""
+        if self.cache is None:
+            return self.peek[offset]
+        if self.cache.position != self._position:
+            raise ValueError(
+                f"Chunk {self.count} is no longer current, lookahead past peek is "
+                "only available for the current chunk."
+            )
+        return self.cache.item_at(offset)
+
+    def lookahead(self, count: int) -> Tuple[Enumerated, ...]:
+        """
+        Get up to count values following this chunk.
+
+        Values past `peek` are read from the source on demand, so a deep lookahead
+        only costs something for the chunks that ask for it.
+        """
+        values = []
+        try:
+            for offset in range(count):
+                values.append(self._lookahead_item(offset))
+        except IndexError:
+            pass
+        return tuple(values)
+
+    def peek_until(
+        self, predicate: Callable[[Enumerated], bool], limit: int
+    ) -> Enumerated | None:
+        """
+        Find the first following value that matches predicate.
+
+        Args:
+            predicate: Called with each following value, in order.
+            limit: The maximum number of values to check.
+
+        Returns:
+            The first matching value, or None if there is no match within limit.
+        """
+        try:
+            for offset in range(limit):
+                value = self._lookahead_item(offset)
+                if predicate(value):
+                    return value
+        except IndexError:
+            pass
+        return None
 
     @property
     def text(self):
@@ -57,6 +140,38 @@ class Chunk:
     def count(self):
         return self.value.count
 
+    # The token cache. Each is computed on first use, and shared by every parser
+    # that asks for it. A window advance makes a new Chunk, with an empty cache.
+
+    @property
+    def tokens(self) -> tuple:
+        """The whitespace separated tokens of the text, `text.split()`."""
+        try:
+            return self.__dict__["_tokens"]
+        except KeyError:
+            tokens = self.__dict__["_tokens"] = tuple(self.value.value.split())
+            return tokens
+
+    @property
+    def stripped(self):
+        """The text without leading and trailing whitespace, `text.strip()`."""
+        try:
+            return self.__dict__["_stripped"]
+        except KeyError:
+            stripped = self.__dict__["_stripped"] = self.value.value.strip()
+            return stripped
+
+    @property
+    def first_token(self):
+        """The first token of the text, empty for a blank line."""
+        tokens = self.tokens
+        return tokens[0] if tokens else self.value.value[:0]
+
+    @property
+    def token_count(self) -> int:
+        """The number of tokens in the text."""
+        return len(self.tokens)
+
     def __repr__(self):
         return (
             f"{__class__.__name__}("
@@ -84,33 +199,134 @@ class ChunkIterator:
         chunk_filter: Callable[[int, Any], bool] | None = blank_lines,
         past_size: int = 3,
         peek_size: int = 3,
+        read_ahead: int = 0,
+        batch_size: int = 1024,
+        enumerated: bool = False,
+        start_count: int = 0,
     ):
         """
         Args:
-            iterable: Iterable source of text to be chunked.
+            iterable: Iterable source of text to be chunked. Lines may be str, or
+                bytes for ASCII compatible data, eg. from `open_lines` with
+                encoding None. Bytes lines need parsers with bytes patterns.
             source: The name of the source. Defaults to "".
             chunk_filter: A filter function that can be used to skip chunks of text.
                 Defaults to blank_lines.
             history_size: The size of the history buffer. Defaults to 3.
             peek_size: The size of the peek buffer. Minimum 1. Defaults to 3.
+            read_ahead: The number of line batches to read, number and filter ahead
+                on a background thread. Defaults to 0, which does all the work on
+                the calling thread.
+            batch_size: The number of filtered lines in each read ahead batch.
+                Defaults to 1024.
+            enumerated: The iterable yields `Enumerated` values that already have
+                their line numbers, eg. from `SkipScanner.scan`. Defaults to False.
+            start_count: The number of lines before the first line of iterable, eg.
+                for a shard of a larger file. Defaults to 0.
         """
 
         self.source = source
         self.past_size = max(past_size, 1)
         self.peek_size = max(peek_size, 1)
         self.chunk_filter = chunk_filter
-        enum_iterable = EnumeratedIterable(iterable)
-        filtered_iterable = FilteredIterable(enum_iterable, self.chunk_filter)
+        self.reader: ReadAheadIterator | None = None
+        enum_iterable: Iterator = (
+            iter(iterable)
+            if enumerated
+            else EnumeratedIterable(iter(iterable), start=start_count)
+        )
+        filtered_iterable: Iterator = FilteredIterable(enum_iterable, self.chunk_filter)
+        if read_ahead > 0:
+            self.reader = ReadAheadIterator(
+                batched(filtered_iterable, batch_size),
+                max_items=read_ahead,
+                name=f"ChunkIterator({source})",
+            )
+            filtered_iterable = chain.from_iterable(self.reader)
         cached = CachedIterator(
             filtered_iterable, past_size=self.past_size, peek_size=self.peek_size
         )
         self.iterable = cached
 
+    @classmethod
+    def from_index(
+        cls,
+        path: Path | str,
+        start_line: int,
+        end_line: int | None = None,
+        index: "LineIndex | Path | str | None" = None,
+        encoding: str | None = "utf-8",
+        errors: str = "strict",
+        **kwargs,
+    ) -> "ChunkIterator":
+        """
+        Chunk lines start_line to end_line of a file, seeking with a line index.
+
+        The chunks keep their line numbers in the whole file. Their past and peek
+        values are limited to the slice. Unless a chunk_filter is given, the
+        filter outcome recorded in the index is used, if there is one.
+
+        Args:
+            path: The file, indexed with `line_index.build_line_index`.
+            start_line: The first line, starting at 1.
+            end_line: The last line, inclusive. Defaults to None, the end of the
+                file.
+            index: The index, or the path of its sidecar file. Defaults to None,
+                the default sidecar path.
+            encoding: The text encoding, or None for bytes. Defaults to "utf-8".
+            errors: The decode error handling. Defaults to "strict".
+            kwargs: Other `ChunkIterator` arguments.
+
+        Raises:
+            FileNotFoundError: If there is no index file.
+            ValueError: If the index is out of date, or start_line is not in the
+                file.
+        """
+        # pylint: disable=import-outside-toplevel
+        from pfmsoft.text_chunk_parser.line_index import (
+            LineIndex,
+            index_lines,
+            index_path_for,
+        )
+
+        if not isinstance(index, LineIndex):
+            index = LineIndex.load(index_path_for(path) if index is None else index)
+        index.check(path)
+        index.offset(start_line)
+        if "chunk_filter" not in kwargs and index.kept is not None:
+            kwargs["chunk_filter"] = index.kept_filter
+        kwargs.setdefault("source", str(path))
+        lines = index_lines(path, index, start_line, end_line, encoding, errors)
+        return cls(lines, start_count=start_line - 1, **kwargs)
+
+    def close(self):
+        """
+        Stop the read ahead thread, if there is one.
+
+        Called when the chunks run out, or reading fails, and by `Parser.parse`
+        when a parse fails.
+        """
+        if self.reader is not None:
+            self.reader.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def __iter__(self):
         return self
 
     def __next__(self) -> Chunk:
-        value: Enumerated = next(self.iterable)
+        try:
+            value: Enumerated = next(self.iterable)
+        except BaseException:
+            # Includes StopIteration, the read ahead thread is no longer needed.
+            self.close()
+            raise
         past = tuple(self.iterable.past)
         peek = tuple(self.iterable.peek)
-        return Chunk(value=value, past=past, peek=peek, source=self.source)
+        return Chunk(
+            value=value, past=past, peek=peek, source=self.source, cache=self.iterable
+        )
@@ -8,15 +8,39 @@
 #
 
 import re
+import threading
+from contextlib import nullcontext
 from dataclasses import dataclass
-from logging import NullHandler, getLogger
-from typing import Any, Dict, List, Sequence
+from functools import partial
+from logging import INFO, WARNING, NullHandler, getLogger
+from time import perf_counter
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    List,
+    Sequence,
+    Tuple,
+)
 
 from pfmsoft.text_chunk_parser.chunk_iterator import Chunk, ChunkIterator
+from pfmsoft.text_chunk_parser.string_pool import StringPool
+
+if TYPE_CHECKING:
+    from pfmsoft.text_chunk_parser.profiling import SamplingProfiler
+    from pfmsoft.text_chunk_parser.trace import TraceWriter
 
 logger = getLogger(__name__)
 logger.addHandler(NullHandler())
 
+STRING_POOL_HINT = "string_pool"
+# What `ParseResult.chunk` keeps after a parse, see `Parser`.
+RETENTION_MODES = ("full", "line_only", "none")
+# The most states with a cached attempt function, in one parse.
+_DISPATCH_CACHE_SIZE = 1024
+
 
 class ChunkParserException(Exception):
     """Chunk parser exception base class"""
@@ -25,6 +49,10 @@ class ChunkParserException(Exception):
 class FailedParseException(ChunkParserException):
     """
     The exception raised when a chunk fails to parse with an individual parser.
+
+    Most are caught by `Parser` as the next candidate is tried, so the default
+    message, with the chunk repr, is only built when it is first used, by
+    `str`, `repr` or `args`.
     """
 
     def __init__(
@@ -36,20 +64,36 @@ class FailedParseException(ChunkParserException):
         state: str,
         **kwargs,
     ) -> None:
-        if msg is None:
-            msg = (
-                f"Failed to parse chunk {chunk.count} using {parser!r} parser."
-                f"\n\treason: {reason}"
-                f"\n\tchunk: {chunk!r}"
-                f"\n\tcurrent state: {state}"
-            )
         super().__init__(msg)
+        self.msg = msg
         self.reason = reason
         self.chunk = chunk
         self.parser = parser
         self.state = state
         self.kwargs = kwargs
 
+    def __str__(self):
+        if self.msg is None:
+            self.msg = (
+                f"Failed to parse chunk {self.chunk.count} using {self.parser!r} "
+                "parser."
+                f"\n\treason: {self.reason}"
+                f"\n\tchunk: {self.chunk!r}"
+                f"\n\tcurrent state: {self.state}"
+            )
+        return self.msg
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({str(self)!r})"
+
+    @property
+    def args(self):
+        return (str(self),)
+
+    @args.setter
+    def args(self, value):
+        self.msg = value[0] if value else None
+
 
 class AllFailedToParseException(ChunkParserException):
     """
@@ -85,6 +129,14 @@ class AllFailedToParseException(ChunkParserException):
         self.kwargs = kwargs
 
 
+class ParseTimeoutException(ChunkParserException):
+    """
+    The exception raised inside a parse attempt that runs over its time budget.
+
+    `Parser` catches it, and counts the attempt as a failed parse.
+    """
+
+
 class ParseResultHandler:
     """
     The ParseResultHandler handles what to do with the parsed data. Subclass this with the
@@ -104,17 +156,37 @@ class ParseResultHandler:
     def __exit__(self, exc_type, exc_value, traceback):
         pass
 
+    @property
+    def string_pool(self) -> StringPool:
+        """
+        The string pool for this parsing job.
+
+        `Parser` pools `ParseResult.new_state` with it, and `ChunkParser.intern`
+        can pool parsed values with it.
+        """
+        pool = self.__dict__.get("_string_pool", None)
+        if pool is None:
+            pool = self.__dict__["_string_pool"] = StringPool()
+        return pool
+
     def parse_hints(self) -> Dict:
         """
         Override this to provide parse hints that will be passed for each parse attempt.
         Hints can be updated by ParseContext as needed to reflect the current state.
+
+        The default hints hold the string pool. Include `super().parse_hints()` when
+        overriding to keep it.
         """
-        return {}
+        return {STRING_POOL_HINT: self.string_pool}
 
 
 class ParseSchema:
     """
     Provides the specific parse scheme.
+
+    Like parsers, a schema may be shared by parses on several threads. It must not
+    change once built, except for caches whose entries are the same whichever
+    thread fills them.
     """
 
     def expected(self, state: str) -> Sequence["ChunkParser"]:
@@ -130,6 +202,32 @@ class ParseSchema:
         """
         raise NotImplementedError
 
+    def next_state(self, state: str, new_state: str) -> str:
+        """
+        Override to resolve the state a parser returned into the next state.
+
+        Called by `Parser` after each successful parse, only if overridden. Used
+        by schemas where parsers return relative states, eg. `NestedParseSchema`.
+
+        Args:
+            state: The state the chunk was parsed in.
+            new_state: The state returned by the parser.
+
+        Returns:
+            The next state. Defaults to new_state.
+        """
+        _ = state
+        return new_state
+
+    def defined_states(self) -> Sequence[str] | None:
+        """
+        Override to list every state the schema defines.
+
+        Used by schema analysis to find unreachable states. Defaults to None, for
+        a schema that does not list its states.
+        """
+        return None
+
 
 @dataclass
 class ParseResult:
@@ -140,20 +238,48 @@ class ParseResult:
         new_state: The new state of the parser.
         data: Any data parsed from the chunk.
         parser: The parser used to parse the chunk.
-        chunk: The chunk parsed.
+        chunk: The chunk parsed. Depending on the `Parser` retention mode, only
+            the line, or None.
     """
 
     new_state: str
     data: Any
     parser: "ChunkParser"
-    chunk: Chunk
+    chunk: Chunk | None
 
 
 class ChunkParser:
     """
     Base class for a ChunkParser
+
+    Parsers can declare the states they may return in `output_states`, and set
+    `matches_any` if they succeed on every chunk. Both are optional, and are only
+    used by schema analysis.
+
+    `time_budget` sets the seconds a parse attempt may take, overriding the
+    `Parser` time budget. It only applies when the `Parser` times attempts.
+
+    Thread safety contract: one parser instance is shared by every parse that
+    uses its schema, possibly on several threads at once. `parse` must be
+    reentrant. Keep configuration on the instance, set only in `__init__`, and
+    never store per chunk or per parse state on it. State for one parse belongs
+    in the `ParseResultHandler`, and reaches the parser through `parse_hints`.
     """
 
+    output_states: Tuple[str, ...] | None = None
+    matches_any: bool = False
+    time_budget: float | None = None
+
+    def possible_states(self, state: str) -> Sequence[str] | None:
+        """
+        The states a successful parse may return, when called in state.
+
+        Override if the result depends on the current state. Defaults to
+        `output_states`, None means the states are not declared.
+        """
+        _ = state
+        return self.output_states
+
     def parse(
         self,
         chunk: Chunk,
@@ -194,9 +320,24 @@ class ChunkParser:
             raise fail_exc from exc
         raise fail_exc
 
+    def intern(self, value: str, parse_hints: Dict | None) -> str:
+        """
+        Convenience function to pool a parsed string with the job string pool.
+
+        Returns value unchanged if parse_hints has no string pool.
+        """
+        if parse_hints:
+            pool = parse_hints.get(STRING_POOL_HINT, None)
+            if pool is not None:
+                return pool.intern(value)
+        return value
+
     def regex_match_or_fail(self, pattern: re.Pattern, chunk: Chunk, state: str):
         """
         Convenience function for regex parsing.
+
+        The pattern must be a bytes pattern if the chunk text is bytes. Patterns
+        from any engine in `pattern_engines` can be used.
         """
         match = pattern.match(chunk.text)
         if match:
@@ -208,24 +349,260 @@ class ChunkParser:
         return f"{self.__class__.__name__}()"
 
 
+@dataclass
+class SlowParse:
+    """
+    A parse attempt that was slower than the `Parser` slow threshold, or ran over
+    its time budget.
+
+    Args:
+        count: The line number of the chunk.
+        source: The source of the chunk.
+        parser: The parser that was tried.
+        state: The state of the parse.
+        seconds: How long the attempt took.
+        timed_out: The attempt was interrupted for running over its time budget.
+    """
+
+    count: int
+    source: str
+    parser: "ChunkParser"
+    state: str
+    seconds: float
+    timed_out: bool = False
+
+    def __str__(self):
+        timed_out = ", timed out" if self.timed_out else ""
+        return (
+            f"{self.seconds * 1000:.1f} ms, line {self.count} of {self.source!r}, "
+            f"{self.parser!r} in state {self.state!r}{timed_out}"
+        )
+
+
+class _AlarmClock:
+    """
+    The SIGALRM handler and interval timer shared by the armed `_ParseTimer`s.
+
+    The first timer to arm saves the handler and pending alarm of the
+    application, and the last to disarm restores them, with what is left of the
+    alarm. Ticks only check the armed timers. An application alarm that comes
+    due while they are armed is passed to its handler, if it is a function, or
+    fires once they are disarmed. Only the main thread arms timers.
+    """
+
+    def __init__(self) -> None:
+        self.timers: List["_ParseTimer"] = []
+        self.tick = 0.0
+        self.previous_handler: Any = None
+        self.alarm_due: float | None = None
+        self.alarm_interval = 0.0
+
+    def arm(self, timer: "_ParseTimer"):
+        import signal  # pylint: disable=import-outside-toplevel
+
+        if not self.timers:
+            delay, self.alarm_interval = signal.getitimer(signal.ITIMER_REAL)
+            self.alarm_due = perf_counter() + delay if delay else None
+            self.previous_handler = signal.signal(signal.SIGALRM, self._on_tick)
+            self.tick = 0.0
+        self.timers.append(timer)
+        if not self.tick or timer.tick < self.tick:
+            self.tick = timer.tick
+            signal.setitimer(signal.ITIMER_REAL, self.tick, self.tick)
+
+    def disarm(self, timer: "_ParseTimer"):
+        import signal  # pylint: disable=import-outside-toplevel
+
+        self.timers.remove(timer)
+        if self.timers:
+            return
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        previous = self.previous_handler
+        # None if the handler was not installed from Python.
+        signal.signal(signal.SIGALRM, signal.SIG_DFL if previous is None else previous)
+        self.previous_handler = None
+        if self.alarm_due is not None:
+            # An alarm that came due and was not passed on fires straight away.
+            delay = max(self.alarm_due - perf_counter(), 1e-6)
+            signal.setitimer(signal.ITIMER_REAL, delay, self.alarm_interval)
+            self.alarm_due = None
+
+    def _on_tick(self, signum, frame):
+        now = perf_counter()
+        due = self.alarm_due
+        if due is not None and now >= due and callable(self.previous_handler):
+            self.alarm_due = now + self.alarm_interval if self.alarm_interval else None
+            self.previous_handler(signum, frame)
+        for timer in self.timers:
+            timer.check(now)
+
+
+_ALARM_CLOCK = _AlarmClock()
+
+
+class _ParseTimer:
+    """
+    Interrupts parse attempts that run over their time budget.
+
+    Once an attempt with a budget starts, a periodic SIGALRM timer checks the
+    current attempt every tick, see `_AlarmClock`. Regex matching checks for
+    signals while it runs, so even a backtracking match is interrupted. Signals
+    only work on the main thread of a POSIX system, elsewhere attempts are timed,
+    but not interrupted. Without a budget, attempts are only timed.
+    """
+
+    def __init__(self, tick: float, budget: float | None) -> None:
+        self.tick = tick
+        self.budget = budget
+        self.started = 0.0
+        self.deadline: float | None = None
+        self.can_enforce = False
+        self.armed = False
+        # The slow attempts of this parse run.
+        self.slow_parses: List[SlowParse] = []
+
+    def __enter__(self):
+        import signal  # pylint: disable=import-outside-toplevel
+
+        if (
+            hasattr(signal, "setitimer")
+            and threading.current_thread() is threading.main_thread()
+        ):
+            self.can_enforce = True
+        else:
+            # Only a warning if the Parser has a budget, parsers may set their own.
+            logger.log(
+                INFO if self.budget is None else WARNING,
+                "Parse time budgets can only interrupt parsers on the main thread "
+                "of a POSIX system, attempts will only be timed.",
+            )
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.deadline = None
+        if self.armed:
+            _ALARM_CLOCK.disarm(self)
+            self.armed = False
+        self.can_enforce = False
+
+    def start(self, budget: float | None):
+        if budget is not None and not self.armed and self.can_enforce:
+            # Armed on the first attempt with a budget, until the parse ends.
+            _ALARM_CLOCK.arm(self)
+            self.armed = True
+        self.started = perf_counter()
+        self.deadline = None if budget is None else self.started + budget
+
+    def stop(self) -> float:
+        self.deadline = None
+        return perf_counter() - self.started
+
+    def check(self, now: float):
+        deadline = self.deadline
+        if deadline is not None and now > deadline:
+            self.deadline = None
+            raise ParseTimeoutException("Parse attempt ran over its time budget.")
+
+
+def close_chunks(chunk_provider: Any):
+    """Close a chunk provider that has a `close` method, eg. after a failed parse."""
+    close = getattr(chunk_provider, "close", None)
+    if callable(close):
+        close()
+
+
 class Parser:
     """
     Parser.parse handles calling the parsers for each chunk.
+
+    A Parser may be shared by threads that parse at the same time. Each parse
+    keeps its state in local variables, and the handler and chunk iterator of a
+    parse are its own. The schema and its parsers are shared, so they must keep
+    to the `ChunkParser` thread safety contract.
     """
 
     def __init__(
         self,
         schema: ParseSchema,
         log_on_success: bool = False,
+        intern_states: bool = True,
+        validate: bool = False,
+        retain: str = "full",
+        time_budget: float | None = None,
+        slow_threshold: float | None = None,
+        budget_tick: float = 0.01,
+        trace: "TraceWriter | None" = None,
+        profiler: "SamplingProfiler | None" = None,
     ):
         """
 
         Args:
             schema: The schema for a parse job.
             log_on_success: Log successful parses. Defaults to False.
+            intern_states: Pool `ParseResult.new_state` with the handler string
+                pool. Defaults to True.
+            validate: Check the schema with `schema_analysis.validate_schema`, and
+                raise `SchemaValidationException` on problems. Defaults to False.
+            retain: What `ParseResult.chunk` keeps once the chunk is parsed. "full"
+                keeps the chunk, with its peek and past values. "line_only" keeps
+                a `Chunk` with only the line number, text and source. "none" sets
+                it to None. Handlers that keep every result should use
+                "line_only" or "none", so they do not keep the peek and past
+                values of every line. Defaults to "full".
+            time_budget: The seconds a parse attempt may take before it is
+                interrupted and counted as a failed parse, unless the parser sets
+                its own `ChunkParser.time_budget`. Defaults to None, no budget.
+            slow_threshold: Report attempts slower than this many seconds in
+                `slow_parses`. Defaults to None, which only reports attempts that
+                ran over their budget.
+            budget_tick: How often, in seconds, running attempts are checked
+                against their budget. Defaults to 0.01. From the first attempt
+                with a budget until the parse ends, the checks use SIGALRM and an
+                interval timer on the main thread. A pending application alarm
+                is kept, and passed to its handler when it comes due.
+            trace: Record every chunk, with the attempted parsers and their
+                times, see `trace.TraceWriter`. Defaults to None.
+            profiler: Time a sample of the chunks, to find slow states and
+                regions of the input, see `profiling.SamplingProfiler`. Defaults
+                to None.
+
+        Raises:
+            ValueError: If retain is not one of RETENTION_MODES.
         """
+        if retain not in RETENTION_MODES:
+            raise ValueError(
+                f"Unsupported retention mode {retain!r}, expected one of "
+                f"{RETENTION_MODES}."
+            )
+        if validate:
+            # pylint: disable=import-outside-toplevel
+            from pfmsoft.text_chunk_parser.schema_analysis import validate_schema
+
+            validate_schema(schema)
         self.schema = schema
         self.log_on_success = log_on_success
+        self.intern_states = intern_states
+        self.retain = retain
+        self.time_budget = time_budget
+        self.slow_threshold = slow_threshold
+        self.budget_tick = budget_tick
+        self.trace = trace
+        self.profiler = profiler
+        # Attempts are only timed if asked for, so the default path pays nothing.
+        self.timed = (
+            time_budget is not None or slow_threshold is not None or trace is not None
+        )
+        self._local = threading.local()
+
+    def __getstate__(self):
+        # Thread local results stay in this process.
+        state = self.__dict__.copy()
+        del state["_local"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
 
     def _log_success(self, parse_result: ParseResult):
         if self.log_on_success:
@@ -247,29 +624,192 @@ class Parser:
         state: str,
         handler: ParseResultHandler,
         parsers: Sequence[ChunkParser],
+        failed_parse_exceptions: List[FailedParseException] | None = None,
     ) -> ParseResult:
+        """
+        Try each candidate in order.
 
+        failed_parse_exceptions holds the failures of candidates already tried,
+        which are not tried again.
+        """
+        remaining = parsers
+        if failed_parse_exceptions is None:
+            failed_parse_exceptions = []
+        else:
+            remaining = parsers[len(failed_parse_exceptions) :]
+        parse_hints = handler.parse_hints()
+        for chunk_parser in remaining:
+            try:
+                parse_return = chunk_parser.parse(chunk, state, parse_hints)
+                self._log_success(parse_return)
+                return parse_return
+            except FailedParseException as exc:
+                failed_parse_exceptions.append(exc)
+                logger.info(exc)
+                continue
+        raised_exc = AllFailedToParseException(
+            None, chunk, parsers, state, failed_parse_exceptions
+        )
+        logger.warning(raised_exc)
+        raise raised_exc
+
+    def _attempt_first(
+        self,
+        chunk: Chunk,
+        state: str,
+        handler: ParseResultHandler,
+        parsers: Sequence[ChunkParser],
+    ) -> ParseResult:
+        """Only one candidate, or the first matches any chunk."""
+        try:
+            parse_return = parsers[0].parse(chunk, state, handler.parse_hints())
+        except FailedParseException as exc:
+            logger.info(exc)
+            return self._attempt_parse(chunk, state, handler, parsers, [exc])
+        if self.log_on_success:
+            self._log_success(parse_return)
+        return parse_return
+
+    def _attempt_catch_all(
+        self,
+        chunk: Chunk,
+        state: str,
+        handler: ParseResultHandler,
+        parsers: Sequence[ChunkParser],
+    ) -> ParseResult:
+        """The last candidate matches any chunk, so one should succeed."""
         failed_parse_exceptions: List[FailedParseException] = []
+        parse_hints = handler.parse_hints()
         for chunk_parser in parsers:
             try:
-                parse_return = chunk_parser.parse(chunk, state, handler.parse_hints())
+                parse_return = chunk_parser.parse(chunk, state, parse_hints)
+            except FailedParseException as exc:
+                failed_parse_exceptions.append(exc)
+                logger.info(exc)
+                continue
+            if self.log_on_success:
                 self._log_success(parse_return)
+            return parse_return
+        # Every candidate failed, so this only raises.
+        return self._attempt_parse(
+            chunk, state, handler, parsers, failed_parse_exceptions
+        )
+
+    def _dispatcher(
+        self, parsers: Sequence[ChunkParser]
+    ) -> Callable[[Chunk, str, ParseResultHandler, Sequence[ChunkParser]], ParseResult]:
+        """
+        Pick the attempt function for a candidate list.
+
+        A single candidate, or a first candidate that matches any chunk, is called
+        directly. A last candidate that matches any chunk can not fail, so the
+        success is logged without the generic loop. A parser that declares
+        `matches_any` and fails anyway continues with the remaining candidates,
+        each candidate is only tried once.
+        """
+        if len(parsers) == 1 or (parsers and parsers[0].matches_any):
+            return self._attempt_first
+        if parsers and parsers[-1].matches_any:
+            return self._attempt_catch_all
+        return self._attempt_parse
+
+    def _attempt_parse_timed(
+        self,
+        chunk: Chunk,
+        state: str,
+        handler: ParseResultHandler,
+        parsers: Sequence[ChunkParser],
+        timer: _ParseTimer,
+    ) -> ParseResult:
+        failed_parse_exceptions: List[FailedParseException] = []
+        parse_hints = handler.parse_hints()
+        trace = self.trace
+        nanoseconds: List[int] = []
+        for index, chunk_parser in enumerate(parsers):
+            budget = chunk_parser.time_budget
+            if budget is None:
+                budget = self.time_budget
+            try:
+                # Started in the try, a tick straight after is still a timeout.
+                timer.start(budget)
+                try:
+                    parse_return = chunk_parser.parse(chunk, state, parse_hints)
+                finally:
+                    elapsed = timer.stop()
+                nanoseconds.append(int(elapsed * 1e9))
+                self._check_slow(timer, chunk, state, chunk_parser, elapsed)
+                self._log_success(parse_return)
+                if trace is not None:
+                    trace.record(chunk.count, state, parsers, nanoseconds, index)
                 return parse_return
+            except ParseTimeoutException as exc:
+                # The alarm may also fire after the attempt, before the timer is
+                # stopped and elapsed is set. The handler cleared the deadline,
+                # so stopping again can not be interrupted.
+                elapsed = timer.stop()
+                nanoseconds.append(int(elapsed * 1e9))
+                self._check_slow(timer, chunk, state, chunk_parser, elapsed, True)
+                reason = f"Parse attempt ran over its time budget of {budget}s."
+                failed = FailedParseException(None, reason, chunk, chunk_parser, state)
+                failed.__cause__ = exc
+                failed_parse_exceptions.append(failed)
+                logger.warning(failed)
+                continue
             except FailedParseException as exc:
+                nanoseconds.append(int(elapsed * 1e9))
+                self._check_slow(timer, chunk, state, chunk_parser, elapsed)
                 failed_parse_exceptions.append(exc)
                 logger.info(exc)
                 continue
+        if trace is not None:
+            trace.record(chunk.count, state, parsers, nanoseconds, -1)
         raised_exc = AllFailedToParseException(
             None, chunk, parsers, state, failed_parse_exceptions
         )
         logger.warning(raised_exc)
         raise raised_exc
 
+    def _check_slow(
+        self,
+        timer: _ParseTimer,
+        chunk: Chunk,
+        state: str,
+        chunk_parser: ChunkParser,
+        elapsed: float,
+        timed_out: bool = False,
+    ):
+        if timed_out or (
+            self.slow_threshold is not None and elapsed > self.slow_threshold
+        ):
+            slow = SlowParse(
+                chunk.count, chunk.source, chunk_parser, state, elapsed, timed_out
+            )
+            timer.slow_parses.append(slow)
+            logger.warning("Slow parse: %s", slow)
+
+    @property
+    def slow_parses(self) -> List[SlowParse]:
+        """
+        The slow attempts of the last parse started on the calling thread.
+
+        Concurrent parses on other threads do not change it. Read only, it was a
+        plain attribute before parses could share a Parser. Each parse starts a
+        new list, so code that reset it with `parser.slow_parses = []` can drop
+        the assignment, which now raises AttributeError.
+        """
+        return getattr(self._local, "slow_parses", [])
+
+    def slow_report(self) -> str:
+        """The slow attempts of the last parse, slowest first, one per line."""
+        slow_parses = sorted(self.slow_parses, key=lambda x: x.seconds, reverse=True)
+        return "\n".join(str(slow) for slow in slow_parses)
+
     def parse(
         self,
         handler: ParseResultHandler,
         chunk_provider: ChunkIterator,
-    ):
+        state: str = "origin",
+    ) -> str:
         """
         Parse data from text.
 
@@ -279,28 +819,98 @@ class Parser:
         Args:
             handler: The parse handler for an individual parsing job.
             chunk_provider: An iterator that provides the Chunks to be parsed.
+            state: The state before the first chunk, eg. for a shard of a larger
+                file. Defaults to "origin".
+
+        Returns:
+            The state after the last chunk.
 
+        If the parse raises, chunk_provider is closed if it has a `close` method,
+        which stops a `ChunkIterator` read ahead thread.
         """
-        state = "origin"
-        for chunk in chunk_provider:
-            parse_return = self._attempt_parse(
-                chunk,
-                state,
-                handler,
-                self.schema.expected(state),
-            )
-            state = parse_return.new_state
+        step, timer = self.stepper(handler)
+        try:
+            with timer or nullcontext():
+                for chunk in chunk_provider:
+                    state = step(chunk, state)
+        except BaseException:
+            close_chunks(chunk_provider)
+            raise
+        return state
+
+    def stepper(
+        self, handler: ParseResultHandler
+    ) -> Tuple[Callable[[Chunk, str], str], ContextManager | None]:
+        """
+        Prepare to parse one chunk at a time, eg. to share a chunk stream.
+
+        Resets `slow_parses` for the calling thread.
+
+        Args:
+            handler: The parse handler for the parsing job.
+
+        Returns:
+            A step function, that parses a chunk in a state, passes the result to
+            handler, and returns the new state. And the timer context to parse
+            in, None if attempts are not timed.
+        """
+        intern = handler.string_pool.intern if self.intern_states else None
+        retain = self.retain
+        expected = self.schema.expected
+        transition = None
+        if type(self.schema).next_state is not ParseSchema.next_state:
+            transition = self.schema.next_state
+        timer = None
+        if self.timed:
+            timer = _ParseTimer(self.budget_tick, self.time_budget)
+            self._local.slow_parses = timer.slow_parses
+        timed_parse = (
+            None if timer is None else partial(self._attempt_parse_timed, timer=timer)
+        )
+        # state -> (candidate list, attempt function), checked against the list
+        # the schema returns, for schemas that build new lists.
+        dispatch: Dict[str, Tuple[Sequence[ChunkParser], Callable]] = {}
+
+        def step(chunk: Chunk, state: str) -> str:
+            parsers = expected(state)
+            if timed_parse is not None:
+                parse_return = timed_parse(chunk, state, handler, parsers)
+            else:
+                entry = dispatch.get(state, None)
+                if entry is None or entry[0] is not parsers:
+                    if len(dispatch) >= _DISPATCH_CACHE_SIZE:
+                        dispatch.clear()
+                    entry = dispatch[state] = (parsers, self._dispatcher(parsers))
+                parse_return = entry[1](chunk, state, handler, parsers)
+            if transition is not None:
+                parse_return.new_state = transition(state, parse_return.new_state)
+            if intern is not None:
+                parse_return.new_state = intern(parse_return.new_state)
+            if retain == "line_only":
+                parse_return.chunk = Chunk(chunk.value, source=chunk.source)
+            elif retain == "none":
+                parse_return.chunk = None
             handler.parsed_data(parse_return)
+            return parse_return.new_state
+
+        if self.profiler is not None:
+            return self.profiler.wrap(step), timer
+        return step, timer
 
 
 class EmptyLine(ChunkParser):
     """
     An example of a regex parser that will match an empty line.
+
+    Matches str or bytes lines, the whitespace is always returned as str.
     """
 
+    output_states = ("empty_line",)
+
     def __init__(self) -> None:
         regex = r"^(?P<whitespace>[^\S\n]*)\n$"
         self.pattern = re.compile(regex)
+        self.bytes_pattern = re.compile(regex.encode("ascii"))
 
     def parse(
         self,
@@ -309,10 +919,15 @@ class EmptyLine(ChunkParser):
         parse_hints: Dict | None = None,
     ) -> ParseResult:
         _ = parse_hints
-        match = self.regex_match_or_fail(self.pattern, chunk, state)
+        if isinstance(chunk.text, bytes):
+            match = self.regex_match_or_fail(self.bytes_pattern, chunk, state)
+            whitespace = match.group("whitespace").decode("ascii")
+        else:
+            match = self.regex_match_or_fail(self.pattern, chunk, state)
+            whitespace = match.group("whitespace")
         return ParseResult(
             new_state="empty_line",
-            data={"whitespace": match.group("whitespace")},
+            data={"whitespace": whitespace},
             chunk=chunk,
             parser=self,
         )
@@ -323,9 +938,14 @@ class SkipChunk(ChunkParser):
     A parser that will skip a chunk without advancing the state.
     """
 
+    matches_any = True
+
     def __init__(self) -> None:
         pass
 
+    def possible_states(self, state: str) -> Sequence[str] | None:
+        return (state,)
+
     def parse(
         self,
         chunk: Chunk,
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+#
+#  columnar.py
+#  _project_
+#
+#  Created by Chad Lowe on 2026-10-19.
+#  Copyright 2026 Chad Lowe. All rights reserved.
+#
+"""
+Accumulate parsed data into columns instead of keeping every `ParseResult`.
+
+Results are routed to a record type, by default the new state, and each field of
+`ParseResult.data` is appended to a column for that record type. Columns with a
+typecode are stored in an `array.array`, other columns are lists, with strings
+pooled in the handler `string_pool`. Columns can be flushed to NumPy `.npz` or
+Arrow IPC files in chunks.
+
+NumPy and PyArrow are optional, and only imported when flushing to their format.
+"""
+from array import array
+from logging import NullHandler, getLogger
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from pfmsoft.text_chunk_parser.chunk_parser import ParseResult, ParseResultHandler
+
+logger = getLogger(__name__)
+logger.addHandler(NullHandler())
+
+FILE_FORMATS = ("npz", "arrow")
+
+
+def route_by_state(parse_result: ParseResult) -> str:
+    """Route a result by the new state of the parse."""
+    return parse_result.new_state
+
+
+def route_by_parser(parse_result: ParseResult) -> str:
+    """Route a result by the class name of the parser."""
+    return parse_result.parser.__class__.__name__
+
+
+class ColumnBuffer:
+    """
+    The columns for a single record type.
+    """
+
+    def __init__(self, typecodes: Dict[str, str] | None = None) -> None:
+        """
+        Args:
+            typecodes: `array.array` typecodes by column name. Columns without a
+                typecode are stored as lists. Defaults to None.
+        """
+        self.typecodes = typecodes or {}
+        self.columns: Dict[str, Any] = {}
+        self.length = 0
+
+    def _new_column(self, name: str):
+        typecode = self.typecodes.get(name, None)
+        if typecode is not None:
+            if self.length:
+                raise ValueError(
+                    f"Typed column {name!r} is missing from earlier records."
+                )
+            return array(typecode)
+        # Backfill a column that first appears part way through.
+        return [None] * self.length
+
+    def append(self, data: Dict[str, Any], intern: Callable[[Any], Any]):
+        """
+        Append a record, missing list columns are filled with None.
+
+        A record that is rejected is taken back out, so the columns keep the
+        same length.
+
+        Raises:
+            ValueError: If the record is missing a typed column, or has a typed
+                column that earlier records did not.
+            TypeError: If a value has the wrong type for its typecode.
+            OverflowError: If a value is out of range for its typecode.
+        """
+        columns = self.columns
+        column_count = len(columns)
+        try:
+            for name, value in data.items():
+                column = columns.get(name, None)
+                if column is None:
+                    column = columns[name] = self._new_column(name)
+                if isinstance(value, str):
+                    value = intern(value)
+                column.append(value)
+            if len(data) != len(columns):
+                for name, column in columns.items():
+                    if len(column) == self.length:
+                        if isinstance(column, array):
+                            raise ValueError(
+                                f"Typed column {name!r} is missing from a record."
+                            )
+                        column.append(None)
+        except BaseException:
+            # Columns keep their order, so the ones new in this record are last.
+            for column in columns.values():
+                if len(column) > self.length:
+                    column.pop()
+            for name in list(columns)[column_count:]:
+                del columns[name]
+            raise
+        self.length += 1
+
+    def clear(self):
+        """Remove all records."""
+        self.columns = {}
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+
+class ColumnarResultHandler(ParseResultHandler):
+    """
+    A `ParseResultHandler` that stores `ParseResult.data` in columns.
+
+    `ParseResult.data` must be a dict. Results with empty data, such as from
+    `SkipChunk`, are not stored.
+    """
+
+    def __init__(
+        self,
+        route: Callable[[ParseResult], str] = route_by_state,
+        typecodes: Dict[str, Dict[str, str]] | None = None,
+        output_dir: Path | None = None,
+        file_format: str = "npz",
+        flush_every: int = 100000,
+        **kwargs,
+    ) -> None:
+        """
+        Args:
+            route: Returns the record type for a result. Defaults to route_by_state.
+            typecodes: `array.array` typecodes by record type, then column name.
+                Defaults to None.
+            output_dir: Directory to flush columns to. Defaults to None, which
+                keeps all columns in memory.
+            file_format: One of FILE_FORMATS. Defaults to "npz".
+            flush_every: Flush a record type after this many records. Only used
+                with an output_dir. Defaults to 100000.
+        """
+        super().__init__(**kwargs)
+        if file_format not in FILE_FORMATS:
+            raise ValueError(
+                f"Unknown file format {file_format!r}, expected one of {FILE_FORMATS}."
+            )
+        self.route = route
+        self.typecodes = typecodes or {}
+        self.output_dir = None if output_dir is None else Path(output_dir)
+        self.file_format = file_format
+        self.flush_every = max(flush_every, 1)
+        self.buffers: Dict[str, ColumnBuffer] = {}
+        self.flush_counts: Dict[str, int] = {}
+        self.written: List[Path] = []
+
+    def parsed_data(self, parse_result: ParseResult):
+        data = parse_result.data
+        if not data:
+            return
+        record_type = self.route(parse_result)
+        buffer = self.buffers.get(record_type, None)
+        if buffer is None:
+            buffer = self.buffers[record_type] = ColumnBuffer(
+                self.typecodes.get(record_type, None)
+            )
+        buffer.append(data, self.string_pool.intern)
+        if self.output_dir is not None and len(buffer) >= self.flush_every:
+            self.flush(record_type)
+
+    def columns(self, record_type: str) -> Dict[str, Any]:
+        """The columns held in memory for a record type."""
+        return self.buffers[record_type].columns
+
+    def flush(self, record_type: str | None = None):
+        """
+        Write buffered columns to output_dir, and clear the buffers.
+
+        Args:
+            record_type: The record type to flush. Defaults to None, which
+                flushes all record types.
+        """
+        if self.output_dir is None:
+            raise ValueError("No output_dir to flush columns to.")
+        record_types = list(self.buffers) if record_type is None else [record_type]
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        for name in record_types:
+            buffer = self.buffers[name]
+            if not len(buffer):
+                continue
+            count = self.flush_counts.get(name, 0)
+            file_path = self.output_dir / f"{name}-{count:05d}.{self.file_format}"
+            if self.file_format == "npz":
+                _write_npz(file_path, buffer.columns)
+            else:
+                _write_arrow(file_path, buffer.columns)
+            logger.info("Flushed %s %s records to %s", len(buffer), name, file_path)
+            self.flush_counts[name] = count + 1
+            self.written.append(file_path)
+            buffer.clear()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.output_dir is not None and exc_type is None:
+            self.flush()
+
+
+def _write_npz(file_path: Path, columns: Dict[str, Any]):
+    import numpy  # pylint: disable=import-outside-toplevel
+
+    arrays = {}
+    for name, column in columns.items():
+        if isinstance(column, array):
+            arrays[name] = numpy.frombuffer(column, dtype=column.typecode)
+        elif all(isinstance(value, str) for value in column):
+            arrays[name] = numpy.array(column, dtype=str)
+        else:
+            arrays[name] = numpy.array(column, dtype=object)
+    numpy.savez(file_path, **arrays)
+
+
+def _write_arrow(file_path: Path, columns: Dict[str, Any]):
+    import pyarrow  # pylint: disable=import-outside-toplevel
+
+    table = pyarrow.table(
+        {
+            name: pyarrow.array(
+                column.tolist() if isinstance(column, array) else column
+            )
+            for name, column in columns.items()
+        }
+    )
+    with pyarrow.OSFile(str(file_path), "wb") as sink:
+        with pyarrow.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
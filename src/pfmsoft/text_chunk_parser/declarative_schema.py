@@ -0,0 +1,393 @@
+# -*- coding: utf-8 -*-
+#
+#  declarative_schema.py
+#  _project_
+#
+#  Created by Chad Lowe on 2026-10-19.
+#  Copyright 2026 Chad Lowe. All rights reserved.
+#
+r"""
+Build a `ParseSchema` from a declarative description instead of Python classes.
+
+A schema definition is a dict, usually loaded from a JSON or YAML file, with two
+sections. `parsers` describes each line type, and `states` lists the parsers
+expected in each state, in the order they should be tried::
+
+    parsers:
+      key_value:
+        regex: '^\s*"(?P<key>[\w\s]+)":\s*"(?P<value>[\w\s.]+)",\n$'
+        new_state: key_value
+      dict_end:
+        regex: '^}\n$'
+        new_state: dict_end
+      skip: {}
+    states:
+      origin: [key_value, skip]
+      key_value: [key_value, dict_end]
+      dict_end: [skip]
+
+Parser definition keys, all optional:
+
+- regex: Pattern matched against the chunk text. A parser without a regex
+  matches every chunk.
+- new_state: The state after a successful parse. Defaults to the current state.
+- fields: Named groups copied into `ParseResult.data`. Defaults to every named
+  group in the regex.
+- prefix: Literal text the chunk must start with. Used to reject a chunk before
+  running the regex. Derived from the regex when not given.
+- first_token: The first whitespace separated token the chunk must have, eg.
+  for lines with variable indentation. The chunk is split once, and the tokens
+  are shared by every parser in the state, see `Chunk.tokens`.
+- engine: The pattern engine for the regex, or a list in order of preference,
+  see `pattern_engines`. Defaults to the engine passed to `compile_schema`.
+
+Compiling the definition precompiles every pattern once, shares one parser
+instance between identical definitions, and indexes the states. Patterns with
+nested quantifiers, which can backtrack catastrophically, are logged as warnings
+and kept in `CompiledParseSchema.lint_findings`, unless a linear time engine
+compiled them. Compiled with an encoding, the parsers match bytes lines, and
+only decode the fields.
+"""
+import json
+import re
+from logging import NullHandler, getLogger
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+
+from pfmsoft.text_chunk_parser.chunk_parser import (
+    Chunk,
+    ChunkParser,
+    ChunkParserException,
+    ParseResult,
+    ParseSchema,
+)
+from pfmsoft.text_chunk_parser.pattern_engines import compile_pattern
+from pfmsoft.text_chunk_parser.regex_lint import lint_parsers, sre_constants, sre_parse
+
+logger = getLogger(__name__)
+logger.addHandler(NullHandler())
+
+_PARSER_KEYS = {"regex", "new_state", "fields", "prefix", "first_token", "engine"}
+
+
+class SchemaDefinitionException(ChunkParserException):
+    """The exception raised when a schema definition is invalid."""
+
+
+class RegexChunkParser(ChunkParser):
+    """
+    A `ChunkParser` built from a declarative parser definition.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        regex: str | None = None,
+        new_state: str | None = None,
+        fields: Sequence[str] | None = None,
+        prefix: str | None = None,
+        encoding: str | None = None,
+        first_token: str | None = None,
+        engine: str | Sequence[str] = "re",
+    ) -> None:
+        """
+        Args:
+            name: The name of the parser in the schema definition.
+            regex: Pattern matched against the chunk text. Defaults to None, which
+                matches every chunk.
+            new_state: The state after a successful parse. Defaults to None, which
+                keeps the current state.
+            fields: Named groups copied into the parsed data. Defaults to None,
+                which copies every named group.
+            prefix: Literal text the chunk must start with. Defaults to None,
+                which derives the prefix from regex.
+            encoding: Parse bytes lines, matching regex and prefix encoded with
+                encoding, and decoding only the fields. Defaults to None, which
+                parses str lines.
+            first_token: The first token the chunk must have. Defaults to None,
+                which does not check the tokens.
+            engine: The name of the pattern engine, or names in order of
+                preference, see `pattern_engines.compile_pattern`. Defaults to
+                "re".
+
+        Raises:
+            re.error: If regex is invalid.
+            ValueError: If an engine name is unknown, or fields names a group
+                regex does not have.
+        """
+        self.name = name
+        self.encoding = encoding
+        self.pattern: Any = None
+        # The engine that compiled the pattern.
+        self.engine: str | None = None
+        if regex is not None:
+            self.pattern, self.engine = compile_pattern(
+                regex if encoding is None else regex.encode(encoding), engine
+            )
+        self.new_state = new_state
+        groups = {} if self.pattern is None else self.pattern.groupindex
+        if fields is None:
+            fields = tuple(groups)
+        unknown_fields = [field for field in fields if field not in groups]
+        if unknown_fields:
+            raise ValueError(f"Fields {unknown_fields!r} are not named groups.")
+        self.fields: Tuple[str, ...] = tuple(fields)
+        if prefix is None and regex is not None:
+            prefix = literal_prefix(regex)
+        self.prefix = prefix or ""
+        self._prefix = self.prefix if encoding is None else self.prefix.encode(encoding)
+        self.first_token = first_token
+        self._first_token = (
+            first_token
+            if encoding is None or first_token is None
+            else first_token.encode(encoding)
+        )
+        self.matches_any = self.pattern is None and first_token is None
+
+    def possible_states(self, state: str) -> Sequence[str] | None:
+        return (state if self.new_state is None else self.new_state,)
+
+    def parse(
+        self,
+        chunk: Chunk,
+        state: str,
+        parse_hints: Dict | None = None,
+    ) -> ParseResult:
+        _ = parse_hints
+        new_state = state if self.new_state is None else self.new_state
+        if self._first_token is not None and chunk.first_token != self._first_token:
+            reason = f"First token is not {self.first_token!r}."
+            self.raise_parse_fail(reason, chunk, state, first_token=self.first_token)
+        if self.pattern is None:
+            return ParseResult(new_state, {}, self, chunk)
+        if self._prefix and not chunk.text.startswith(self._prefix):
+            reason = f"Text does not start with prefix {self.prefix!r}."
+            self.raise_parse_fail(reason, chunk, state, prefix=self.prefix)
+        match = self.regex_match_or_fail(self.pattern, chunk, state)
+        if self.encoding is None:
+            data = {field: match.group(field) for field in self.fields}
+        else:
+            data = {}
+            for field in self.fields:
+                value = match.group(field)
+                data[field] = None if value is None else value.decode(self.encoding)
+        return ParseResult(new_state, data, self, chunk)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(name={self.name!r})"
+
+
+class CompiledParseSchema(ParseSchema):
+    """
+    A `ParseSchema` compiled from a declarative schema definition.
+
+    The schema is immutable once built, attributes can not be set and the
+    mappings are read only, so one compiled schema can be shared by parses on
+    many threads. The parsers themselves are shared, not copied.
+    """
+
+    states: Mapping[str, Tuple[ChunkParser, ...]]
+    parsers: Mapping[str, ChunkParser]
+    state_index: Mapping[str, int]
+    lint_findings: Tuple[Tuple[ChunkParser, str], ...]
+
+    def __init__(
+        self,
+        states: Dict[str, Tuple[ChunkParser, ...]],
+        parsers: Dict[str, ChunkParser],
+        lint_findings: Sequence[Tuple[ChunkParser, str]] = (),
+    ) -> None:
+        """
+        Args:
+            states: The parsers expected for each state, in the order to try them.
+            parsers: The parsers by name.
+            lint_findings: (parser, finding) from `regex_lint.lint_parsers`.
+                Defaults to none.
+        """
+        set_attribute = super().__setattr__
+        set_attribute("states", MappingProxyType(dict(states)))
+        set_attribute("parsers", MappingProxyType(dict(parsers)))
+        set_attribute(
+            "state_index",
+            MappingProxyType({state: index for index, state in enumerate(states)}),
+        )
+        set_attribute("lint_findings", tuple(lint_findings))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(
+            f"Can not set {name!r}, a {self.__class__.__name__} is immutable."
+        )
+
+    def __reduce__(self):
+        # The read only mappings do not pickle.
+        return (
+            self.__class__,
+            (dict(self.states), dict(self.parsers), self.lint_findings),
+        )
+
+    def defined_states(self) -> Sequence[str] | None:
+        return list(self.states)
+
+    def anchor_literals(self, state: str = "origin") -> List[str]:
+        """
+        The literal prefixes of the parsers in a state.
+
+        Suitable as the anchors of a `SkipScanner`. Catch all parsers, with no
+        regex and no first token, are ignored, they only skip filler. If any
+        other parser has no prefix, eg. with only a first token, it could match
+        lines no anchor finds, so an empty list is returned.
+        """
+        prefixes = set()
+        for parser in self.expected(state):
+            if isinstance(parser, RegexChunkParser) and parser.matches_any:
+                continue
+            prefix = getattr(parser, "prefix", "")
+            if not prefix:
+                return []
+            prefixes.add(prefix)
+        return sorted(prefixes)
+
+    def expected(self, state: str) -> Sequence[ChunkParser]:
+        try:
+            return self.states[state]
+        except KeyError as exc:
+            raise SchemaDefinitionException(
+                f"State {state!r} is not defined in the schema."
+            ) from exc
+
+
+def literal_prefix(regex: str) -> str:
+    """
+    Find the literal text a regex must match at the start of a string.
+
+    Conservative, reads the parsed pattern up to the first item that is not a
+    plain literal. Returns "" if there is no usable prefix.
+
+    Args:
+        regex: The regex pattern.
+
+    Returns:
+        The literal prefix.
+    """
+    parsed = sre_parse.parse(regex)
+    if parsed.state.flags & re.IGNORECASE:
+        # Case folded literals can not be checked with startswith.
+        return ""
+    items = list(parsed)
+    if items and items[0] == (sre_constants.AT, sre_constants.AT_BEGINNING):
+        items = items[1:]
+    prefix: List[str] = []
+    # A top level alternation is one BRANCH item, and repeats are REPEAT items,
+    # so neither adds to the prefix. The prefix stops at the end of the line.
+    for op, value in items:
+        if op is not sre_constants.LITERAL or value == 10:
+            break
+        prefix.append(chr(value))
+    return "".join(prefix)
+
+
+def compile_schema(
+    definition: Dict[str, Any],
+    encoding: str | None = None,
+    engine: str | Sequence[str] = "re",
+) -> CompiledParseSchema:
+    """
+    Compile a declarative schema definition into a `CompiledParseSchema`.
+
+    Args:
+        definition: A dict with `parsers` and `states` sections.
+        encoding: Compile the parsers for bytes lines in this ASCII compatible
+            encoding, eg. from `open_lines` with encoding None. Defaults to None,
+            for str lines.
+        engine: The pattern engine of parsers without an `engine` key, or names
+            in order of preference, see `pattern_engines`. Defaults to "re".
+
+    Raises:
+        SchemaDefinitionException: If the definition is invalid.
+
+    Returns:
+        The compiled schema.
+    """
+    parser_definitions = definition.get("parsers", None)
+    state_definitions = definition.get("states", None)
+    if not isinstance(parser_definitions, dict):
+        raise SchemaDefinitionException("Schema requires a `parsers` mapping.")
+    if not isinstance(state_definitions, dict):
+        raise SchemaDefinitionException("Schema requires a `states` mapping.")
+    if "origin" not in state_definitions:
+        raise SchemaDefinitionException("Schema requires an `origin` state.")
+    # Identical definitions share a single parser instance.
+    shared: Dict[str, RegexChunkParser] = {}
+    parsers: Dict[str, ChunkParser] = {}
+    for name, parser_definition in parser_definitions.items():
+        parser_definition = parser_definition or {}
+        unknown_keys = set(parser_definition) - _PARSER_KEYS
+        if unknown_keys:
+            raise SchemaDefinitionException(
+                f"Parser {name!r} has unknown keys {sorted(unknown_keys)!r}."
+            )
+        key = json.dumps(parser_definition, sort_keys=True)
+        if key not in shared:
+            try:
+                options = {"engine": engine, **parser_definition}
+                shared[key] = RegexChunkParser(name=name, encoding=encoding, **options)
+            except re.error as exc:
+                raise SchemaDefinitionException(
+                    f"Parser {name!r} has an invalid regex. {exc}"
+                ) from exc
+            except ValueError as exc:
+                raise SchemaDefinitionException(f"Parser {name!r}: {exc}") from exc
+        parsers[name] = shared[key]
+    states: Dict[str, Tuple[ChunkParser, ...]] = {}
+    for state, parser_names in state_definitions.items():
+        missing = [name for name in parser_names if name not in parsers]
+        if missing:
+            raise SchemaDefinitionException(
+                f"State {state!r} uses undefined parsers {missing!r}."
+            )
+        states[state] = tuple(parsers[name] for name in parser_names)
+    lint_findings = lint_parsers(shared.values())
+    for parser, finding in lint_findings:
+        logger.warning("%r may backtrack catastrophically. %s", parser, finding)
+    return CompiledParseSchema(states, parsers, lint_findings)
+
+
+def load_schema(
+    file_path: Path,
+    encoding: str | None = None,
+    engine: str | Sequence[str] = "re",
+) -> CompiledParseSchema:
+    """
+    Load and compile a schema definition from a JSON or YAML file.
+
+    YAML support requires PyYAML to be installed.
+
+    Args:
+        file_path: Path to a .json, .yaml, or .yml file.
+        encoding: See `compile_schema`. Defaults to None.
+        engine: See `compile_schema`. Defaults to "re".
+
+    Raises:
+        SchemaDefinitionException: If the file type is not supported.
+
+    Returns:
+        The compiled schema.
+    """
+    file_path = Path(file_path)
+    text = file_path.read_text()
+    if file_path.suffix == ".json":
+        definition = json.loads(text)
+    elif file_path.suffix in (".yaml", ".yml"):
+        try:
+            import yaml  # pylint: disable=import-outside-toplevel
+        except ImportError as exc:
+            raise SchemaDefinitionException(
+                "PyYAML is required to load YAML schema definitions."
+            ) from exc
+        definition = yaml.safe_load(text)
+    else:
+        raise SchemaDefinitionException(
+            f"Unsupported schema file type {file_path.suffix!r}."
+        )
+    return compile_schema(definition, encoding, engine)
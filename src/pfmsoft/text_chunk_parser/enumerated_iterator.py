@@ -22,9 +22,16 @@ class EnumeratedIterable:
     def __init__(
         self,
         iterable: Iterable,
+        start: int = 0,
     ):
+        """
+        Args:
+            iterable: The values to number.
+            start: The number of values before the first value, the first value is
+                numbered start + 1. Defaults to 0.
+        """
         self.iterable = iterable
-        self.count = 0
+        self.count = start
 
     def __iter__(self):
         return self
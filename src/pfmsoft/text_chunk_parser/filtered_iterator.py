@@ -24,6 +24,8 @@ class FilteredIterable:
         return self
 
     def __next__(self):
+        if self.filter is None:
+            return next(self.iterable)
         success = False
         while not success:
             value = next(self.iterable)
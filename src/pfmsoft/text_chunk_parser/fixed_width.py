@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+#
+#  fixed_width.py
+#  _project_
+#
+#  Created by Chad Lowe on 2026-10-19.
+#  Copyright 2026 Chad Lowe. All rights reserved.
+#
+"""
+Parse fixed width text by slicing columns at known offsets.
+
+Column slices are built once, when the parser is created, so extracting a line
+is only slicing and `str.strip`, without running a regex.
+
+With an encoding, the parser slices bytes lines, and only the column values are
+decoded. Column offsets are then byte offsets, which match character offsets
+for ASCII and latin-1.
+"""
+import re
+from array import array
+from dataclasses import dataclass
+from functools import partial
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from pfmsoft.text_chunk_parser.chunk_parser import Chunk, ChunkParser, ParseResult
+
+
+@dataclass(frozen=True)
+class Column:
+    """
+    A fixed width column.
+
+    Args:
+        name: The field name used in the parsed data.
+        start: The offset of the first character of the column.
+        end: The offset after the last character of the column. None means the
+            column runs to the end of the line.
+        convert: Optional conversion applied to the stripped text, eg. int.
+        typecode: Optional `array.array` typecode used by
+            `FixedWidthChunkParser.extract_block`. Requires convert.
+    """
+
+    name: str
+    start: int
+    end: int | None = None
+    convert: Callable[[str], Any] | None = None
+    typecode: str | None = None
+
+
+def columns_from_header(
+    header: str,
+    names: Sequence[str] | None = None,
+) -> List[Column]:
+    """
+    Infer columns from a header line.
+
+    Each column starts at a header token, and ends where the next token starts.
+    The last column runs to the end of the line. Repeated names get a numbered
+    suffix, eg. `STA`, `STA_2`.
+
+    Args:
+        header: The header line.
+        names: Optional names to use instead of the header tokens. Must have one
+            name per header token. Defaults to None.
+
+    Raises:
+        ValueError: If names does not match the number of header tokens.
+
+    Returns:
+        The inferred columns.
+    """
+    matches = list(re.finditer(r"\S+", header))
+    if names is None:
+        names = _unique_names([match.group() for match in matches])
+    if len(names) != len(matches):
+        raise ValueError(
+            f"Expected {len(matches)} names for header columns, got {len(names)}."
+        )
+    starts = [match.start() for match in matches]
+    ends: List[int | None] = [*starts[1:], None]
+    return [
+        Column(name=name, start=start, end=end)
+        for name, start, end in zip(names, starts, ends)
+    ]
+
+
+def _unique_names(names: Sequence[str]) -> List[str]:
+    seen: Dict[str, int] = {}
+    unique = []
+    for name in names:
+        seen[name] = seen.get(name, 0) + 1
+        unique.append(name if seen[name] == 1 else f"{name}_{seen[name]}")
+    return unique
+
+
+def _strip_decode(encoding: str, value: bytes) -> str:
+    return value.strip().decode(encoding)
+
+
+class FixedWidthChunkParser(ChunkParser):
+    """
+    A parser for fixed width lines.
+
+    A parse fails if the line does not match the optional pattern, or if a
+    column conversion raises ValueError.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[Column],
+        new_state: str,
+        pattern: re.Pattern | None = None,
+        encoding: str | None = None,
+    ) -> None:
+        """
+        Args:
+            columns: The columns to extract.
+            new_state: The state after a successful parse.
+            pattern: Optional regex the line must match before it is sliced, a
+                bytes pattern with encoding. Defaults to None.
+            encoding: Parse bytes lines, decoding the column values with this
+                encoding. Defaults to None, which parses str lines.
+
+        Raises:
+            ValueError: If a column has a typecode without a convert.
+        """
+        self.columns = tuple(columns)
+        for column in self.columns:
+            if column.typecode is not None and column.convert is None:
+                raise ValueError(
+                    f"Column {column.name!r} has a typecode, which requires convert."
+                )
+        self.encoding = encoding
+        self._clean: Callable[[Any], str] = (
+            str.strip if encoding is None else partial(_strip_decode, encoding)
+        )
+        self.new_state = new_state
+        self.pattern = pattern
+        self.names: Tuple[str, ...] = tuple(column.name for column in self.columns)
+        self.slices: Tuple[slice, ...] = tuple(
+            slice(column.start, column.end) for column in self.columns
+        )
+        # itemgetter with slices cuts every column in a single C level call.
+        self._getter = itemgetter(*self.slices) if self.slices else None
+        self.converters: Tuple[Tuple[str, Callable[[str], Any]], ...] = tuple(
+            (column.name, column.convert)
+            for column in self.columns
+            if column.convert is not None
+        )
+        self.output_states = (new_state,)
+        self.matches_any = pattern is None and not self.converters
+
+    @classmethod
+    def from_header(
+        cls,
+        header: str,
+        new_state: str,
+        names: Sequence[str] | None = None,
+        pattern: re.Pattern | None = None,
+        encoding: str | None = None,
+    ) -> "FixedWidthChunkParser":
+        """
+        Make a parser with columns inferred from a header line.
+
+        The header is always str. See `columns_from_header`.
+        """
+        return cls(columns_from_header(header, names), new_state, pattern, encoding)
+
+    def extract(self, text: str | bytes) -> Dict[str, Any]:
+        """
+        Slice the columns from a line of text, or bytes with an encoding.
+
+        Raises:
+            ValueError: If a column conversion fails.
+        """
+        if self._getter is None:
+            return {}
+        values = self._getter(text)
+        if len(self.slices) == 1:
+            values = (values,)
+        data = dict(zip(self.names, map(self._clean, values)))
+        for name, convert in self.converters:
+            data[name] = convert(data[name])
+        return data
+
+    def extract_block(self, lines: Iterable[str] | Iterable[bytes]) -> Dict[str, Any]:
+        """
+        Slice the columns from a block of lines at once.
+
+        Columns with a typecode are returned as an `array.array`, other columns
+        as a list.
+
+        Raises:
+            ValueError: If a column conversion fails.
+        """
+        line_list = lines if isinstance(lines, list) else list(lines)
+        result: Dict[str, Any] = {}
+        for column, column_slice in zip(self.columns, self.slices):
+            values: List[Any] = list(
+                map(self._clean, map(itemgetter(column_slice), line_list))
+            )
+            if column.convert is not None:
+                values = list(map(column.convert, values))
+            if column.typecode is not None:
+                result[column.name] = array(column.typecode, values)
+            else:
+                result[column.name] = values
+        return result
+
+    def parse(
+        self,
+        chunk: Chunk,
+        state: str,
+        parse_hints: Dict | None = None,
+    ) -> ParseResult:
+        _ = parse_hints
+        if self.pattern is not None:
+            self.regex_match_or_fail(self.pattern, chunk, state)
+        try:
+            data = self.extract(chunk.text)
+        except ValueError as exc:
+            reason = f"Column conversion failed. {exc}"
+            self.raise_parse_fail(reason, chunk, state, exc)
+        return ParseResult(self.new_state, data, self, chunk)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(new_state={self.new_state!r})"
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+#
+#  line_index.py
+#  _project_
+#
+#  Created by Chad Lowe on 2026-10-19.
+#  Copyright 2026 Chad Lowe. All rights reserved.
+#
+"""
+A sidecar index of line offsets, to start parsing at any line of a large file.
+
+Line numbers are otherwise only known by counting from the top. The index keeps
+the byte offset of every `step`th line start in an `array("Q")`, so reaching line
+N is one seek, and reading at most `step - 1` lines. It can also keep the
+outcome of the chunk filter for every line, one bit each, so the filter does not
+run again when the index is used.
+
+Build the index once, it is saved next to the file::
+
+    index = build_line_index(path)
+    chunks = ChunkIterator.from_index(path, 1_000_000, 1_000_500)
+
+The index records the size and modification time of the file, and is rejected
+if the file changed. Only uncompressed files can be indexed, since the offsets
+are byte offsets into the file.
+
+The sampled offsets also give shards on line boundaries without reading the
+file, see `LineIndex.split_shards`.
+"""
+import os
+import struct
+import sys
+from array import array
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Iterator, List, Tuple
+
+from pfmsoft.text_chunk_parser.chunk_iterator import blank_lines
+from pfmsoft.text_chunk_parser.enumerated_iterator import Enumerated
+from pfmsoft.text_chunk_parser.sharding import Shard
+from pfmsoft.text_chunk_parser.sources import (
+    DEFAULT_BLOCK_SIZE,
+    detect_compression,
+    iter_blocks,
+    iter_byte_lines,
+    iter_lines,
+)
+
+INDEX_SUFFIX = ".lidx"
+MAGIC = b"TCPLIDX1"
+# step, line count, file size, file mtime_ns, sample count, has filter outcome.
+_HEADER = struct.Struct("<QQQQQB")
+
+
+class LineIndex:
+    """
+    The byte offsets of sampled line starts in a file.
+    """
+
+    def __init__(
+        self,
+        step: int,
+        offsets: array,
+        line_count: int,
+        size: int,
+        mtime_ns: int,
+        kept: bytearray | None = None,
+    ) -> None:
+        """
+        Args:
+            step: The number of lines between samples.
+            offsets: The byte offset of lines 1, 1 + step, 1 + 2 * step, ...
+            line_count: The number of lines in the file.
+            size: The size of the file in bytes.
+            mtime_ns: The modification time of the file.
+            kept: One bit per line, set if the chunk filter kept the line. Bit 0
+                of byte 0 is line 1. Defaults to None, no filter outcome.
+        """
+        self.step = step
+        self.offsets = offsets
+        self.line_count = line_count
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.kept = kept
+
+    def check(self, path: Path | str):
+        """
+        Raises:
+            ValueError: If the file changed since the index was built.
+        """
+        stat = os.stat(path)
+        if stat.st_size != self.size or stat.st_mtime_ns != self.mtime_ns:
+            raise ValueError(
+                f"The line index for {path} is out of date, rebuild it with "
+                "build_line_index."
+            )
+
+    def offset(self, line: int) -> Tuple[int, int]:
+        """
+        Find where to start reading for a line.
+
+        Args:
+            line: The line number, starting at 1.
+
+        Raises:
+            ValueError: If line is not in the file.
+
+        Returns:
+            The byte offset of the nearest sampled line at or before line, and the
+            number of lines to skip from there.
+        """
+        if not 1 <= line <= self.line_count:
+            raise ValueError(f"Line {line} is not in 1 to {self.line_count}.")
+        sample, skip = divmod(line - 1, self.step)
+        return self.offsets[sample], skip
+
+    def is_kept(self, line: int) -> bool:
+        """The chunk filter outcome for a line, True if there is none."""
+        if self.kept is None:
+            return True
+        return bool(self.kept[(line - 1) >> 3] & (1 << ((line - 1) & 7)))
+
+    def kept_filter(self, value: Enumerated) -> bool:
+        """A `ChunkIterator` chunk filter that uses the recorded outcome."""
+        return self.is_kept(value.count)
+
+    def split_shards(self, shards: int) -> List[Shard]:
+        """
+        Split the file into about evenly sized shards, on sampled lines.
+
+        Unlike `sharding.split_shards`, the file is not read. Shards are balanced
+        by line count, and fewer are returned if there are too few samples.
+        """
+        samples = len(self.offsets)
+        picks = sorted({samples * index // shards for index in range(max(shards, 1))})
+        bounds = [(self.offsets[pick], pick * self.step) for pick in picks if samples]
+        bounds = bounds or [(0, 0)]
+        bounds.append((self.size, self.line_count))
+        return [
+            Shard(index, start, end, start_count, end_count)
+            for index, ((start, start_count), (end, end_count)) in enumerate(
+                zip(bounds, bounds[1:])
+            )
+        ]
+
+    def save(self, index_path: Path | str):
+        """Write the index to a sidecar file."""
+        offsets = array("Q", self.offsets)
+        if sys.byteorder != "little":
+            offsets.byteswap()
+        with open(index_path, "wb") as stream:
+            stream.write(MAGIC)
+            stream.write(
+                _HEADER.pack(
+                    self.step,
+                    self.line_count,
+                    self.size,
+                    self.mtime_ns,
+                    len(offsets),
+                    self.kept is not None,
+                )
+            )
+            offsets.tofile(stream)
+            if self.kept is not None:
+                stream.write(self.kept)
+
+    @classmethod
+    def load(cls, index_path: Path | str) -> "LineIndex":
+        """
+        Read an index from a sidecar file.
+
+        Raises:
+            ValueError: If the file is not a line index.
+        """
+        with open(index_path, "rb") as stream:
+            if stream.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{index_path} is not a line index.")
+            step, line_count, size, mtime_ns, samples, has_kept = _HEADER.unpack(
+                stream.read(_HEADER.size)
+            )
+            offsets = array("Q")
+            offsets.fromfile(stream, samples)
+            if sys.byteorder != "little":
+                offsets.byteswap()
+            kept = bytearray(stream.read()) if has_kept else None
+        return cls(step, offsets, line_count, size, mtime_ns, kept)
+
+
+def index_path_for(path: Path | str) -> Path:
+    """The default sidecar path of the index for a file."""
+    return Path(f"{path}{INDEX_SUFFIX}")
+
+
+def build_line_index(
+    path: Path | str,
+    step: int = 1024,
+    chunk_filter: Callable[[Enumerated], bool] | None = blank_lines,
+    encoding: str | None = "utf-8",
+    errors: str = "strict",
+    index_path: Path | str | None = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> LineIndex:
+    """
+    Read a file once, and save an index of its line offsets.
+
+    Args:
+        path: An uncompressed file.
+        step: The number of lines between samples. Defaults to 1024.
+        chunk_filter: The chunk filter to record the outcome of, for each line. The
+            lines are decoded to run it. Defaults to blank_lines, None records
+            no outcome.
+        encoding: The text encoding the filter sees, or None for bytes. Defaults
+            to "utf-8".
+        errors: The decode error handling. Defaults to "strict".
+        index_path: Where to save the index. Defaults to None, the file path with
+            INDEX_SUFFIX added, where `ChunkIterator.from_index` looks for it.
+        block_size: The number of bytes to read at a time. Defaults to
+            DEFAULT_BLOCK_SIZE.
+
+    Raises:
+        ValueError: If step is less than 1, or the file is compressed.
+
+    Returns:
+        The index, which has also been saved.
+    """
+    if step < 1:
+        raise ValueError(f"step must be at least 1, got {step}.")
+    stat = os.stat(path)
+    offsets = array("Q")
+    kept = None if chunk_filter is None else bytearray()
+    offset = count = 0
+    with open(path, "rb") as stream:
+        if detect_compression(stream.read(6)):
+            raise ValueError(f"{path} is compressed, only plain files can be indexed.")
+        stream.seek(0)
+        for line in iter_byte_lines(iter_blocks(stream, block_size)):
+            if count % step == 0:
+                offsets.append(offset)
+            if kept is not None:
+                if count & 7 == 0:
+                    kept.append(0)
+                text: Any = line if encoding is None else line.decode(encoding, errors)
+                if chunk_filter(Enumerated(count + 1, text)):  # type: ignore
+                    kept[-1] |= 1 << (count & 7)
+            offset += len(line)
+            count += 1
+    index = LineIndex(step, offsets, count, stat.st_size, stat.st_mtime_ns, kept)
+    index.save(index_path_for(path) if index_path is None else index_path)
+    return index
+
+
+def index_lines(
+    path: Path | str,
+    index: LineIndex,
+    start_line: int,
+    end_line: int | None = None,
+    encoding: str | None = "utf-8",
+    errors: str = "strict",
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Iterator[str] | Iterator[bytes]:
+    """
+    Iterate lines start_line to end_line of a file, seeking with an index.
+
+    Args:
+        path: The indexed file.
+        index: The index of the file.
+        start_line: The first line, starting at 1.
+        end_line: The last line, inclusive. Defaults to None, the end of the file.
+        encoding: The text encoding, or None for bytes. Defaults to "utf-8".
+        errors: The decode error handling. Defaults to "strict".
+        block_size: The number of bytes to read at a time. Defaults to
+            DEFAULT_BLOCK_SIZE.
+
+    Raises:
+        ValueError: If the index is out of date, or start_line is not in the file.
+    """
+    index.check(path)
+    offset, skip = index.offset(start_line)
+    last = index.line_count if end_line is None else min(end_line, index.line_count)
+    with open(path, "rb") as stream:
+        stream.seek(offset)
+        lines = iter_lines(iter_blocks(stream, block_size), encoding, errors)
+        yield from islice(lines, skip, skip + max(last - start_line + 1, 0))
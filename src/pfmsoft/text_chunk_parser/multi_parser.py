@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+#
+#  multi_parser.py
+#  _project_
+#
+#  Created by Chad Lowe on 2026-10-19.
+#  Copyright 2026 Chad Lowe. All rights reserved.
+#
+"""
+Run several schemas over one chunk stream, in a single pass.
+
+Each schema usually gets its own `ChunkIterator`, so running a summary schema and
+a detail schema over the same file reads, decodes, filters and windows it twice.
+A `MultiParser` reads the chunks once, and passes each chunk to every parser in
+turn, each with its own handler and state.
+
+Usage::
+
+    multi = MultiParser([Parser(summary_schema), Parser(detail_schema)])
+    states = multi.parse([summary_handler, detail_handler], chunks)
+
+The chunk is shared, so parsers and handlers must not modify it, and the
+retention modes of the parsers only change what each `ParseResult` keeps.
+"""
+from contextlib import ExitStack
+from typing import Dict, List, Sequence
+
+from pfmsoft.text_chunk_parser.chunk_parser import (
+    AllFailedToParseException,
+    ChunkIterator,
+    Parser,
+    ParseResultHandler,
+    ParseSchema,
+    close_chunks,
+)
+
+
+class MultiParser:
+    """
+    Drives several `Parser`s over one shared chunk stream.
+    """
+
+    def __init__(
+        self,
+        parsers: Sequence[Parser | ParseSchema],
+        isolate_failures: bool = False,
+    ) -> None:
+        """
+        Args:
+            parsers: The parsers, a schema is wrapped in a default `Parser`.
+            isolate_failures: When a parser fails on a chunk, keep parsing with the
+                others, and record the exception in `failures`. Defaults to False,
+                which raises the exception and stops the whole parse.
+
+        Raises:
+            ValueError: If there are no parsers.
+        """
+        if not parsers:
+            raise ValueError("MultiParser needs at least one parser.")
+        self.parsers: List[Parser] = [
+            parser if isinstance(parser, Parser) else Parser(parser)
+            for parser in parsers
+        ]
+        self.isolate_failures = isolate_failures
+        self.failures: Dict[int, AllFailedToParseException] = {}
+
+    def parse(
+        self,
+        handlers: Sequence[ParseResultHandler],
+        chunk_provider: ChunkIterator,
+        states: Sequence[str] | None = None,
+    ) -> List[str]:
+        """
+        Parse each chunk from chunk_provider with every parser.
+
+        Args:
+            handlers: A handler for each parser, in the same order.
+            chunk_provider: An iterator that provides the Chunks to be parsed.
+            states: The state of each parser before the first chunk. Defaults to
+                None, which starts every parser in "origin".
+
+        Raises:
+            ValueError: If the number of handlers or states does not match the
+                number of parsers.
+            AllFailedToParseException: If a parser fails on a chunk, and failures
+                are not isolated. chunk_provider is closed, see `Parser.parse`.
+
+        Returns:
+            The state of each parser after the last chunk, or after its failure.
+        """
+        count = len(self.parsers)
+        if len(handlers) != count:
+            raise ValueError(f"Expected {count} handlers, got {len(handlers)}.")
+        current = ["origin"] * count if states is None else list(states)
+        if len(current) != count:
+            raise ValueError(f"Expected {count} states, got {len(current)}.")
+        self.failures = {}
+        try:
+            return self._parse(handlers, chunk_provider, current)
+        except BaseException:
+            close_chunks(chunk_provider)
+            raise
+
+    def _parse(
+        self,
+        handlers: Sequence[ParseResultHandler],
+        chunk_provider: ChunkIterator,
+        current: List[str],
+    ) -> List[str]:
+        count = len(self.parsers)
+        with ExitStack() as stack:
+            steps = []
+            for parser, handler in zip(self.parsers, handlers):
+                step, timer = parser.stepper(handler)
+                if timer is not None:
+                    stack.enter_context(timer)
+                steps.append(step)
+            active = list(enumerate(steps))
+            for chunk in chunk_provider:
+                for index, step in active:
+                    try:
+                        current[index] = step(chunk, current[index])
+                    except AllFailedToParseException as exc:
+                        if not self.isolate_failures:
+                            raise
+                        self.failures[index] = exc
+                if self.failures and len(self.failures) != count - len(active):
+                    active = [item for item in active if item[0] not in self.failures]
+                if not active:
+                    break
+        return current
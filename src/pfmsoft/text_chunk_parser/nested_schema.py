@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+#
+#  nested_schema.py
+#  _project_
+#
+#  Created by Chad Lowe on 2026-10-19.
+#  Copyright 2026 Chad Lowe. All rights reserved.
+#
+"""
+Nest small schemas with a stack, instead of one flat set of states.
+
+A `NestedParseSchema` holds named sub-schemas, each an ordinary `ParseSchema`
+such as a `CompiledParseSchema`, with its own small set of states. Parsers return
+states relative to their sub-schema:
+
+- `"state"`: move to state, in the same sub-schema.
+- `"push:name"`: enter the sub-schema name at its start state. The current
+  sub-schema keeps its state, and resumes in it after the matching pop.
+- `"pop"`: return to the sub-schema that pushed the current one.
+- `"pop:state"`: return, and move the parent sub-schema to state.
+
+The full state is the stack as a path, eg. `key_value/list:list_value`. The
+root frame is only its state, so a parse starts in `"origin"` as usual, and the
+other frames are `name:state`. Names of sub-schemas and their states must not
+contain `/` or `:`.
+
+Candidate lists and transitions are cached per path, so after the first time a
+path is seen, dispatch is one dict lookup. Deep or recursive nesting can reach
+any number of paths, so each cache is cleared when it holds `_CACHE_SIZE`
+entries. A cache entry is the same whichever parse fills it, so a schema can be
+shared by parses on several threads.
+
+Usage::
+
+    schema = NestedParseSchema(
+        {"document": compile_schema(document), "list": compile_schema(list_items)},
+        root="document",
+    )
+    Parser(schema).parse(handler, chunks)
+"""
+from typing import Dict, Sequence, Tuple
+
+from pfmsoft.text_chunk_parser.chunk_parser import (
+    ChunkParser,
+    ChunkParserException,
+    ParseSchema,
+)
+
+PUSH = "push:"
+POP = "pop"
+_RESERVED = set("/:")
+# The most paths in each of the candidate list and transition caches.
+_CACHE_SIZE = 1024
+
+
+class NestedStateException(ChunkParserException):
+    """The exception raised when a push or pop can not be applied to the stack."""
+
+
+class NestedParseSchema(ParseSchema):
+    """
+    A `ParseSchema` that keeps a stack of sub-schemas.
+    """
+
+    def __init__(
+        self,
+        schemas: Dict[str, ParseSchema],
+        root: str,
+        start_state: str = "origin",
+    ) -> None:
+        """
+        Args:
+            schemas: The sub-schemas by name.
+            root: The name of the sub-schema a parse starts in.
+            start_state: The state each sub-schema starts in when pushed. Defaults
+                to "origin".
+
+        Raises:
+            ValueError: If root is not in schemas, or a name uses `/` or `:`.
+        """
+        if root not in schemas:
+            raise ValueError(f"Root schema {root!r} is not in schemas.")
+        for name in [*schemas, start_state]:
+            if _RESERVED.intersection(name):
+                raise ValueError(f"Name {name!r} must not contain '/' or ':'.")
+        self.schemas = schemas
+        self.root = root
+        self.start_state = start_state
+        self._expected: Dict[str, Sequence[ChunkParser]] = {}
+        self._transitions: Dict[Tuple[str, str], str] = {}
+
+    @staticmethod
+    def top(state: str, root: str) -> Tuple[str, str]:
+        """Split the top frame of a path into (sub-schema name, state)."""
+        _, separator, frame = state.rpartition("/")
+        if not separator:
+            return root, state
+        name, _, local_state = frame.partition(":")
+        return name, local_state
+
+    @staticmethod
+    def depth(state: str) -> int:
+        """The number of sub-schemas pushed on top of the root."""
+        return state.count("/")
+
+    def expected(self, state: str) -> Sequence[ChunkParser]:
+        parsers = self._expected.get(state, None)
+        if parsers is None:
+            name, local_state = self.top(state, self.root)
+            parsers = self.schemas[name].expected(local_state)
+            if len(self._expected) >= _CACHE_SIZE:
+                self._expected.clear()
+            self._expected[state] = parsers
+        return parsers
+
+    def next_state(self, state: str, new_state: str) -> str:
+        if new_state is state:
+            return state
+        key = (state, new_state)
+        resolved = self._transitions.get(key, None)
+        if resolved is None:
+            resolved = self._resolve(state, new_state)
+            if len(self._transitions) >= _CACHE_SIZE:
+                self._transitions.clear()
+            self._transitions[key] = resolved
+        return resolved
+
+    def _resolve(self, state: str, new_state: str) -> str:
+        if new_state == state:
+            # Parsers that keep the current state return the whole path.
+            return state
+        if new_state.startswith(PUSH):
+            name = new_state[len(PUSH) :]
+            if name not in self.schemas:
+                raise NestedStateException(
+                    f"Can not push {name!r} in state {state!r}, it is not a "
+                    "sub-schema."
+                )
+            return f"{state}/{name}:{self.start_state}"
+        if new_state == POP or new_state.startswith(POP + ":"):
+            parent, separator, _ = state.rpartition("/")
+            if not separator:
+                raise NestedStateException(
+                    f"Can not pop in state {state!r}, already at the root schema."
+                )
+            if new_state == POP:
+                return parent
+            return self._replace_top(parent, new_state[len(POP) + 1 :])
+        if _RESERVED.intersection(new_state):
+            raise NestedStateException(
+                f"Can not move to {new_state!r} in state {state!r}, states must "
+                "not contain '/' or ':'."
+            )
+        return self._replace_top(state, new_state)
+
+    def _replace_top(self, state: str, local_state: str) -> str:
+        head, separator, frame = state.rpartition("/")
+        if not separator:
+            return local_state
+        name = frame.partition(":")[0]
+        return f"{head}/{name}:{local_state}"
@@ -0,0 +1,493 @@
+# -*- coding: utf-8 -*-
+#
+#  pattern_engines.py
+#  _project_
+#
+#  Created by Chad Lowe on 2026-10-19.
+#  Copyright 2026 Chad Lowe. All rights reserved.
+#
+"""
+Pluggable pattern engines for the regex parsers.
+
+`compile_pattern` compiles a pattern with the first engine, in order of
+preference, that supports it, and falls back to the stdlib `re`. Every engine
+returns a compiled pattern with the `re.Pattern` methods the parsers use,
+`match`, `pattern`, `flags` and `groupindex`, and matches return `re.Match`
+compatible objects.
+
+The engines:
+
+- "re": The stdlib `re`, a backtracking engine. Always available.
+- "dfa": A lazily built DFA, for patterns made of literals, character classes,
+  groups, alternation and repeats. Lines are rejected in linear time, and only
+  lines that match are passed to `re`, for the groups. Backreferences,
+  lookaround, word boundaries, possessive repeats, and the IGNORECASE, LOCALE
+  and MULTILINE flags are not supported.
+- "re2": Google RE2, linear time, when the `google-re2` package is installed.
+  Patterns outside the RE2 syntax fall back. RE2 classes like `\\d` are ASCII
+  only, and `$` is only supported at the end of a line, after `\\n`.
+
+The linear time engines are not affected by the catastrophic backtracking that
+`regex_lint` warns about. They are usually slower than `re` on ordinary
+patterns, compare them with `benchmarks/bench_engines.py`.
+
+Usage::
+
+    pattern, engine = compile_pattern(r"^\\s*(\\w+\\s?)*:\\n$", engine=["re2", "dfa"])
+"""
+import re
+from importlib.util import find_spec
+from logging import NullHandler, getLogger
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+try:
+    # pylint: disable=no-name-in-module
+    from re import _constants as sre_constants  # type: ignore
+    from re import _parser as sre_parse  # type: ignore
+except ImportError:  # Python < 3.11
+    import sre_constants  # type: ignore # pylint: disable=deprecated-module
+    import sre_parse  # type: ignore # pylint: disable=deprecated-module
+
+logger = getLogger(__name__)
+logger.addHandler(NullHandler())
+
+# A predicate on the code point of a character, or the value of a byte.
+_CharTest = Callable[[int], bool]
+
+
+class UnsupportedPatternException(ValueError):
+    """The exception raised when an engine can not compile a pattern."""
+
+
+class PatternEngine:
+    """
+    Compiles patterns for matching chunk text.
+
+    Subclass, and add the engine to `ENGINES` to make it available by name.
+    """
+
+    name = ""
+    # True if matching takes linear time in the length of the text.
+    linear = False
+
+    def available(self) -> bool:
+        """True if the engine can be used, eg. its package is installed."""
+        return True
+
+    def compile(self, regex: re.Pattern) -> Any:
+        """
+        Compile a pattern.
+
+        Args:
+            regex: The pattern, already compiled with `re`, which has validated
+                it.
+
+        Raises:
+            UnsupportedPatternException: If the engine does not support the
+                pattern.
+
+        Returns:
+            The compiled pattern.
+        """
+        raise NotImplementedError
+
+
+class ReEngine(PatternEngine):
+    """The stdlib `re` engine."""
+
+    name = "re"
+
+    def compile(self, regex: re.Pattern) -> re.Pattern:
+        return regex
+
+
+class Re2Engine(PatternEngine):
+    """The Google RE2 engine, from the optional `google-re2` package."""
+
+    name = "re2"
+    linear = True
+
+    def available(self) -> bool:
+        return find_spec("re2") is not None
+
+    def compile(self, regex: re.Pattern) -> Any:
+        import re2  # type: ignore # pylint: disable=import-outside-toplevel
+
+        if regex.flags & ~re.UNICODE:
+            raise UnsupportedPatternException("Flags are not supported.")
+        if _end_not_after_newline(sre_parse.parse(regex.pattern, regex.flags)):
+            # RE2 $ only matches at the very end, re also matches before a
+            # final \n.
+            raise UnsupportedPatternException("$ is only supported after \\n.")
+        try:
+            return re2.compile(regex.pattern)
+        except re2.error as exc:
+            raise UnsupportedPatternException(str(exc)) from exc
+
+
+def _end_not_after_newline(items) -> bool:
+    """True if a $ in parsed pattern items does not follow a literal \\n."""
+    previous = None
+    for op, value in items:
+        if op is sre_constants.AT and value is sre_constants.AT_END:
+            if previous != (sre_constants.LITERAL, 10):
+                return True
+        elif op in _REPEATS:
+            if _end_not_after_newline(value[2]):
+                return True
+        elif op is sre_constants.SUBPATTERN:
+            if _end_not_after_newline(value[-1]):
+                return True
+        elif op is sre_constants.BRANCH:
+            if any(_end_not_after_newline(branch) for branch in value[1]):
+                return True
+        previous = (op, value)
+    return False
+
+
+_REPEATS = {
+    sre_constants.MAX_REPEAT,
+    sre_constants.MIN_REPEAT,
+}
+# The most copies of a repeated item, and NFA nodes, in a DFA pattern.
+_MAX_REPEAT_COPIES = 100
+_MAX_NFA_NODES = 10_000
+_ASCII_SPACE = frozenset(b" \t\n\r\f\v")
+
+
+def _range_test(low: int, high: int) -> _CharTest:
+    """A character test for a range in a class, eg. `a-z`."""
+
+    def test(code: int) -> bool:
+        return low <= code <= high
+
+    return test
+
+
+def _category_test(category, ascii_only: bool) -> _CharTest:
+    """A character test for a `\\d`, `\\s` or `\\w` class, or its negation."""
+    if ascii_only:
+        tests: Dict[Any, _CharTest] = {
+            sre_constants.CATEGORY_DIGIT: lambda code: 48 <= code <= 57,
+            sre_constants.CATEGORY_SPACE: lambda code: code in _ASCII_SPACE,
+            sre_constants.CATEGORY_WORD: lambda code: code < 128
+            and (chr(code).isalnum() or code == 95),
+        }
+    else:
+        tests = {
+            sre_constants.CATEGORY_DIGIT: lambda code: chr(code).isdecimal(),
+            sre_constants.CATEGORY_SPACE: lambda code: chr(code).isspace(),
+            sre_constants.CATEGORY_WORD: lambda code: chr(code).isalnum() or code == 95,
+        }
+    negated = {
+        sre_constants.CATEGORY_NOT_DIGIT: sre_constants.CATEGORY_DIGIT,
+        sre_constants.CATEGORY_NOT_SPACE: sre_constants.CATEGORY_SPACE,
+        sre_constants.CATEGORY_NOT_WORD: sre_constants.CATEGORY_WORD,
+    }
+    if category in tests:
+        return tests[category]
+    if category in negated:
+        test = tests[negated[category]]
+        return lambda code: not test(code)
+    raise UnsupportedPatternException(f"Class {category} is not supported.")
+
+
+class _Nfa:
+    """
+    A Thompson NFA built from parsed pattern items, with the groups ignored.
+
+    Node 0 is the start, and `final` the accepting node.
+    """
+
+    def __init__(self, parsed, flags: int, ascii_only: bool) -> None:
+        self.dotall = bool(flags & re.DOTALL)
+        self.ascii_only = ascii_only
+        # Character edges (test, target), and epsilon edges, of each node.
+        self.edges: List[List[Tuple[_CharTest, int]]] = []
+        self.epsilons: List[List[int]] = []
+        items = list(parsed)
+        if items and items[0] in (
+            (sre_constants.AT, sre_constants.AT_BEGINNING),
+            (sre_constants.AT, sre_constants.AT_BEGINNING_STRING),
+        ):
+            # Matches are anchored at the start anyway.
+            items = items[1:]
+        # None, or the $ or \Z that ends the pattern.
+        self.end = None
+        if items and items[-1][0] is sre_constants.AT:
+            if items[-1][1] in (sre_constants.AT_END, sre_constants.AT_END_STRING):
+                self.end = items[-1][1]
+                items = items[:-1]
+        start = self._node()
+        self.final = self._sequence(items, start)
+
+    def _node(self) -> int:
+        if len(self.edges) >= _MAX_NFA_NODES:
+            raise UnsupportedPatternException("The pattern is too large for a DFA.")
+        self.edges.append([])
+        self.epsilons.append([])
+        return len(self.edges) - 1
+
+    def _char(self, test: _CharTest, start: int) -> int:
+        end = self._node()
+        self.edges[start].append((test, end))
+        return end
+
+    def _sequence(self, items, start: int) -> int:
+        """Add the items after node start, and return the end node."""
+        for op, value in items:
+            start = self._item(op, value, start)
+        return start
+
+    def _item(self, op, value, start: int) -> int:
+        if op is sre_constants.LITERAL:
+            return self._char(lambda code: code == value, start)
+        if op is sre_constants.NOT_LITERAL:
+            return self._char(lambda code: code != value, start)
+        if op is sre_constants.ANY:
+            if self.dotall:
+                return self._char(lambda code: True, start)
+            return self._char(lambda code: code != 10, start)
+        if op is sre_constants.IN:
+            return self._char(self._class_test(value), start)
+        if op is sre_constants.SUBPATTERN:
+            _group, add_flags, del_flags, items = value
+            if add_flags or del_flags:
+                raise UnsupportedPatternException("Scoped flags are not supported.")
+            return self._sequence(items, start)
+        if op is sre_constants.BRANCH:
+            end = self._node()
+            for branch in value[1]:
+                branch_start = self._node()
+                self.epsilons[start].append(branch_start)
+                self.epsilons[self._sequence(branch, branch_start)].append(end)
+            return end
+        if op in _REPEATS:
+            return self._repeat(value, start)
+        raise UnsupportedPatternException(f"{op} is not supported.")
+
+    def _repeat(self, value, start: int) -> int:
+        low, high, items = value
+        unbounded = high == sre_constants.MAXREPEAT
+        if low + (0 if unbounded else high - low) > _MAX_REPEAT_COPIES:
+            raise UnsupportedPatternException("The repeat count is too large.")
+        for _ in range(low):
+            start = self._sequence(items, start)
+        if unbounded:
+            loop = self._node()
+            self.epsilons[start].append(loop)
+            self.epsilons[self._sequence(items, loop)].append(loop)
+            return loop
+        end = self._node()
+        for _ in range(high - low):
+            self.epsilons[start].append(end)
+            start = self._sequence(items, start)
+        self.epsilons[start].append(end)
+        return end
+
+    def _class_test(self, items) -> _CharTest:
+        negate = False
+        tests: List[_CharTest] = []
+        literals = set()
+        for op, value in items:
+            if op is sre_constants.NEGATE:
+                negate = True
+            elif op is sre_constants.LITERAL:
+                literals.add(value)
+            elif op is sre_constants.RANGE:
+                tests.append(_range_test(*value))
+            elif op is sre_constants.CATEGORY:
+                tests.append(_category_test(value, self.ascii_only))
+            else:
+                raise UnsupportedPatternException(f"{op} is not supported in a class.")
+        if literals:
+            tests.append(frozenset(literals).__contains__)
+
+        def test(code: int) -> bool:
+            return any(member(code) for member in tests) != negate
+
+        return test
+
+    def closure(self, nodes) -> frozenset:
+        """The nodes, and every node reached from them by epsilon edges."""
+        seen = set(nodes)
+        stack = list(nodes)
+        while stack:
+            for node in self.epsilons[stack.pop()]:
+                if node not in seen:
+                    seen.add(node)
+                    stack.append(node)
+        return frozenset(seen)
+
+
+class _DfaState:
+    """A set of NFA nodes, with its transitions built as they are needed."""
+
+    __slots__ = ("nodes", "next", "accepting")
+
+    def __init__(self, nodes: frozenset, accepting: bool) -> None:
+        self.nodes = nodes
+        self.next: Dict[Any, "_DfaState"] = {}
+        self.accepting = accepting
+
+
+class DfaPattern:
+    """
+    A pattern matched by a lazily built DFA, then by `re` for the groups.
+
+    Safe to share between threads. The DFA states are built at most once each,
+    up to max_states, after which new states are rebuilt on every use.
+    """
+
+    def __init__(self, regex: re.Pattern, max_states: int = 4096) -> None:
+        """
+        Args:
+            regex: The pattern compiled with `re`.
+            max_states: The most DFA states to keep. Defaults to 4096.
+
+        Raises:
+            UnsupportedPatternException: If the pattern is not supported.
+        """
+        if regex.flags & (re.IGNORECASE | re.LOCALE | re.MULTILINE):
+            raise UnsupportedPatternException(
+                "IGNORECASE, LOCALE and MULTILINE are not supported."
+            )
+        self.regex = regex
+        self.max_states = max_states
+        ascii_only = isinstance(regex.pattern, bytes) or bool(regex.flags & re.ASCII)
+        parsed = sre_parse.parse(regex.pattern, regex.flags)
+        self._nfa = _Nfa(parsed, regex.flags, ascii_only)
+        self._states: Dict[frozenset, _DfaState] = {}
+        self._dead = self._state(frozenset())
+        self._start = self._state(self._nfa.closure([0]))
+
+    @property
+    def pattern(self):
+        return self.regex.pattern
+
+    @property
+    def flags(self) -> int:
+        return self.regex.flags
+
+    @property
+    def groupindex(self):
+        return self.regex.groupindex
+
+    @property
+    def groups(self) -> int:
+        return self.regex.groups
+
+    def __reduce__(self):
+        return (self.__class__, (self.regex, self.max_states))
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.regex.pattern!r})"
+
+    def _state(self, nodes: frozenset) -> _DfaState:
+        state = self._states.get(nodes, None)
+        if state is None:
+            state = _DfaState(nodes, self._nfa.final in nodes)
+            if len(self._states) < self.max_states:
+                state = self._states.setdefault(nodes, state)
+        return state
+
+    def _step(self, state: _DfaState, char) -> _DfaState:
+        """Build the transition from state on char."""
+        code = char if isinstance(char, int) else ord(char)
+        edges = self._nfa.edges
+        targets = [
+            target for node in state.nodes for test, target in edges[node] if test(code)
+        ]
+        next_state = self._state(self._nfa.closure(targets) if targets else frozenset())
+        if self._states.get(next_state.nodes, None) is next_state:
+            state.next[char] = next_state
+        return next_state
+
+    def accepts(self, text) -> bool:
+        """True if the pattern matches at the start of text."""
+        state = self._start
+        dead = self._dead
+        end = self._nfa.end
+        if end is None:
+            if state.accepting:
+                return True
+            for char in text:
+                state = state.next.get(char, None) or self._step(state, char)
+                if state.accepting:
+                    return True
+                if state is dead:
+                    return False
+            return False
+        # $ also matches before a final \n.
+        last = len(text) - 1
+        before_last = False
+        for index, char in enumerate(text):
+            before_last = state.accepting
+            state = state.next.get(char, None) or self._step(state, char)
+            if state is dead:
+                if index != last:
+                    return False
+                break
+        return state.accepting or (
+            before_last and end is sre_constants.AT_END and text[-1:] in ("\n", b"\n")
+        )
+
+    def match(self, text):
+        """Match at the start of text, like `re.Pattern.match`."""
+        if not self.accepts(text):
+            return None
+        return self.regex.match(text)
+
+
+class DfaEngine(PatternEngine):
+    """Compiles patterns to a `DfaPattern`."""
+
+    name = "dfa"
+    linear = True
+
+    def compile(self, regex: re.Pattern) -> DfaPattern:
+        return DfaPattern(regex)
+
+
+ENGINES: Dict[str, PatternEngine] = {
+    engine.name: engine for engine in (ReEngine(), DfaEngine(), Re2Engine())
+}
+
+
+def compile_pattern(
+    pattern: str | bytes,
+    engine: str | Sequence[str] = "re",
+    flags: int = 0,
+) -> Tuple[Any, str]:
+    """
+    Compile a pattern with the first engine that supports it.
+
+    Args:
+        pattern: The regex pattern.
+        engine: The name of an engine in `ENGINES`, or names in order of
+            preference. Defaults to "re".
+        flags: The `re` flags. Defaults to 0.
+
+    Raises:
+        re.error: If the pattern is invalid.
+        ValueError: If an engine name is unknown.
+
+    Returns:
+        The compiled pattern, and the name of the engine that compiled it. "re"
+        if no preferred engine supports the pattern.
+    """
+    names = [engine] if isinstance(engine, str) else list(engine)
+    unknown = [name for name in names if name not in ENGINES]
+    if unknown:
+        raise ValueError(f"Unknown pattern engines {unknown!r}, use {list(ENGINES)}.")
+    regex = re.compile(pattern, flags)
+    for name in names:
+        pattern_engine = ENGINES[name]
+        if not pattern_engine.available():
+            logger.info("Pattern engine %r is not installed.", name)
+            continue
+        try:
+            return pattern_engine.compile(regex), name
+        except UnsupportedPatternException as exc:
+            logger.info("Pattern engine %r can not compile %r. %s", name, pattern, exc)
+    return regex, "re"
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+#
+#  profiling.py
+#  _project_
+#
+#  Created by Chad Lowe on 2026-10-19.
+#  Copyright 2026 Chad Lowe. All rights reserved.
+#
+"""
+Find the slow regions of a file, and the slow states, by sampling chunks.
+
+A `SamplingProfiler` passed to `Parser` times one chunk in every `every`, from
+the attempt loop to the handler, and records its line number, state and time.
+The other chunks only pay for a countdown. Each sample also keeps when it was
+taken, so the throughput between samples shows slow stretches of the file even
+where the cost is outside the sampled chunk, eg. in reading.
+
+The samples are summarized by state, and by region of the file, and exported as
+JSON, or as collapsed stacks for flame graph tools::
+
+    profiler = SamplingProfiler(every=100)
+    Parser(schema, profiler=profiler).parse(handler, chunks)
+    profiler.write_json("profile.json")
+    profiler.write_collapsed("profile.folded")  # flamegraph.pl profile.folded
+
+Per chunk times are estimates, each sample stands for `every` chunks.
+"""
+import json
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Tuple
+
+from pfmsoft.text_chunk_parser.chunk_iterator import Chunk
+
+
+@dataclass
+class ProfileSample:
+    """
+    One sampled chunk.
+
+    Args:
+        source: The source of the chunk.
+        count: The line number of the chunk.
+        state: The state the chunk was parsed in.
+        seconds: The time to parse the chunk and handle the result.
+        at: When the sample was taken, in seconds since the profiler started.
+    """
+
+    source: str
+    count: int
+    state: str
+    seconds: float
+    at: float
+
+
+class SamplingProfiler:
+    """
+    Samples one chunk in every `every` of the parses it is passed to.
+    """
+
+    def __init__(self, every: int = 100) -> None:
+        """
+        Args:
+            every: The number of chunks per sample. Defaults to 100.
+
+        Raises:
+            ValueError: If every is less than 1.
+        """
+        if every < 1:
+            raise ValueError(f"every must be at least 1, got {every}.")
+        self.every = every
+        self.samples: List[ProfileSample] = []
+        self.started = perf_counter()
+
+    def wrap(self, step: Callable[[Chunk, str], str]) -> Callable[[Chunk, str], str]:
+        """Sample the chunks of a `Parser.stepper` step function."""
+        every = self.every
+        countdown = every
+        append = self.samples.append
+        started = self.started
+
+        def sampled_step(chunk: Chunk, state: str) -> str:
+            nonlocal countdown
+            countdown -= 1
+            if countdown:
+                return step(chunk, state)
+            countdown = every
+            start = perf_counter()
+            new_state = step(chunk, state)
+            end = perf_counter()
+            sample = ProfileSample(
+                chunk.source, chunk.count, state, end - start, end - started
+            )
+            append(sample)
+            return new_state
+
+        return sampled_step
+
+    def by_state(self) -> Dict[str, Dict[str, float]]:
+        """
+        The samples of each state.
+
+        Returns:
+            For each state, the number of samples, the mean seconds per chunk, and
+            the estimated total seconds, slowest total first.
+        """
+        seconds: Dict[str, List[float]] = defaultdict(list)
+        for sample in self.samples:
+            seconds[sample.state].append(sample.seconds)
+        summary = {
+            state: {
+                "samples": len(values),
+                "mean_seconds": sum(values) / len(values),
+                "estimated_seconds": sum(values) * self.every,
+            }
+            for state, values in seconds.items()
+        }
+        return dict(
+            sorted(summary.items(), key=lambda item: -item[1]["estimated_seconds"])
+        )
+
+    def by_region(self, lines: int = 10000) -> List[Dict[str, Any]]:
+        """
+        The samples in each region of lines of each source.
+
+        Args:
+            lines: The number of lines in a region. Defaults to 10000.
+
+        Returns:
+            For each region with samples, in source and line order: the source,
+            first and last line, number of samples, mean seconds per sampled chunk,
+            and lines per second between the samples of the region. Throughput is
+            None for a region with less than two samples.
+        """
+        regions: Dict[Tuple[str, int], List[ProfileSample]] = defaultdict(list)
+        for sample in self.samples:
+            regions[(sample.source, (sample.count - 1) // lines)].append(sample)
+        summary = []
+        for (source, region), samples in sorted(regions.items()):
+            first, last = samples[0], samples[-1]
+            throughput = None
+            if len(samples) > 1 and last.at > first.at:
+                throughput = (last.count - first.count) / (last.at - first.at)
+            summary.append(
+                {
+                    "source": source,
+                    "first_line": region * lines + 1,
+                    "last_line": (region + 1) * lines,
+                    "samples": len(samples),
+                    "mean_seconds": sum(x.seconds for x in samples) / len(samples),
+                    "lines_per_second": throughput,
+                }
+            )
+        return summary
+
+    def to_json(self, lines: int = 10000) -> Dict[str, Any]:
+        """The samples and both summaries, as a JSON compatible dict."""
+        return {
+            "every": self.every,
+            "by_state": self.by_state(),
+            "by_region": self.by_region(lines),
+            "samples": [asdict(sample) for sample in self.samples],
+        }
+
+    def write_json(self, path: Path | str, lines: int = 10000):
+        """Write `to_json` to a file."""
+        with open(path, "w", encoding="utf-8") as stream:
+            json.dump(self.to_json(lines), stream, indent=2)
+
+    def collapsed(self, lines: int = 10000) -> List[str]:
+        """
+        The samples as collapsed stacks, `source;lines first-last;state value`.
+
+        The value is the estimated microseconds spent, so a flame graph shows the
+        expensive regions, and the states within them.
+        """
+        totals: Dict[str, float] = defaultdict(float)
+        for sample in self.samples:
+            first = (sample.count - 1) // lines * lines + 1
+            frames = (
+                sample.source or "<unknown>",
+                f"lines {first}-{first + lines - 1}",
+                sample.state,
+            )
+            # Frames are separated by ";", and the value by the last space.
+            stack = ";".join(frame.replace(";", ":") for frame in frames)
+            totals[stack] += sample.seconds * self.every * 1e6
+        return [f"{stack} {round(value)}" for stack, value in totals.items()]
+
+    def write_collapsed(self, path: Path | str, lines: int = 10000):
+        """Write `collapsed` to a file, one stack per line."""
+        with open(path, "w", encoding="utf-8") as stream:
+            stream.writelines(f"{stack}\n" for stack in self.collapsed(lines))
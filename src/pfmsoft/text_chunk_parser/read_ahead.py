@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+#
+#  read_ahead.py
+#  _project_
+#
+#  Created by Chad Lowe on 2026-10-19.
+#  Copyright 2026 Chad Lowe. All rights reserved.
+#
+"""
+Consume an iterator on a background thread.
+
+Reading, decompressing and decoding release the GIL for most of their work, so
+running them on a background thread overlaps them with parsing on the main
+thread. The queue between the threads is bounded, so the reader never gets more
+than `max_items` ahead of the parser.
+"""
+from itertools import islice
+from queue import Empty, Full, Queue
+from threading import Event, Thread
+from typing import Any, Iterable, Iterator, List
+
+_POLL_SECONDS = 0.1
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[List]:
+    """
+    Group items into lists of up to size items.
+
+    Passing batches instead of single items keeps the per item cost of the queue
+    between threads low.
+    """
+    iterator = iter(iterable)
+    size = max(size, 1)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class _Done:
+    """Marks the end of the source iterator."""
+
+
+class _Failed:
+    """Carries an exception raised by the source iterator."""
+
+    def __init__(self, exc: BaseException) -> None:
+        self.exc = exc
+
+
+class ReadAheadIterator:
+    """
+    An iterator that reads ahead from another iterator on a background thread.
+
+    The background thread starts on the first `__next__`. Exceptions raised by
+    the source iterator are raised again from `__next__`. Call `close`, or use as
+    a context manager, to stop the background thread if the iterator is not
+    consumed to the end.
+    """
+
+    def __init__(self, iterable: Iterable, max_items: int = 4, name: str = "") -> None:
+        """
+        Args:
+            iterable: The source iterable, consumed on the background thread.
+            max_items: The maximum number of items read ahead. Minimum 1.
+                Defaults to 4.
+            name: Optional name for the background thread. Defaults to "".
+        """
+        self.queue: Queue = Queue(maxsize=max(max_items, 1))
+        self.stopped = Event()
+        self.exhausted = False
+        self.thread = Thread(
+            target=self._read,
+            args=(iter(iterable),),
+            name=name or None,
+            daemon=True,
+        )
+        self.started = False
+
+    def _put(self, item: Any) -> bool:
+        while not self.stopped.is_set():
+            try:
+                self.queue.put(item, timeout=_POLL_SECONDS)
+                return True
+            except Full:
+                continue
+        return False
+
+    def _read(self, iterator):
+        try:
+            for item in iterator:
+                if not self._put(item):
+                    return
+        except BaseException as exc:  # pylint: disable=broad-except
+            self._put(_Failed(exc))
+            return
+        self._put(_Done())
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.exhausted:
+            raise StopIteration
+        if not self.started:
+            self.started = True
+            self.thread.start()
+        item = self.queue.get()
+        if isinstance(item, _Done):
+            self.exhausted = True
+            raise StopIteration
+        if isinstance(item, _Failed):
+            self.exhausted = True
+            raise item.exc
+        return item
+
+    def close(self):
+        """Stop the background thread, discarding anything read ahead."""
+        self.stopped.set()
+        self.exhausted = True
+        while True:
+            try:
+                self.queue.get_nowait()
+            except Empty:
+                break
+        if self.started:
+            self.thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+#
+#  regex_lint.py
+#  _project_
+#
+#  Created by Chad Lowe on 2026-10-19.
+#  Copyright 2026 Chad Lowe. All rights reserved.
+#
+"""
+Flag regex patterns that can backtrack catastrophically.
+
+A repeated group that itself contains a repeat, eg. `(a+)+` or `(\\w+\\s?)*`, can
+match the same text in exponentially many ways. On a line that almost matches,
+the regex engine tries them all. The linter walks the parsed pattern, and flags
+every repeat nested inside another repeat. Possessive repeats and atomic groups
+do not backtrack, so they are not flagged.
+"""
+import re
+from typing import Iterable, List, Tuple
+
+try:
+    # pylint: disable=no-name-in-module
+    from re import _constants as sre_constants  # type: ignore
+    from re import _parser as sre_parse  # type: ignore
+except ImportError:  # Python < 3.11
+    import sre_constants  # type: ignore # pylint: disable=deprecated-module
+    import sre_parse  # type: ignore # pylint: disable=deprecated-module
+
+from pfmsoft.text_chunk_parser.chunk_parser import ChunkParser
+
+_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT}
+
+
+def nested_quantifiers(pattern: str | bytes, flags: int = 0) -> List[str]:
+    """
+    Find repeats nested inside other repeats.
+
+    Args:
+        pattern: The regex pattern.
+        flags: The regex flags. Defaults to 0.
+
+    Returns:
+        A description of each nested repeat, empty if there are none.
+    """
+    findings: List[str] = []
+    _walk(sre_parse.parse(pattern, flags), None, findings)
+    return findings
+
+
+def _walk(items, outer: str | None, findings: List[str]):
+    """Walk parsed pattern items, outer describes the enclosing repeat if any."""
+    for op, value in items:
+        if op in _REPEATS:
+            low, high, sub_pattern = value
+            repeat = _describe(low, high)
+            repeats = high == sre_constants.MAXREPEAT or high > 1
+            if outer is not None and repeats:
+                findings.append(f"Repeat {repeat} is nested inside repeat {outer}.")
+            _walk(sub_pattern, repeat if repeats else outer, findings)
+        elif op is sre_constants.SUBPATTERN:
+            _walk(value[-1], outer, findings)
+        elif op is sre_constants.BRANCH:
+            for branch in value[1]:
+                _walk(branch, outer, findings)
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            _walk(value[1], outer, findings)
+
+
+def _describe(low: int, high: int) -> str:
+    if high == sre_constants.MAXREPEAT:
+        return {0: "*", 1: "+"}.get(low, f"{{{low},}}")
+    if low == 0 and high == 1:
+        return "?"
+    return f"{{{low},{high}}}"
+
+
+def lint_parsers(parsers: Iterable[ChunkParser]) -> List[Tuple[ChunkParser, str]]:
+    """
+    Lint the `pattern` of each parser that has one compiled with `re`.
+
+    Returns:
+        (parser, finding) for each nested repeat found.
+    """
+    findings = []
+    for parser in parsers:
+        pattern = getattr(parser, "pattern", None)
+        if not isinstance(pattern, re.Pattern):
+            # No pattern, or one from a linear time engine, see `pattern_engines`.
+            continue
+        for finding in nested_quantifiers(pattern.pattern, pattern.flags):
+            findings.append((parser, f"{finding} Pattern: {pattern.pattern!r}"))
+    return findings
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+#
+#  result_transport.py
+#  _project_
+#
+#  Created by Chad Lowe on 2026-10-19.
+#  Copyright 2026 Chad Lowe. All rights reserved.
+#
+"""
+Pass parse results from worker processes through shared memory.
+
+Pickling every `ParseResult` back to the parent also pickles its `Chunk`, with
+the peek and past values, and its parser. Instead, a worker encodes the results
+of a shard into columns in one `multiprocessing.shared_memory` block:
+
+- line numbers and state codes, as arrays.
+- the parser, as its position in `ParseSchema.expected` for the state before the
+  parse, so the parent uses its own parser objects.
+- the line text, as one blob with end offsets, utf-8 encoded for str lines.
+- the parsed data, pickled with protocol 5 in batches of results, with end
+  offsets.
+- the peek and past values, pickled the same way, only if chunk context is
+  requested.
+
+Only the block name and section offsets are pickled back. The parent copies the
+block and releases it, then unpickles each batch as its first result is passed
+to the handler.
+"""
+import os
+import pickle
+from array import array
+from dataclasses import dataclass, field
+from itertools import accumulate
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from pfmsoft.text_chunk_parser.chunk_iterator import Chunk
+from pfmsoft.text_chunk_parser.chunk_parser import (
+    ChunkParser,
+    ParseResult,
+    ParseResultHandler,
+    ParseSchema,
+)
+from pfmsoft.text_chunk_parser.enumerated_iterator import Enumerated
+
+_TEXT_ERRORS = "surrogatepass"
+# Results per pickle of parsed data or chunk context.
+_PICKLE_BATCH = 1024
+
+
+@dataclass
+class ResultBlock:
+    """
+    Describes the encoded results of a shard, in a shared memory block.
+
+    Args:
+        name: The shared memory block name, None if there are no results.
+        start_state: The state before the first result.
+        states: The distinct states, indexed by state code.
+        sections: (offset, length) in the block for each encoded column.
+        source: The source name for decoded chunks.
+        binary: The lines are bytes, from a pipeline without an encoding.
+    """
+
+    name: str | None
+    start_state: str
+    states: List[str] = field(default_factory=list)
+    sections: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+    source: str = ""
+    binary: bool = False
+
+
+class EncodingHandler(ParseResultHandler):
+    """
+    Collects results in a worker, for `encode_results`.
+
+    Keeps only the fields needed to encode the results, so the chunk context is
+    released as the parse goes, unless it is requested.
+    """
+
+    def __init__(self, schema: ParseSchema, state: str, chunk_context: bool) -> None:
+        super().__init__()
+        self.schema = schema
+        self.start_state = state
+        self.state = state
+        self.chunk_context = chunk_context
+        self.source = ""
+        self.counts = array("q")
+        self.state_codes = array("l")
+        self.positions = array("l")
+        self.texts: List[str | bytes] = []
+        self.data: List = []
+        self.context: List[Tuple] = []
+        self._positions: Dict[str, Dict[int, int]] = {}
+
+    def _position(self, state: str, parser: ChunkParser) -> int:
+        positions = self._positions.get(state, None)
+        if positions is None:
+            positions = self._positions[state] = {}
+            for index, expected in enumerate(self.schema.expected(state)):
+                positions.setdefault(id(expected), index)
+        position = positions.get(id(parser), None)
+        if position is None:
+            raise ValueError(
+                f"{parser!r} is not expected in state {state!r}, results must come "
+                "from the schema parsers to be encoded."
+            )
+        return position
+
+    def parsed_data(self, parse_result: ParseResult):
+        chunk = parse_result.chunk
+        if chunk is None:
+            raise ValueError(
+                "Encoding results needs the chunk line, the parser retention mode "
+                "must be 'full' or 'line_only'."
+            )
+        self.source = chunk.source
+        self.counts.append(chunk.count)
+        self.state_codes.append(self.string_pool.encode(parse_result.new_state))
+        self.positions.append(self._position(self.state, parse_result.parser))
+        self.texts.append(chunk.text)
+        self.data.append(parse_result.data)
+        if self.chunk_context:
+            self.context.append((chunk.peek, chunk.past))
+        self.state = parse_result.new_state
+
+
+def encode_results(handler: EncodingHandler) -> ResultBlock:
+    """
+    Copy the results collected by handler into a new shared memory block.
+
+    The block is left open for the parent, which releases it after decoding.
+    """
+    block = ResultBlock(
+        None,
+        handler.start_state,
+        list(handler.string_pool.values),
+        source=handler.source,
+        binary=bool(handler.texts) and isinstance(handler.texts[0], bytes),
+    )
+    if not handler.counts:
+        return block
+    lines = [
+        text if isinstance(text, bytes) else text.encode("utf-8", _TEXT_ERRORS)
+        for text in handler.texts
+    ]
+    columns = {
+        "counts": handler.counts.tobytes(),
+        "state_codes": handler.state_codes.tobytes(),
+        "positions": handler.positions.tobytes(),
+        "text_ends": _ends(lines),
+        "text": b"".join(lines),
+    }
+    columns["data_ends"], columns["data"] = _pickles(handler.data)
+    if handler.chunk_context:
+        columns["context_ends"], columns["context"] = _pickles(handler.context)
+    offset = 0
+    for key, column in columns.items():
+        block.sections[key] = (offset, len(column))
+        offset += len(column)
+    memory = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    try:
+        buffer = memory.buf
+        assert buffer is not None
+        for key, column in columns.items():
+            start, length = block.sections[key]
+            buffer[start : start + length] = column
+        del buffer
+        block.name = memory.name
+    except BaseException:
+        memory.close()
+        memory.unlink()
+        raise
+    _hand_over(memory)
+    memory.close()
+    return block
+
+
+def _ends(values: Sequence[bytes]) -> bytes:
+    """The end offsets of values joined together."""
+    return array("q", accumulate(map(len, values))).tobytes()
+
+
+def _pickles(values: Sequence) -> Tuple[bytes, bytes]:
+    """Pickle values in batches, returns the end offsets and the joined pickles."""
+    pickles = [
+        pickle.dumps(values[start : start + _PICKLE_BATCH], protocol=5)
+        for start in range(0, len(values), _PICKLE_BATCH)
+    ]
+    return _ends(pickles), b"".join(pickles)
+
+
+def _hand_over(memory: shared_memory.SharedMemory):
+    """
+    Stop tracking a block created in a worker, the parent now owns it.
+
+    Otherwise the resource tracker of a worker started before the parent's tracker
+    unlinks the block when the worker exits, or warns that it leaked.
+    """
+    if os.name == "posix":
+        # pylint: disable=protected-access
+        resource_tracker.unregister(memory._name, "shared_memory")  # type: ignore
+
+
+def _column(buffer: memoryview, block: ResultBlock, key: str) -> memoryview:
+    start, length = block.sections[key]
+    return buffer[start : start + length]
+
+
+def _array(typecode: str, buffer: memoryview, block: ResultBlock, key: str) -> array:
+    values = array(typecode)
+    values.frombytes(_column(buffer, block, key))
+    return values
+
+
+def decode_results(
+    block: ResultBlock, schema: ParseSchema, handler: ParseResultHandler | None = None
+) -> Iterator[ParseResult]:
+    """
+    Decode the results in a block, one at a time, then release the block.
+
+    Args:
+        block: The block from `encode_results`.
+        schema: The schema the results were parsed with, used to find the parsers.
+        handler: Pools the states with its string pool, if given. Defaults to None.
+
+    Yields:
+        The results, with a `Chunk` holding the line, and the peek and past values
+        if they were encoded.
+    """
+    if block.name is None:
+        return
+    states = block.states
+    if handler is not None:
+        states = [handler.string_pool.intern(state) for state in states]
+    memory = shared_memory.SharedMemory(name=block.name)
+    try:
+        buffer = memory.buf
+        assert buffer is not None
+        # Copy the columns, so no views of the block outlive it.
+        counts = _array("q", buffer, block, "counts")
+        state_codes = _array("l", buffer, block, "state_codes")
+        positions = _array("l", buffer, block, "positions")
+        text_ends = _array("q", buffer, block, "text_ends")
+        text = bytes(_column(buffer, block, "text"))
+        data_ends = _array("q", buffer, block, "data_ends")
+        data = memoryview(bytes(_column(buffer, block, "data")))
+        context_ends = None
+        context = memoryview(b"")
+        if "context" in block.sections:
+            context_ends = _array("q", buffer, block, "context_ends")
+            context = memoryview(bytes(_column(buffer, block, "context")))
+        del buffer
+    finally:
+        memory.close()
+        memory.unlink()
+    state = block.start_state
+    text_start = 0
+    batch: Sequence = ()
+    context_batch: Sequence[Tuple] = ()
+    expected_cache: Dict[str, Sequence[ChunkParser]] = {}
+    for index, count in enumerate(counts):
+        parsers = expected_cache.get(state, None)
+        if parsers is None:
+            parsers = expected_cache[state] = schema.expected(state)
+        raw = text[text_start : text_ends[index]]
+        line = raw if block.binary else raw.decode("utf-8", _TEXT_ERRORS)
+        text_start = text_ends[index]
+        offset = index % _PICKLE_BATCH
+        if not offset:
+            # Each batch is unpickled only when its first result is yielded.
+            batch = _unpickle_batch(data, data_ends, index)
+            if context_ends is not None:
+                context_batch = _unpickle_batch(context, context_ends, index)
+        peek, past = context_batch[offset] if context_batch else ((), ())
+        new_state = states[state_codes[index]]
+        yield ParseResult(
+            new_state=new_state,
+            data=batch[offset],
+            parser=parsers[positions[index]],
+            chunk=Chunk(Enumerated(count, line), peek, past, block.source),
+        )
+        state = new_state
+
+
+def _unpickle_batch(pickles: memoryview, ends: array, index: int) -> Sequence:
+    """Unpickle the batch that starts with result index."""
+    number = index // _PICKLE_BATCH
+    start = ends[number - 1] if number else 0
+    return pickle.loads(pickles[start : ends[number]])
+
+
+def release_block(block: ResultBlock):
+    """Release a block that will not be decoded."""
+    if block.name is None:
+        return
+    try:
+        memory = shared_memory.SharedMemory(name=block.name)
+    except FileNotFoundError:
+        return
+    memory.close()
+    memory.unlink()
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+#
+#  schema_analysis.py
+#  _project_
+#
+#  Created by Chad Lowe on 2026-10-19.
+#  Copyright 2026 Chad Lowe. All rights reserved.
+#
+"""
+Check a `ParseSchema` for problems before a parse starts.
+
+The analysis walks the schema from the start state, following the states each
+parser declares it may return through `ChunkParser.possible_states`, resolved
+with `ParseSchema.next_state`. It reports:
+
+- missing states: reachable states that `ParseSchema.expected` can not provide.
+- empty states: reachable states without any parsers, every chunk would fail.
+- unreachable states: states from `ParseSchema.defined_states` never reached.
+  Only reported when every reachable parser declares its states.
+- shadowed parsers: parsers listed after a parser that matches any chunk.
+- undeclared parsers: parsers that do not declare their states, which leaves
+  the analysis incomplete.
+
+The transition graph is kept on the report, for use by other tools. Schemas
+with unbounded states, eg. a `NestedParseSchema` whose sub-schemas push each
+other recursively, are walked breadth first up to `max_states`, and the report
+is marked truncated.
+"""
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Tuple
+
+from pfmsoft.text_chunk_parser.chunk_parser import (
+    ChunkParser,
+    ChunkParserException,
+    ParseSchema,
+)
+
+
+class SchemaValidationException(ChunkParserException):
+    """The exception raised when schema analysis finds problems."""
+
+    def __init__(self, msg: str | None, report: "SchemaReport") -> None:
+        if msg is None:
+            msg = "Schema analysis found problems:\n\t" + "\n\t".join(report.problems())
+        super().__init__(msg)
+        self.report = report
+
+
+@dataclass
+class SchemaReport:
+    """
+    The result of `analyze_schema`.
+
+    Args:
+        start: The start state.
+        graph: The states reachable in one parse, for each reachable state.
+        missing_states: Reachable states the schema can not provide, with the
+            error message.
+        empty_states: Reachable states without parsers.
+        unreachable_states: Defined states that are never reached.
+        shadowed_parsers: (state, parser, shadowing parser) for parsers that can
+            never be tried.
+        undeclared_parsers: (state, parser) for parsers without declared states.
+        truncated: The walk stopped at max_states, before every reachable state
+            was found.
+    """
+
+    start: str
+    graph: Dict[str, Set[str]] = field(default_factory=dict)
+    missing_states: Dict[str, str] = field(default_factory=dict)
+    empty_states: List[str] = field(default_factory=list)
+    unreachable_states: List[str] = field(default_factory=list)
+    shadowed_parsers: List[Tuple[str, ChunkParser, ChunkParser]] = field(
+        default_factory=list
+    )
+    undeclared_parsers: List[Tuple[str, ChunkParser]] = field(default_factory=list)
+    truncated: bool = False
+
+    @property
+    def complete(self) -> bool:
+        """True if every reachable parser declared its states, and the walk found
+        every reachable state."""
+        return not self.undeclared_parsers and not self.truncated
+
+    def problems(self) -> List[str]:
+        """Describe each problem found, undeclared parsers are not problems."""
+        problems = [
+            f"State {state!r} is reachable, but not provided by the schema. {error}"
+            for state, error in self.missing_states.items()
+        ]
+        problems.extend(
+            f"State {state!r} has no parsers." for state in self.empty_states
+        )
+        problems.extend(
+            f"State {state!r} is defined, but can not be reached from "
+            f"{self.start!r}."
+            for state in self.unreachable_states
+        )
+        problems.extend(
+            f"In state {state!r}, {parser!r} is never tried, {shadow!r} matches "
+            "any chunk."
+            for state, parser, shadow in self.shadowed_parsers
+        )
+        return problems
+
+
+def analyze_schema(
+    schema: ParseSchema, start: str = "origin", max_states: int = 1000
+) -> SchemaReport:
+    """
+    Analyze the states and parsers of a schema.
+
+    Args:
+        schema: The schema to analyze.
+        start: The state a parse starts in. Defaults to "origin".
+        max_states: The most states to walk. Defaults to 1000.
+
+    Returns:
+        The analysis report.
+    """
+    report = SchemaReport(start=start)
+    pending = deque([start])
+    while pending:
+        state = pending.popleft()
+        if state in report.graph or state in report.missing_states:
+            continue
+        if len(report.graph) >= max_states:
+            report.truncated = True
+            break
+        try:
+            parsers = schema.expected(state)
+        except Exception as exc:  # pylint: disable=broad-except
+            report.missing_states[state] = f"{exc.__class__.__name__}: {exc}"
+            continue
+        next_states: Set[str] = set()
+        report.graph[state] = next_states
+        if not parsers:
+            report.empty_states.append(state)
+        shadow: ChunkParser | None = None
+        for parser in parsers:
+            if shadow is not None:
+                report.shadowed_parsers.append((state, parser, shadow))
+                continue
+            if parser.matches_any:
+                shadow = parser
+            possible = parser.possible_states(state)
+            if possible is None:
+                report.undeclared_parsers.append((state, parser))
+                continue
+            for new_state in possible:
+                try:
+                    next_states.add(schema.next_state(state, new_state))
+                except Exception as exc:  # pylint: disable=broad-except
+                    reason = f"From state {state!r}, {exc.__class__.__name__}: {exc}"
+                    report.missing_states[new_state] = reason
+        pending.extend(sorted(next_states - set(report.graph)))
+    defined = schema.defined_states()
+    # Undeclared parsers could reach any state, so only a complete walk is trusted.
+    if defined is not None and report.complete:
+        report.unreachable_states = [
+            state for state in defined if state not in report.graph
+        ]
+    return report
+
+
+def validate_schema(
+    schema: ParseSchema, start: str = "origin", max_states: int = 1000
+) -> SchemaReport:
+    """
+    Analyze a schema, and raise if there are problems.
+
+    Args:
+        schema: The schema to validate.
+        start: The state a parse starts in. Defaults to "origin".
+        max_states: The most states to walk. Defaults to 1000.
+
+    Raises:
+        SchemaValidationException: If the analysis finds problems.
+
+    Returns:
+        The analysis report.
+    """
+    report = analyze_schema(schema, start, max_states)
+    if report.problems():
+        raise SchemaValidationException(None, report)
+    return report
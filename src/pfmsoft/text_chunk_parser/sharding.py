@@ -0,0 +1,416 @@
+# -*- coding: utf-8 -*-
+#
+#  sharding.py
+#  _project_
+#
+#  Created by Chad Lowe on 2026-10-19.
+#  Copyright 2026 Chad Lowe. All rights reserved.
+#
+"""
+Parse a single large file across processes, in byte range shards.
+
+Parsing is split into two phases:
+
+1. A pre-scan reads the whole file once with a light schema, whose parsers only
+   decide the next state, and records the state at each shard boundary. It runs
+   serially before any shard is parsed, so a heavy pre-scan schema limits the
+   speedup, see `parse_sharded`.
+2. Each shard is parsed in a process pool, starting from the pre-scanned state,
+   with line numbers continuing from the lines before the shard.
+
+Shard boundaries are moved forward to the start of a line. A shard reads past its
+end for the `peek` of its last chunks, but the `past` of its first chunks is
+empty. Results are passed to the handler in the parent process, in file order.
+
+The file must be uncompressed, since the shards seek to byte offsets. Parse hints
+from the parent handler are not available to parsers in the workers.
+
+Usage::
+
+    parse_sharded(path, Parser(schema), handler, prescan_schema=StateSchema())
+"""
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from pfmsoft.text_chunk_parser.chunk_iterator import Chunk, ChunkIterator
+from pfmsoft.text_chunk_parser.chunk_parser import (
+    ChunkParserException,
+    Parser,
+    ParseResult,
+    ParseResultHandler,
+    ParseSchema,
+)
+from pfmsoft.text_chunk_parser.result_transport import (
+    EncodingHandler,
+    ResultBlock,
+    decode_results,
+    encode_results,
+    release_block,
+)
+from pfmsoft.text_chunk_parser.sources import (
+    DEFAULT_BLOCK_SIZE,
+    iter_blocks,
+    iter_lines,
+    open_lines,
+)
+
+_TRANSPORTS = ("pickle", "shared_memory")
+
+
+class ShardParseException(ChunkParserException):
+    """The exception raised when a shard fails to parse."""
+
+    def __init__(self, msg: str, shard: "Shard") -> None:
+        super().__init__(f"Shard {shard.index} failed to parse. {msg}")
+        self.shard = shard
+
+
+@dataclass(frozen=True)
+class Shard:
+    """
+    A byte range of a file, starting at the start of a line.
+
+    Args:
+        index: The position of the shard in the file.
+        start: The byte offset of the first line.
+        end: The byte offset after the last line.
+        start_count: The number of lines before start.
+        end_count: The number of lines before end.
+        state: The parse state before the first line. Defaults to "origin".
+    """
+
+    index: int
+    start: int
+    end: int
+    start_count: int
+    end_count: int
+    state: str = "origin"
+
+
+def split_shards(
+    path: Path | str, shards: int, block_size: int = DEFAULT_BLOCK_SIZE
+) -> List[Shard]:
+    """
+    Split a file into about evenly sized shards, on line boundaries.
+
+    Fewer shards are returned if the file has too few lines.
+
+    Args:
+        path: The file to split.
+        shards: The number of shards wanted.
+        block_size: The number of bytes to read at a time. Defaults to
+            DEFAULT_BLOCK_SIZE.
+
+    Returns:
+        The shards, in file order.
+    """
+    size = os.path.getsize(path)
+    targets = [size * index // shards for index in range(1, max(shards, 1))]
+    # (byte offset, lines before offset) for the start of each shard.
+    boundaries: List[Tuple[int, int]] = [(0, 0)]
+    offset = count = 0
+    last_byte = b"\n"
+    with open(path, "rb") as stream:
+        for block in iter_blocks(stream, block_size):
+            pos = 0
+            while targets and targets[0] - 1 < offset + len(block):
+                newline = block.find(b"\n", max(targets[0] - 1 - offset, pos))
+                if newline == -1:
+                    break
+                count += block.count(b"\n", pos, newline + 1)
+                pos = newline + 1
+                if offset + pos < size:
+                    boundaries.append((offset + pos, count))
+                targets = [target for target in targets if target > offset + pos]
+            count += block.count(b"\n", pos)
+            offset += len(block)
+            last_byte = block[-1:]
+    if last_byte != b"\n":
+        count += 1
+    boundaries.append((size, count))
+    return [
+        Shard(index, start, end, start_count, end_count)
+        for index, ((start, start_count), (end, end_count)) in enumerate(
+            zip(boundaries, boundaries[1:])
+        )
+    ]
+
+
+class _StateRecorder(ParseResultHandler):
+    """Records the state after the last chunk before each boundary."""
+
+    def __init__(self, boundaries: Sequence[int], state: str) -> None:
+        super().__init__()
+        self.boundaries = boundaries
+        self.states: List[str] = []
+        self.state = state
+
+    def parsed_data(self, parse_result: ParseResult):
+        count = parse_result.chunk.count  # type: ignore
+        while (
+            len(self.states) < len(self.boundaries)
+            and self.boundaries[len(self.states)] < count
+        ):
+            self.states.append(self.state)
+        self.state = parse_result.new_state
+
+    def finish(self) -> List[str]:
+        """The state at each boundary."""
+        self.states.extend([self.state] * (len(self.boundaries) - len(self.states)))
+        return self.states
+
+
+def prescan_states(
+    path: Path | str,
+    shards: Sequence[Shard],
+    schema: ParseSchema,
+    state: str = "origin",
+    encoding: str = "utf-8",
+    errors: str = "strict",
+    chunk_options: Dict[str, Any] | None = None,
+) -> List[Shard]:
+    """
+    Find the parse state at the start of each shard.
+
+    Args:
+        path: The file to scan.
+        shards: The shards from `split_shards`.
+        schema: A schema that makes the same state transitions as the full schema.
+            Its parsers should skip data extraction.
+        state: The state at the start of the file. Defaults to "origin".
+        encoding: The text encoding. Defaults to "utf-8".
+        errors: The decode error handling. Defaults to "strict".
+        chunk_options: Keyword arguments for `ChunkIterator`. Defaults to None.
+
+    Returns:
+        The shards, with the state before each shard.
+    """
+    recorder = _StateRecorder([shard.start_count for shard in shards[1:]], state)
+    chunks = ChunkIterator(
+        open_lines(path, encoding, errors), source=str(path), **(chunk_options or {})
+    )
+    Parser(schema, intern_states=False).parse(recorder, chunks, state)
+    states = [state] + recorder.finish()
+    return [replace(shard, state=states[shard.index]) for shard in shards]
+
+
+def shard_chunks(
+    path: Path | str,
+    shard: Shard,
+    encoding: str = "utf-8",
+    errors: str = "strict",
+    chunk_options: Dict[str, Any] | None = None,
+) -> Iterator[Chunk]:
+    """
+    Iterate the chunks of one shard, numbered by their line in the whole file.
+    """
+    with open(path, "rb") as stream:
+        stream.seek(shard.start)
+        lines = iter_lines(iter_blocks(stream), encoding, errors)
+        chunks = ChunkIterator(
+            lines,
+            source=str(path),
+            start_count=shard.start_count,
+            **(chunk_options or {}),
+        )
+        for chunk in chunks:
+            if chunk.count > shard.end_count:
+                return
+            yield chunk
+
+
+def parse_shard(
+    path: Path | str,
+    shard: Shard,
+    parser: Parser,
+    handler: ParseResultHandler,
+    encoding: str = "utf-8",
+    errors: str = "strict",
+    chunk_options: Dict[str, Any] | None = None,
+) -> str:
+    """
+    Parse one shard in this process.
+
+    Returns:
+        The state after the last chunk of the shard.
+    """
+    chunks = shard_chunks(path, shard, encoding, errors, chunk_options)
+    return parser.parse(handler, chunks, shard.state)  # type: ignore
+
+
+class _CollectingHandler(ParseResultHandler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.results: List[ParseResult] = []
+
+    def parsed_data(self, parse_result: ParseResult):
+        self.results.append(parse_result)
+
+
+def _parse_shard_task(
+    task: Tuple,
+) -> Tuple[List[ParseResult], str | None, str | None]:
+    """Parse a shard in a worker, returns (results, end state, error message)."""
+    path, shard, parser, encoding, errors, chunk_options = task
+    handler = _CollectingHandler()
+    try:
+        state = parse_shard(
+            path, shard, parser, handler, encoding, errors, chunk_options
+        )
+    except ChunkParserException as exc:
+        # Parse exceptions hold chunks and parsers, and do not pickle cleanly.
+        return [], None, str(exc)
+    return handler.results, state, None
+
+
+def _parse_shard_shm_task(
+    task: Tuple,
+) -> Tuple[ResultBlock | None, str | None, str | None]:
+    """Parse a shard in a worker, returns (result block, end state, error message)."""
+    path, shard, parser, encoding, errors, chunk_options, chunk_context = task
+    handler = EncodingHandler(parser.schema, shard.state, chunk_context)
+    try:
+        state = parse_shard(
+            path, shard, parser, handler, encoding, errors, chunk_options
+        )
+    except ChunkParserException as exc:
+        return None, None, str(exc)
+    return encode_results(handler), state, None
+
+
+def _check_end_state(shards: Sequence[Shard], shard: Shard, state: str):
+    if shard.index + 1 < len(shards) and shards[shard.index + 1].state != state:
+        raise ShardParseException(
+            f"Ended in state {state!r}, but the pre-scan found "
+            f"{shards[shard.index + 1].state!r}. Check that the pre-scan schema "
+            "makes the same state transitions as the parser schema.",
+            shard,
+        )
+
+
+def parse_sharded(
+    path: Path | str,
+    parser: Parser,
+    handler: ParseResultHandler,
+    shards: int | None = None,
+    prescan_schema: ParseSchema | None = None,
+    max_workers: int | None = None,
+    encoding: str = "utf-8",
+    errors: str = "strict",
+    chunk_options: Dict[str, Any] | None = None,
+    transport: str = "pickle",
+    chunk_context: bool = False,
+) -> str:
+    """
+    Parse a file in shards across a process pool.
+
+    The parser, and chunk_options, must be picklable.
+
+    Args:
+        path: An uncompressed file.
+        parser: The parser for each shard.
+        handler: Receives every `ParseResult`, in file order.
+        shards: The number of shards. Defaults to None, for `os.cpu_count()`.
+        prescan_schema: The light schema for the pre-scan. Defaults to None, which
+            pre-scans with the parser schema. That is a full serial parse of the
+            file before any shard starts, which costs about as much as parsing
+            the file sequentially, so pass a light schema for a speedup.
+        max_workers: The size of the process pool. 0 parses the shards in this
+            process. Defaults to None, for the `ProcessPoolExecutor` default.
+        encoding: The text encoding. Defaults to "utf-8".
+        errors: The decode error handling. Defaults to "strict".
+        chunk_options: Keyword arguments for `ChunkIterator`. Defaults to None.
+        transport: How results are passed back from the workers, "pickle" for the
+            whole `ParseResult`, or "shared_memory" for the encoding in
+            `result_transport`. Defaults to "pickle".
+        chunk_context: Pass the peek and past values back with the "shared_memory"
+            transport. Defaults to False, which passes only the line.
+
+    Raises:
+        ValueError: If transport is not supported, or the parser retention mode
+            does not keep the chunk line for the shared_memory transport.
+        ShardParseException: If a shard fails to parse, or does not end in the
+            state the pre-scan found for the next shard.
+
+    Returns:
+        The state after the last chunk.
+    """
+    if transport not in _TRANSPORTS:
+        raise ValueError(
+            f"Unsupported transport {transport!r}, expected one of {_TRANSPORTS}."
+        )
+    if transport == "shared_memory" and parser.retain == "none":
+        raise ValueError(
+            "The shared_memory transport needs the chunk line, the parser retention "
+            "mode must be 'full' or 'line_only'."
+        )
+    shard_list = split_shards(path, shards or os.cpu_count() or 1)
+    shard_list = prescan_states(
+        path,
+        shard_list,
+        prescan_schema or parser.schema,
+        encoding=encoding,
+        errors=errors,
+        chunk_options=chunk_options,
+    )
+    state = shard_list[0].state
+    if max_workers == 0 or len(shard_list) == 1:
+        for shard in shard_list:
+            try:
+                state = parse_shard(
+                    path, shard, parser, handler, encoding, errors, chunk_options
+                )
+            except ChunkParserException as exc:
+                raise ShardParseException(str(exc), shard) from exc
+            _check_end_state(shard_list, shard, state)
+        return state
+    shared = transport == "shared_memory"
+    intern = handler.string_pool.intern if parser.intern_states else None
+    tasks = [
+        (path, shard, parser, encoding, errors, chunk_options)
+        + ((chunk_context,) if shared else ())
+        for shard in shard_list
+    ]
+    task_function = _parse_shard_shm_task if shared else _parse_shard_task
+    with ProcessPoolExecutor(max_workers) as executor:
+        futures = [executor.submit(task_function, task) for task in tasks]
+        consumed = 0
+        try:
+            for shard, future in zip(shard_list, futures):
+                payload, end_state, error = future.result()
+                consumed += 1
+                if error is not None:
+                    raise ShardParseException(error, shard)
+                results: Iterable[ParseResult]
+                if isinstance(payload, ResultBlock):
+                    results = decode_results(payload, parser.schema)
+                else:
+                    results = payload or ()
+                for parse_result in results:
+                    if intern is not None:
+                        parse_result.new_state = intern(parse_result.new_state)
+                    handler.parsed_data(parse_result)
+                state = end_state  # type: ignore
+                _check_end_state(shard_list, shard, state)
+        except BaseException:
+            # Do not parse the shards that have not started.
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        finally:
+            if shared:
+                _release_remaining(futures[consumed:])
+    return state
+
+
+def _release_remaining(futures: Sequence[Future]):
+    """Release the result blocks of shards that were not decoded."""
+    for future in futures:
+        try:
+            block = future.result()[0]
+        except Exception:  # pylint: disable=broad-except
+            continue
+        if block is not None:
+            release_block(block)
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+#
+#  skip_scan.py
+#  _project_
+#
+#  Created by Chad Lowe on 2026-10-19.
+#  Copyright 2026 Chad Lowe. All rights reserved.
+#
+"""
+Skip over filler text, and only emit the lines around anchor literals.
+
+Documents that are mostly filler still pay for numbering, filtering, windowing
+and parsing every line. A `SkipScanner` searches whole blocks of text for a set
+of anchor literals, and emits only the anchor lines, with a number of lines of
+context before and after, as `Enumerated` values with their original line
+numbers. Lines between regions are never split out of the block.
+
+The anchors are combined into a single compiled alternation, so the search runs
+in the C regex engine over the whole block.
+
+Usage::
+
+    scanner = SkipScanner(["Some Useful Data"], after=3)
+    chunks = ChunkIterator(scanner.scan(open_text_blocks(path)), enumerated=True)
+"""
+import io
+import re
+from collections import deque
+from typing import Deque, Iterable, Iterator, Tuple
+
+from pfmsoft.text_chunk_parser.enumerated_iterator import Enumerated
+
+
+class SkipScanner:
+    """
+    Emit only the lines around anchor literals from blocks of text.
+    """
+
+    def __init__(self, anchors: Iterable[str], before: int = 0, after: int = 0):
+        """
+        Args:
+            anchors: The literal text that marks a region of interest.
+            before: The number of lines to emit before an anchor line.
+                Defaults to 0.
+            after: The number of lines to emit after an anchor line. Defaults to 0.
+
+        Raises:
+            ValueError: If there are no anchors.
+        """
+        self.anchors = tuple(sorted(set(anchors), key=len, reverse=True))
+        if not self.anchors or not all(self.anchors):
+            raise ValueError("SkipScanner requires at least one non empty anchor.")
+        self.pattern = re.compile("|".join(map(re.escape, self.anchors)))
+        self.before = max(before, 0)
+        self.after = max(after, 0)
+
+    def scan(self, blocks: Iterable[str]) -> Iterator[Enumerated]:
+        """
+        Scan blocks of text for anchors.
+
+        Args:
+            blocks: Blocks of text. Every block except the last must end with a
+                newline, eg. from `sources.open_text_blocks`.
+
+        Yields:
+            The lines in each region, numbered from 1 at the start of the text.
+        """
+        # The number of lines before pos, in the whole text.
+        count = 0
+        after_remaining = 0
+        # Lines not emitted at the end of earlier blocks, for context before.
+        tail: Deque[Enumerated] = deque(maxlen=self.before or 1)
+        for block in blocks:
+            pos = 0
+            if after_remaining:
+                tail.clear()
+                stop, lines = _skip_lines(block, pos, after_remaining)
+                yield from _enumerate_lines(block, pos, stop, count)
+                count, pos = count + lines, stop
+                after_remaining -= lines
+            # Anchors in lines that were already emitted can extend the region.
+            match = self.pattern.search(block)
+            while match is not None:
+                anchor_start = block.rfind("\n", 0, match.start()) + 1
+                anchor_end, _ = _skip_lines(block, anchor_start, 1)
+                if anchor_start < pos:
+                    lines_after = self.after - block.count("\n", anchor_end, pos)
+                else:
+                    start = _start_of_lines(block, pos, anchor_start, self.before)
+                    context = self.before - block.count("\n", start, anchor_start)
+                    if self.before and context and start == 0 and tail:
+                        yield from list(tail)[-context:]
+                    tail.clear()
+                    count += block.count("\n", pos, start)
+                    yield from _enumerate_lines(block, start, anchor_end, count)
+                    count += block.count("\n", start, anchor_end)
+                    pos = anchor_end
+                    lines_after = self.after
+                if lines_after > 0:
+                    stop, lines = _skip_lines(block, pos, lines_after)
+                    yield from _enumerate_lines(block, pos, stop, count)
+                    count, pos = count + lines, stop
+                    after_remaining = lines_after - lines
+                match = self.pattern.search(block, anchor_end)
+            if self.before and pos < len(block):
+                if pos:
+                    tail.clear()
+                start = _start_of_lines(block, pos, len(block), self.before)
+                tail.extend(
+                    _enumerate_lines(
+                        block, start, len(block), count + block.count("\n", pos, start)
+                    )
+                )
+            count += block.count("\n", pos)
+
+
+def _skip_lines(block: str, pos: int, lines: int) -> Tuple[int, int]:
+    """
+    Find the end of up to lines lines from pos.
+
+    Returns:
+        The position after the lines, and the number of lines found.
+    """
+    found = 0
+    while found < lines and pos < len(block):
+        end = block.find("\n", pos)
+        pos = len(block) if end == -1 else end + 1
+        found += 1
+    return pos, found
+
+
+def _start_of_lines(block: str, floor: int, line_start: int, lines: int) -> int:
+    """Find the start of up to lines lines before line_start, not before floor."""
+    start = line_start
+    for _ in range(lines):
+        if start <= floor:
+            return floor
+        start = max(block.rfind("\n", floor, start - 1) + 1, floor)
+    return start
+
+
+def _enumerate_lines(
+    block: str, start: int, stop: int, count: int
+) -> Iterator[Enumerated]:
+    """Split block[start:stop] into lines, numbered from count + 1."""
+    for line in io.StringIO(block[start:stop], newline="\n"):
+        count += 1
+        yield Enumerated(count, line)
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+#
+#  sources.py
+#  _project_
+#
+#  Created by Chad Lowe on 2026-10-19.
+#  Copyright 2026 Chad Lowe. All rights reserved.
+#
+"""
+Line sources for `ChunkIterator`, with transparent decompression.
+
+Compression is detected from the magic bytes at the start of the data, not the
+file name. gzip, bz2 and xz use the standard library, zstd requires the optional
+`zstandard` package. Decompression modules are only imported when needed.
+
+Data is read in large blocks, and each block is decoded and split into lines in
+one pass. Only ASCII compatible encodings, eg. utf-8 or latin-1, are supported,
+since blocks are split on the newline byte before decoding. For ASCII or latin-1
+data the lines can be left as bytes, and only the parsed fields decoded.
+
+Usage::
+
+    chunks = ChunkIterator(open_lines(path, read_ahead=4), source=str(path))
+"""
+import io
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, List
+
+from pfmsoft.text_chunk_parser.read_ahead import ReadAheadIterator
+
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+
+MAGIC_BYTES = {
+    "gzip": b"\x1f\x8b",
+    "bz2": b"BZh",
+    "xz": b"\xfd7zXZ\x00",
+    "zstd": b"\x28\xb5\x2f\xfd",
+}
+
+
+def detect_compression(header: bytes) -> str | None:
+    """
+    Detect the compression format from the first bytes of the data.
+
+    Args:
+        header: At least the first 6 bytes of the data.
+
+    Returns:
+        One of the MAGIC_BYTES keys, or None for uncompressed data.
+    """
+    for compression, magic in MAGIC_BYTES.items():
+        if header.startswith(magic):
+            return compression
+    return None
+
+
+def decompressing_stream(stream: BinaryIO) -> BinaryIO:
+    """
+    Wrap a binary stream with a decompressor if the data is compressed.
+
+    Closing the returned stream does not always close the wrapped stream.
+
+    Args:
+        stream: A binary stream, such as an open file or a pipe.
+
+    Raises:
+        ImportError: If the data is zstd compressed, and `zstandard` is not
+            installed.
+
+    Returns:
+        A binary stream of the decompressed data.
+    """
+    if not hasattr(stream, "peek"):
+        stream = io.BufferedReader(stream)  # type: ignore
+    compression = detect_compression(stream.peek(6)[:6])  # type: ignore
+    # pylint: disable=import-outside-toplevel
+    if compression == "gzip":
+        import gzip
+
+        return gzip.GzipFile(fileobj=stream)  # type: ignore
+    if compression == "bz2":
+        import bz2
+
+        return bz2.BZ2File(stream)  # type: ignore
+    if compression == "xz":
+        import lzma
+
+        return lzma.LZMAFile(stream)  # type: ignore
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError as exc:
+            raise ImportError(
+                "The zstandard package is required to read zstd compressed data."
+            ) from exc
+        return zstandard.ZstdDecompressor().stream_reader(  # type: ignore
+            stream, closefd=False
+        )
+    return stream
+
+
+def iter_blocks(
+    stream: BinaryIO, block_size: int = DEFAULT_BLOCK_SIZE
+) -> Iterator[bytes]:
+    """Read a binary stream in blocks of up to block_size bytes."""
+    while True:
+        block = stream.read(block_size)
+        if not block:
+            return
+        yield block
+
+
+def iter_text_blocks(
+    blocks: Iterable[bytes],
+    encoding: str = "utf-8",
+    errors: str = "strict",
+) -> Iterator[str]:
+    """
+    Decode blocks of bytes into blocks of text that end on a line boundary.
+
+    Only the last block may end without a newline.
+    """
+    pending: List[bytes] = []
+    for block in blocks:
+        end = block.rfind(b"\n") + 1
+        if not end:
+            pending.append(block)
+            continue
+        if pending:
+            pending.append(block[:end])
+            complete = b"".join(pending)
+            pending = []
+        else:
+            complete = block[:end]
+        if end < len(block):
+            pending.append(block[end:])
+        yield complete.decode(encoding, errors)
+    if pending:
+        yield b"".join(pending).decode(encoding, errors)
+
+
+def iter_byte_lines(blocks: Iterable[bytes]) -> Iterator[bytes]:
+    """Split blocks of bytes into lines of bytes, keeping the line endings."""
+    pending = b""
+    for block in blocks:
+        end = block.rfind(b"\n") + 1
+        if not end:
+            pending += block
+            continue
+        yield from io.BytesIO(pending + block[:end] if pending else block[:end])
+        pending = block[end:]
+    if pending:
+        yield pending
+
+
+def iter_lines(
+    blocks: Iterable[bytes],
+    encoding: str | None = "utf-8",
+    errors: str = "strict",
+) -> Iterator[str] | Iterator[bytes]:
+    """
+    Split blocks of bytes into lines of text, keeping the line endings.
+
+    Lines are only split on newline, matching iteration over a file opened with
+    `newline="\\n"`. If encoding is None the lines are not decoded, see
+    `iter_byte_lines`.
+    """
+    if encoding is None:
+        yield from iter_byte_lines(blocks)
+        return
+    for text in iter_text_blocks(blocks, encoding, errors):
+        yield from io.StringIO(text, newline="\n")
+
+
+def open_text_blocks(
+    source: Path | str | BinaryIO,
+    encoding: str = "utf-8",
+    errors: str = "strict",
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Iterator[str]:
+    """
+    Iterate a possibly compressed source as blocks of text ending on a line boundary.
+
+    See `open_lines` for the arguments.
+    """
+    if isinstance(source, (str, Path)):
+        raw: BinaryIO = open(source, "rb")  # pylint: disable=consider-using-with
+    else:
+        raw = source
+    with raw, decompressing_stream(raw) as stream:
+        yield from iter_text_blocks(iter_blocks(stream, block_size), encoding, errors)
+
+
+def open_lines(
+    source: Path | str | BinaryIO,
+    encoding: str | None = "utf-8",
+    errors: str = "strict",
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    read_ahead: int = 0,
+) -> Iterator[str] | Iterator[bytes]:
+    """
+    Iterate the lines of a possibly compressed source.
+
+    The source is closed when the lines are exhausted, or the iterator is closed.
+
+    Args:
+        source: A file path, or a binary stream such as a pipe.
+        encoding: An ASCII compatible text encoding, or None for lines of bytes
+            that are never decoded. Defaults to "utf-8".
+        errors: The decode error handling. Defaults to "strict".
+        block_size: The number of bytes to read at a time. Defaults to
+            DEFAULT_BLOCK_SIZE.
+        read_ahead: The number of blocks to read and decompress ahead on a
+            background thread. Defaults to 0, which reads on the calling thread.
+
+    Yields:
+        Lines of text, or bytes, for use as the iterable of a `ChunkIterator`.
+    """
+    if isinstance(source, (str, Path)):
+        raw: BinaryIO = open(source, "rb")  # pylint: disable=consider-using-with
+    else:
+        raw = source
+    with raw, decompressing_stream(raw) as stream:
+        blocks: Iterable[bytes] = iter_blocks(stream, block_size)
+        if read_ahead <= 0:
+            yield from iter_lines(blocks, encoding, errors)
+            return
+        with ReadAheadIterator(blocks, read_ahead, name="open_lines") as reader:
+            yield from iter_lines(reader, encoding, errors)
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+#
+#  spill.py
+#  _project_
+#
+#  Created by Chad Lowe on 2026-10-19.
+#  Copyright 2026 Chad Lowe. All rights reserved.
+#
+"""
+Keep parse results on disk when they do not fit a memory budget.
+
+A `SpillingResultHandler` keeps results in memory until a record or byte budget
+is crossed, then pickles the batch with protocol 5 to a temporary file, and
+starts a new batch. `results` reads everything back lazily, one batch at a time,
+in parse order, so a parse of any size needs memory for about one batch.
+
+Parsers are not pickled, each record keeps the position of its parser in a
+table, and read back results get the original parser objects. Use the `Parser`
+retention mode "line_only" or "none", or each record also keeps the peek and
+past values of its chunk.
+
+Usage::
+
+    with SpillingResultHandler(max_bytes=256 * 1024 * 1024) as handler:
+        Parser(schema, retain="line_only").parse(handler, chunks)
+        for parse_result in handler.results():
+            ...
+"""
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Sequence, Tuple
+
+from pfmsoft.text_chunk_parser.chunk_parser import (
+    ChunkParser,
+    ParseResult,
+    ParseResultHandler,
+)
+
+# new_state, data, parser position, chunk.
+_Record = Tuple[str, Any, int, Any]
+
+
+class SpillingResultHandler(ParseResultHandler):
+    """
+    A `ParseResultHandler` that keeps results, spilling batches to a temporary
+    file.
+
+    Subclass and override `keep` to transform or drop results before they are
+    stored.
+    """
+
+    def __init__(
+        self,
+        max_records: int = 100_000,
+        max_bytes: int | None = None,
+        spill_dir: Path | str | None = None,
+        sample_size: int = 32,
+        **kwargs,
+    ) -> None:
+        """
+        Args:
+            max_records: The most results kept in memory. Defaults to 100_000.
+            max_bytes: The most bytes kept in memory, measured as the pickled size
+                of the batch, estimated from a sample of recent results. Defaults
+                to None, no byte budget.
+            spill_dir: The directory for the temporary file. Defaults to None, the
+                system temporary directory.
+            sample_size: The number of recent results pickled to estimate the
+                batch size. Defaults to 32.
+
+        Raises:
+            ValueError: If max_records or max_bytes is less than 1.
+        """
+        super().__init__(**kwargs)
+        if max_records < 1 or (max_bytes is not None and max_bytes < 1):
+            raise ValueError("max_records and max_bytes must be at least 1.")
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.sample_size = max(sample_size, 1)
+        self.batch: List[_Record] = []
+        self.spills = 0
+        self.spilled_records = 0
+        self._file: IO[bytes] | None = None
+        self._parsers: List[ChunkParser] = []
+        self._parser_positions: Dict[int, int] = {}
+        # The batch length at which the budget is next checked.
+        self._check_at = self._first_check()
+
+    def _first_check(self) -> int:
+        if self.max_bytes is None:
+            return self.max_records
+        return min(self.max_records, self.sample_size)
+
+    def keep(self, parse_result: ParseResult) -> ParseResult | None:
+        """
+        Transform a result before it is stored.
+
+        Override to change the result, or return None to drop it. Defaults to
+        keeping the result.
+        """
+        return parse_result
+
+    def parsed_data(self, parse_result: ParseResult):
+        kept = self.keep(parse_result)
+        if kept is None:
+            return
+        parser = kept.parser
+        position = self._parser_positions.get(id(parser), None)
+        if position is None:
+            position = self._parser_positions[id(parser)] = len(self._parsers)
+            self._parsers.append(parser)
+        self.batch.append((kept.new_state, kept.data, position, kept.chunk))
+        if len(self.batch) >= self._check_at:
+            self._check_budget()
+
+    def _check_budget(self):
+        count = len(self.batch)
+        if count < self.max_records and self.max_bytes is not None:
+            sample = self.batch[-self.sample_size :]
+            per_record = len(pickle.dumps(sample, protocol=5)) / len(sample)
+            allowed = int(self.max_bytes / per_record)
+            if count < allowed:
+                # Check again halfway to the estimated limit.
+                self._check_at = min(
+                    self.max_records, count + max((allowed - count) // 2, 1)
+                )
+                return
+        self.spill()
+
+    def spill(self):
+        """Write the batch in memory to the temporary file."""
+        if not self.batch:
+            return
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(  # pylint: disable=consider-using-with
+                prefix="text-chunk-parser-", suffix=".spill", dir=self.spill_dir
+            )
+        self._file.seek(0, os.SEEK_END)
+        pickle.dump(self.batch, self._file, protocol=5)
+        self.spills += 1
+        self.spilled_records += len(self.batch)
+        self.batch = []
+        self._check_at = self._first_check()
+
+    def __len__(self) -> int:
+        return self.spilled_records + len(self.batch)
+
+    def _decode(self, records: Sequence[_Record]) -> Iterator[ParseResult]:
+        intern = self.string_pool.intern
+        parsers = self._parsers
+        for new_state, data, position, chunk in records:
+            yield ParseResult(intern(new_state), data, parsers[position], chunk)
+
+    def results(self) -> Iterator[ParseResult]:
+        """
+        Iterate every result, in parse order, reading spilled batches one at a
+        time. Do not parse into the handler while iterating.
+        """
+        if self._file is not None:
+            end = self._file.seek(0, os.SEEK_END)
+            offset = 0
+            while offset < end:
+                self._file.seek(offset)
+                records = pickle.load(self._file)
+                offset = self._file.tell()
+                yield from self._decode(records)
+        yield from self._decode(self.batch)
+
+    def close(self):
+        """Delete the temporary file and drop the results."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.batch = []
+        self.spills = self.spilled_records = 0
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
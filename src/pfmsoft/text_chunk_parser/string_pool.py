@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+#
+#  string_pool.py
+#  _project_
+#
+#  Created by Chad Lowe on 2026-10-19.
+#  Copyright 2026 Chad Lowe. All rights reserved.
+#
+"""
+A per parse string pool.
+
+Parsed values such as airport codes and state names repeat on most lines. A pool
+keeps one copy of each distinct string, so retained results share it, and
+comparisons between pooled strings succeed on the identity check. Unlike
+`sys.intern`, the pool is released with the parse job that owns it.
+"""
+from typing import Dict, List
+
+
+class StringPool:
+    """
+    Keeps one copy of each distinct string, with optional integer codes.
+    """
+
+    def __init__(self) -> None:
+        self._pool: Dict[str, str] = {}
+        self._codes: Dict[str, int] = {}
+        self._values: List[str] = []
+
+    def intern(self, value: str) -> str:
+        """Return the pooled copy of value, adding it if needed."""
+        return self._pool.setdefault(value, value)
+
+    def encode(self, value: str) -> int:
+        """
+        Return the integer code for value, assigning the next code if needed.
+
+        Codes start at 0, and are assigned in order of first use.
+        """
+        code = self._codes.get(value, None)
+        if code is None:
+            value = self.intern(value)
+            code = self._codes[value] = len(self._values)
+            self._values.append(value)
+        return code
+
+    def decode(self, code: int) -> str:
+        """Return the value for an integer code from `encode`."""
+        return self._values[code]
+
+    @property
+    def values(self) -> List[str]:
+        """The encoded values, indexed by code."""
+        return self._values
+
+    def __contains__(self, value: str) -> bool:
+        return value in self._pool
+
+    def __len__(self) -> int:
+        return len(self._pool)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(size={len(self)})"
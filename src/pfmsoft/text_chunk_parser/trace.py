@@ -0,0 +1,458 @@
+# -*- coding: utf-8 -*-
+#
+#  trace.py
+#  _project_
+#
+#  Created by Chad Lowe on 2026-10-19.
+#  Copyright 2026 Chad Lowe. All rights reserved.
+#
+"""
+Record a compact binary trace of a parse, and replay it offline.
+
+Pass a `TraceWriter` to `Parser`, and every chunk is recorded with its line
+number, state, candidate parsers, the parsers attempted, the winner, and the
+nanoseconds each attempt took. States, parsers and candidate lists are written
+once, and referenced by id after that, so a chunk record is a few bytes plus 8
+per attempt.
+
+`read_trace` loads a trace, and `replay` re-simulates it with another candidate
+ordering, without the original data. Usage::
+
+    with TraceWriter("parse.trace") as trace:
+        Parser(schema, trace=trace).parse(handler, chunks)
+    recorded = read_trace("parse.trace")
+    print(replay(recorded).summary())
+    print(replay(recorded, ByWinsStrategy(recorded)).summary())
+
+or from the command line, to compare the built in strategies::
+
+    python -m pfmsoft.text_chunk_parser.trace parse.trace
+
+Trace format, little endian, after the `MAGIC` header:
+
+- `S` id:u32 length:u16 utf-8: a state.
+- `P` id:u32 length:u16 utf-8: a parser, as its repr.
+- `L` id:u32 count:u16 parser_id:u32 * count: a candidate list.
+- `C` line:i64 state_id:u32 list_id:u32 winner:i16 attempts:u16
+  nanoseconds:u64 * attempts: a chunk. The attempted parsers are the first
+  `attempts` of the candidate list, winner is the index of the parser that
+  parsed the chunk, -1 if none did.
+"""
+import argparse
+import struct
+import threading
+import weakref
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Sequence, Tuple
+
+MAGIC = b"TCPTRACE1\n"
+
+_NAME = struct.Struct("<cIH")
+_LIST = struct.Struct("<cIH")
+_CHUNK = struct.Struct("<cqIIhH")
+
+
+class TraceWriter:
+    """
+    Writes a parse trace through a buffered file.
+
+    Ids are assigned as states, parsers and candidate lists are first seen. One
+    writer can be shared by parses on several threads, each record is written
+    whole.
+
+    A `Parser` with a trace times every attempt, like one with a time budget or
+    slow threshold. Tracing alone does not touch SIGALRM, the interval timer is
+    only armed once an attempt with a time budget starts, see `Parser`.
+    """
+
+    def __init__(self, file: str | Path | IO[bytes], buffer_size: int = 1 << 16):
+        """
+        Args:
+            file: A path, or a binary file opened for writing.
+            buffer_size: The write buffer size for a path. Defaults to 64 KiB.
+        """
+        if isinstance(file, (str, Path)):
+            self.file: IO[bytes] = open(  # pylint: disable=consider-using-with
+                file, "wb", buffering=buffer_size
+            )
+            self._owns_file = True
+        else:
+            self.file = file
+            self._owns_file = False
+        self.file.write(MAGIC)
+        self._states: Dict[str, int] = {}
+        # id of a parser -> parser id. Entries are removed when the parser is
+        # collected, so a reused id is not mistaken for it.
+        self._parsers: Dict[int, int] = {}
+        self._parser_count = 0
+        self._lists: Dict[Tuple[int, ...], int] = {}
+        # Parsers that do not support weak references are kept alive instead.
+        self._keep: List[Any] = []
+        self._ns: Dict[int, struct.Struct] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Flush the trace, and close the file if it was opened from a path."""
+        if self._owns_file:
+            self.file.close()
+        else:
+            self.file.flush()
+
+    def _state_id(self, state: str) -> int:
+        state_id = self._states.get(state, None)
+        if state_id is None:
+            state_id = self._states[state] = len(self._states)
+            self._write_name(b"S", state_id, state)
+        return state_id
+
+    def _parser_id(self, parser: Any) -> int:
+        parser_id = self._parsers.get(id(parser), None)
+        if parser_id is None:
+            parser_id = self._parser_count
+            self._parser_count += 1
+            self._parsers[id(parser)] = parser_id
+            try:
+                weakref.finalize(parser, self._parsers.pop, id(parser), None)
+            except TypeError:
+                self._keep.append(parser)
+            self._write_name(b"P", parser_id, repr(parser))
+        return parser_id
+
+    def _write_name(self, kind: bytes, name_id: int, name: str):
+        encoded = name.encode("utf-8")[:0xFFFF]
+        self.file.write(_NAME.pack(kind, name_id, len(encoded)) + encoded)
+
+    def _list_id(self, parsers: Sequence[Any]) -> int:
+        parser_ids = tuple(map(self._parser_id, parsers))
+        list_id = self._lists.get(parser_ids, None)
+        if list_id is None:
+            list_id = self._lists[parser_ids] = len(self._lists)
+            self.file.write(
+                _LIST.pack(b"L", list_id, len(parser_ids))
+                + struct.pack(f"<{len(parser_ids)}I", *parser_ids)
+            )
+        return list_id
+
+    def record(
+        self,
+        count: int,
+        state: str,
+        parsers: Sequence[Any],
+        nanoseconds: Sequence[int],
+        winner: int,
+    ):
+        """
+        Record one chunk.
+
+        Args:
+            count: The line number of the chunk.
+            state: The state before the chunk.
+            parsers: The candidate parsers for the state.
+            nanoseconds: The time of each attempt, in candidate order.
+            winner: The index of the parser that parsed the chunk, -1 if none did.
+        """
+        attempts = len(nanoseconds)
+        with self._lock:
+            packer = self._ns.get(attempts, None)
+            if packer is None:
+                packer = self._ns[attempts] = struct.Struct(f"<{attempts}Q")
+            self.file.write(
+                _CHUNK.pack(
+                    b"C",
+                    count,
+                    self._state_id(state),
+                    self._list_id(parsers),
+                    winner,
+                    attempts,
+                )
+                + packer.pack(*nanoseconds)
+            )
+
+
+@dataclass
+class TraceRecord:
+    """
+    One chunk of a trace.
+
+    Args:
+        count: The line number of the chunk.
+        state: The state id before the chunk.
+        candidates: The candidate list id.
+        winner: The index of the winning parser in the candidates, -1 if none.
+        nanoseconds: The time of each attempt, in candidate order.
+    """
+
+    count: int
+    state: int
+    candidates: int
+    winner: int
+    nanoseconds: Tuple[int, ...]
+
+
+@dataclass
+class Trace:
+    """
+    A trace loaded by `read_trace`.
+
+    Args:
+        states: The states, by id.
+        parsers: The parser reprs, by id.
+        candidates: The candidate lists, by id, as tuples of parser ids.
+        records: The chunks, in parse order.
+    """
+
+    states: List[str] = field(default_factory=list)
+    parsers: List[str] = field(default_factory=list)
+    candidates: List[Tuple[int, ...]] = field(default_factory=list)
+    records: List[TraceRecord] = field(default_factory=list)
+
+
+def _read_exact(file: IO[bytes], size: int) -> bytes:
+    data = file.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated trace.")
+    return data
+
+
+def iter_trace(file: IO[bytes], trace: Trace) -> Iterator[TraceRecord]:
+    """
+    Read the records of a trace file one at a time.
+
+    States, parsers and candidate lists are added to trace as they are read.
+
+    Raises:
+        ValueError: If the file is not a trace, or is truncated.
+    """
+    if file.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not a parse trace, the header does not match.")
+    chunk_tail = _CHUNK.size - 1
+    name_tail = _NAME.size - 1
+    while kind := file.read(1):
+        if kind == b"C":
+            _, count, state, candidates, winner, attempts = _CHUNK.unpack(
+                kind + _read_exact(file, chunk_tail)
+            )
+            nanoseconds = struct.unpack(
+                f"<{attempts}Q", _read_exact(file, 8 * attempts)
+            )
+            yield TraceRecord(count, state, candidates, winner, nanoseconds)
+        elif kind in (b"S", b"P"):
+            _, _, length = _NAME.unpack(kind + _read_exact(file, name_tail))
+            name = _read_exact(file, length).decode("utf-8", "replace")
+            (trace.states if kind == b"S" else trace.parsers).append(name)
+        elif kind == b"L":
+            _, _, length = _LIST.unpack(kind + _read_exact(file, _LIST.size - 1))
+            trace.candidates.append(
+                struct.unpack(f"<{length}I", _read_exact(file, 4 * length))
+            )
+        else:
+            raise ValueError(f"Unknown trace record type {kind!r}.")
+
+
+def read_trace(path: str | Path) -> Trace:
+    """Load a whole trace file."""
+    trace = Trace()
+    with open(path, "rb") as file:
+        trace.records.extend(iter_trace(file, trace))
+    return trace
+
+
+class ReplayStrategy:
+    """
+    Decides the candidate order during a replay. Subclass this to try a dispatch
+    strategy.
+
+    The base class keeps the recorded order.
+    """
+
+    def order(self, state: int, candidates: Tuple[int, ...]) -> Sequence[int]:
+        """
+        Order the candidate parser ids for a chunk in state.
+
+        Must return a permutation of candidates.
+        """
+        _ = state
+        return candidates
+
+    def observe(self, state: int, winner: int | None):
+        """Called after each chunk, with the winning parser id, or None."""
+
+
+class ByWinsStrategy(ReplayStrategy):
+    """
+    A static order, by the number of chunks each parser won in each state of a
+    trace, most wins first. Ties keep the recorded order.
+    """
+
+    def __init__(self, trace: Trace) -> None:
+        wins: Dict[int, Counter] = defaultdict(Counter)
+        for record in trace.records:
+            if record.winner >= 0:
+                parser_id = trace.candidates[record.candidates][record.winner]
+                wins[record.state][parser_id] += 1
+        self.wins = wins
+        self._orders: Dict[Tuple[int, Tuple[int, ...]], Tuple[int, ...]] = {}
+
+    def order(self, state: int, candidates: Tuple[int, ...]) -> Sequence[int]:
+        key = (state, candidates)
+        ordered = self._orders.get(key, None)
+        if ordered is None:
+            counts = self.wins[state]
+            ordered = self._orders[key] = tuple(
+                sorted(candidates, key=lambda parser_id: -counts[parser_id])
+            )
+        return ordered
+
+
+class MoveToFrontStrategy(ReplayStrategy):
+    """
+    An adaptive order, the last winner in each state is tried first.
+    """
+
+    def __init__(self) -> None:
+        self.last: Dict[int, int] = {}
+
+    def order(self, state: int, candidates: Tuple[int, ...]) -> Sequence[int]:
+        last = self.last.get(state, None)
+        if last is None or last == candidates[0] or last not in candidates:
+            return candidates
+        return (last, *(parser_id for parser_id in candidates if parser_id != last))
+
+    def observe(self, state: int, winner: int | None):
+        if winner is not None:
+            self.last[state] = winner
+
+
+@dataclass
+class ReplayReport:
+    """
+    The result of `replay`.
+
+    Args:
+        chunks: The number of chunks replayed.
+        attempts: The number of parse attempts.
+        nanoseconds: The total time of the attempts.
+        estimated_attempts: Attempts that were not in the trace, timed with the
+            mean failure time of the parser in that state.
+        chunks_by_state: The chunks in each state.
+        wins: The chunks won by each parser id, in each state.
+    """
+
+    chunks: int = 0
+    attempts: int = 0
+    nanoseconds: int = 0
+    estimated_attempts: int = 0
+    chunks_by_state: Counter = field(default_factory=Counter)
+    wins: Dict[str, Counter] = field(default_factory=lambda: defaultdict(Counter))
+
+    def summary(self) -> str:
+        """The totals, on one line."""
+        mean = self.attempts / self.chunks if self.chunks else 0.0
+        return (
+            f"{self.chunks} chunks, {self.attempts} attempts ({mean:.2f} per chunk), "
+            f"{self.nanoseconds / 1e6:.3f} ms, "
+            f"{self.estimated_attempts} estimated attempts"
+        )
+
+
+def _failure_means(trace: Trace) -> Dict[Tuple[int, int], float]:
+    """The mean time of the recorded failures of each parser in each state."""
+    totals: Dict[Tuple[int, int], List[int]] = defaultdict(lambda: [0, 0])
+    for record in trace.records:
+        parser_ids = trace.candidates[record.candidates]
+        for index, nanoseconds in enumerate(record.nanoseconds):
+            if index != record.winner:
+                total = totals[(record.state, parser_ids[index])]
+                total[0] += nanoseconds
+                total[1] += 1
+    return {key: total / count for key, (total, count) in totals.items()}
+
+
+def replay(trace: Trace, strategy: ReplayStrategy | None = None) -> ReplayReport:
+    """
+    Re-simulate a trace with the candidate order from strategy.
+
+    Each chunk is assumed to be parsed by the parser that won it in the trace, and
+    every parser ordered before the winner to fail. That holds when the parsers of
+    a state match disjoint chunks. Attempts in the trace keep their recorded time,
+    other failures use the mean recorded failure time of the parser in that
+    state, or 0 if it never failed.
+
+    Args:
+        trace: The trace from `read_trace`.
+        strategy: The candidate order. Defaults to None, the recorded order.
+
+    Returns:
+        The attempts and time of the replay.
+    """
+    if strategy is None:
+        strategy = ReplayStrategy()
+    failure_means = _failure_means(trace)
+    report = ReplayReport()
+    for record in trace.records:
+        parser_ids = trace.candidates[record.candidates]
+        recorded = dict(zip(parser_ids, record.nanoseconds))
+        winner = parser_ids[record.winner] if record.winner >= 0 else None
+        for parser_id in strategy.order(record.state, parser_ids):
+            report.attempts += 1
+            nanoseconds = recorded.get(parser_id, None)
+            if nanoseconds is None:
+                report.estimated_attempts += 1
+                nanoseconds = int(failure_means.get((record.state, parser_id), 0))
+            report.nanoseconds += nanoseconds
+            if parser_id == winner:
+                break
+        strategy.observe(record.state, winner)
+        state = trace.states[record.state]
+        report.chunks += 1
+        report.chunks_by_state[state] += 1
+        if winner is not None:
+            report.wins[state][winner] += 1
+    return report
+
+
+STRATEGIES = {
+    "recorded": lambda trace: ReplayStrategy(),
+    "by_wins": ByWinsStrategy,
+    "move_to_front": lambda trace: MoveToFrontStrategy(),
+}
+
+
+def main(argv: Sequence[str] | None = None):
+    """Replay a trace file with each strategy, and print the results."""
+    arg_parser = argparse.ArgumentParser(description=main.__doc__)
+    arg_parser.add_argument("trace", type=Path, help="A trace from TraceWriter.")
+    arg_parser.add_argument(
+        "--strategy",
+        choices=sorted(STRATEGIES),
+        action="append",
+        help="Replay only these strategies. Defaults to all of them.",
+    )
+    arg_parser.add_argument(
+        "--states", type=int, default=10, help="The busiest states to list."
+    )
+    args = arg_parser.parse_args(argv)
+    trace = read_trace(args.trace)
+    for name in args.strategy or STRATEGIES:
+        report = replay(trace, STRATEGIES[name](trace))
+        print(f"{name:<16}{report.summary()}")
+    report = replay(trace)
+    print("\nBusiest states, recorded order:")
+    for state, chunks in report.chunks_by_state.most_common(args.states):
+        wins = ", ".join(
+            f"{trace.parsers[parser_id]}: {count}"
+            for parser_id, count in report.wins[state].most_common()
+        )
+        print(f"  {state}: {chunks} chunks. Wins: {wins}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+from pfmsoft.text_chunk_parser.fixed_width import Column
+
 FLIGHT = """
 DP D/A EQ FLT#  STA DLCL/DHBT ML STA ALCL/AHBT  BLOCK  SYNTH   TPAY   DUTY  TAFB   FDP CALENDAR 05/02−06/01
 −−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−−
@@ -9,3 +11,18 @@ SEQ 16939   1 OPS   POSN CA FO
                                  RLS 2006/2006   8.30   0.00   8.30  11.45       11.30 −− −− −−
 
 """
+
+# The flight leg lines of FLIGHT, and their fixed width columns.
+FLIGHT_ROWS = FLIGHT.splitlines(keepends=True)[5:8]
+FLIGHT_COLUMNS = [
+    Column("dp", 0, 3, int, "i"),
+    Column("da", 3, 7),
+    Column("eq", 7, 10),
+    Column("flight", 10, 16),
+    Column("departure_station", 16, 20),
+    Column("departure_time", 20, 30),
+    Column("meal", 30, 33),
+    Column("arrival_station", 33, 37),
+    Column("arrival_time", 37, 48),
+    Column("block", 48, 55, float, "d"),
+]
@@ -43,6 +43,9 @@ class JsonParseSchema(ParseSchema):
             raise NotImplementedError()
         return parsers
 
+    def defined_states(self) -> Sequence[str]:
+        return list(self.schema)
+
 
 class JsonResultHandler(ParseResultHandler):
     # TODO implement parsed_data so that full behavior can be tested.
@@ -58,6 +61,8 @@ class JsonResultHandler(ParseResultHandler):
 
 
 class DictEndLine(ChunkParser):
+    output_states = ("dict_end",)
+
     def __init__(self) -> None:
         regex = r"^}\n$"
         self.pattern = re.compile(regex)
@@ -73,6 +78,8 @@ class DictEndLine(ChunkParser):
 
 
 class ListEndLine(ChunkParser):
+    output_states = ("list_end",)
+
     def __init__(self) -> None:
         regex = r"^\s*\],\n$"
         self.pattern = re.compile(regex)
@@ -88,6 +95,8 @@ class ListEndLine(ChunkParser):
 
 
 class ListValueLine(ChunkParser):
+    output_states = ("list_value",)
+
     def __init__(self) -> None:
         regex = r"^\s*\"(?P<value>[\w\s'`\-]+)\",\n$"
         self.pattern = re.compile(regex)
@@ -103,6 +112,8 @@ class ListValueLine(ChunkParser):
 
 
 class KeyListLine(ChunkParser):
+    output_states = ("key_list",)
+
     def __init__(self) -> None:
         regex = r"^\s*\"(?P<key>[\w\s]+)\"\:\s*(?P<value>\[)\n$"
         self.pattern = re.compile(regex)
@@ -118,6 +129,8 @@ class KeyListLine(ChunkParser):
 
 
 class KeyValueLine(ChunkParser):
+    output_states = ("key_value",)
+
     def __init__(self) -> None:
         regex = r"^\s*\"(?P<key>[\w\s]+)\"\:\s*\"(?P<value>[\w\s.]+)\",\n$"
         self.pattern = re.compile(regex)
@@ -138,6 +151,8 @@ class KeyValueLine(ChunkParser):
 
 
 class IdentifierLine(ChunkParser):
+    output_states = ("identifier",)
+
     def parse(
         self,
         chunk: Chunk,
@@ -0,0 +1,72 @@
+# pylint: disable=missing-docstring
+import gzip
+from importlib import resources
+from io import BytesIO, StringIO
+from typing import List
+
+from tests.text_chunk_parser.examples.flight import FLIGHT_COLUMNS, FLIGHT_ROWS
+from tests.text_chunk_parser.examples.json_dict import JSON_DICT, JsonResultHandler
+
+from pfmsoft.text_chunk_parser import (
+    Chunk,
+    ChunkIterator,
+    EmptyLine,
+    Parser,
+    ParseResult,
+    load_schema,
+)
+from pfmsoft.text_chunk_parser.chunk_iterator import blank_lines
+from pfmsoft.text_chunk_parser.enumerated_iterator import Enumerated
+from pfmsoft.text_chunk_parser.fixed_width import FixedWidthChunkParser
+from pfmsoft.text_chunk_parser.sources import iter_byte_lines, open_lines
+
+SCHEMA_RESOURCES = "tests.text_chunk_parser.resources.example.schema_resources"
+
+
+def test_iter_byte_lines():
+    data = b"one\ntwo\n\nthree"
+    for size in range(1, len(data) + 1):
+        blocks = [data[index : index + size] for index in range(0, len(data), size)]
+        assert list(iter_byte_lines(blocks)) == [b"one\n", b"two\n", b"\n", b"three"]
+
+
+def test_open_lines_bytes():
+    data = JSON_DICT.encode("latin-1")
+    lines = list(open_lines(BytesIO(gzip.compress(data)), encoding=None))
+    assert lines == BytesIO(data).readlines()
+
+
+def test_blank_lines_and_empty_line():
+    assert not blank_lines(Enumerated(1, b"  \t\n"))
+    assert blank_lines(Enumerated(1, b"  x\n"))
+    result = EmptyLine().parse(Chunk(Enumerated(1, b" \n")), "origin")
+    assert result.data == {"whitespace": " "}
+
+
+def test_compiled_schema_bytes():
+    with resources.as_file(
+        resources.files(SCHEMA_RESOURCES) / "json_dict.yaml"
+    ) as path:
+        text_schema = load_schema(path)
+        bytes_schema = load_schema(path, encoding="latin-1")
+    expected: List[ParseResult] = []
+    Parser(text_schema).parse(
+        JsonResultHandler(expected), ChunkIterator(StringIO(JSON_DICT))
+    )
+    results: List[ParseResult] = []
+    lines = open_lines(BytesIO(JSON_DICT.encode("latin-1")), encoding=None)
+    Parser(bytes_schema).parse(JsonResultHandler(results), ChunkIterator(lines))
+    assert isinstance(results[1].chunk.text, bytes)
+    assert [(x.new_state, x.data) for x in results] == [
+        (x.new_state, x.data) for x in expected
+    ]
+
+
+def test_fixed_width_bytes():
+    text_parser = FixedWidthChunkParser(FLIGHT_COLUMNS, "flight")
+    bytes_parser = FixedWidthChunkParser(FLIGHT_COLUMNS, "flight", encoding="utf-8")
+    rows = [row.encode("utf-8") for row in FLIGHT_ROWS]
+    assert [bytes_parser.extract(row) for row in rows] == [
+        text_parser.extract(row) for row in FLIGHT_ROWS
+    ]
+    assert bytes_parser.extract_block(rows) == text_parser.extract_block(FLIGHT_ROWS)
@@ -6,6 +6,8 @@
 #  Created by Chad Lowe on 2022-05-19.
 #  Copyright 2022 Chad Lowe. All rights reserved.
 #
+import pytest
+
 from pfmsoft.text_chunk_parser.cached_iterator import CachedIterator
 
 
@@ -55,3 +57,24 @@ def test_iter_less_than_peek():
     print("past", cached_iter.past)
     print("peek", cached_iter.peek)
     assert value == 1
+
+
+def test_item_at_reads_past_peek():
+    cached_iter = CachedIterator(iter(range(10)), peek_size=2)
+    assert next(cached_iter) == 0
+    assert cached_iter.item_at(0) == 1
+    assert cached_iter.item_at(5) == 6
+    assert list(cached_iter.extra) == [3, 4, 5, 6]
+    # Items read ahead are returned in order, without skipping or repeating.
+    assert list(cached_iter) == list(range(1, 10))
+    with pytest.raises(IndexError):
+        cached_iter.item_at(0)
+
+
+def test_item_at_source_end():
+    cached_iter = CachedIterator(iter(range(4)), peek_size=1)
+    assert next(cached_iter) == 0
+    assert cached_iter.item_at(2) == 3
+    with pytest.raises(IndexError):
+        cached_iter.item_at(3)
+    assert list(cached_iter) == [1, 2, 3]
@@ -0,0 +1,95 @@
+# pylint: disable=missing-docstring
+from io import StringIO
+
+import pytest
+from tests.text_chunk_parser.examples.buried_text import BURIED_TEXT
+from tests.text_chunk_parser.examples.flight import FLIGHT
+from tests.text_chunk_parser.examples.json_dict import JSON_DICT
+
+from pfmsoft.text_chunk_parser import (
+    AllFailedToParseException,
+    Chunk,
+    ChunkIterator,
+    EmptyLine,
+    Parser,
+    ParseResultHandler,
+    ParseSchema,
+)
+from pfmsoft.text_chunk_parser.enumerated_iterator import Enumerated
+
+
+def chunk_values(chunk_iterator: ChunkIterator):
+    return [
+        (chunk.count, chunk.text, chunk.peek, chunk.past) for chunk in chunk_iterator
+    ]
+
+
+def test_read_ahead_matches_synchronous():
+    for text in (JSON_DICT, BURIED_TEXT):
+        expected = chunk_values(ChunkIterator(StringIO(text), "text"))
+        with ChunkIterator(
+            StringIO(text), "text", read_ahead=2, batch_size=3
+        ) as chunk_iterator:
+            assert chunk_values(chunk_iterator) == expected
+
+
+def test_no_filter():
+    lines = ["a\n", "\n", "b\n"]
+    chunks = list(ChunkIterator(lines, chunk_filter=None, read_ahead=1))
+    assert [chunk.text for chunk in chunks] == lines
+
+
+def test_read_ahead_close_early():
+    lines = (f"line {count}\n" for count in range(100000))
+    with ChunkIterator(lines, read_ahead=2, batch_size=10) as chunk_iterator:
+        assert next(chunk_iterator).count == 1
+    assert chunk_iterator.reader is not None
+    assert not chunk_iterator.reader.thread.is_alive()
+
+
+def test_read_ahead_starts_lazily():
+    chunk_iterator = ChunkIterator(["a\n", "b\n"], read_ahead=2)
+    assert chunk_iterator.reader is not None
+    assert not chunk_iterator.reader.thread.is_alive()
+    chunk_iterator.close()
+    assert not chunk_iterator.reader.started
+
+
+def test_read_ahead_closed_when_exhausted():
+    chunk_iterator = ChunkIterator(["a\n", "b\n"], read_ahead=2)
+    assert [chunk.text for chunk in chunk_iterator] == ["a\n", "b\n"]
+    assert chunk_iterator.reader is not None
+    assert not chunk_iterator.reader.thread.is_alive()
+
+
+class EmptyLineSchema(ParseSchema):
+    def expected(self, state: str):
+        return (EmptyLine(),)
+
+
+def test_read_ahead_closed_when_parse_fails():
+    lines = (f"line {count}\n" for count in range(100000))
+    chunk_iterator = ChunkIterator(lines, read_ahead=2, batch_size=10)
+    with pytest.raises(AllFailedToParseException):
+        Parser(EmptyLineSchema()).parse(ParseResultHandler(), chunk_iterator)
+    assert chunk_iterator.reader is not None
+    assert not chunk_iterator.reader.thread.is_alive()
+
+
+def test_lookahead_past_peek():
+    chunk_iterator = ChunkIterator(StringIO(FLIGHT), "flight", peek_size=1)
+    sequence = next(chunk for chunk in chunk_iterator if chunk.text.startswith("SEQ"))
+    release = sequence.peek_until(lambda value: "RLS" in value.value, limit=10)
+    assert release is not None and release.count == 9
+    assert sequence.peek_until(lambda value: "RLS" in value.value, limit=3) is None
+    assert [value.count for value in sequence.lookahead(3)] == [5, 6, 7]
+    assert len(sequence.lookahead(100)) == 5
+    # Reading ahead does not change the chunks that follow.
+    assert [chunk.count for chunk in chunk_iterator] == [5, 6, 7, 8, 9]
+    with pytest.raises(ValueError):
+        sequence.lookahead(1)
+
+
+def test_lookahead_without_cache():
+    chunk = Chunk(Enumerated(1, "a\n"), peek=(Enumerated(2, "b\n"),))
+    assert chunk.lookahead(3) == (Enumerated(2, "b\n"),)
@@ -0,0 +1,92 @@
+# pylint: disable=missing-docstring
+import pickle
+from typing import List
+
+from tests.text_chunk_parser.examples.json_dict import JsonResultHandler
+
+from pfmsoft.text_chunk_parser import ChunkIterator, Parser, ParseResult
+from pfmsoft.text_chunk_parser.chunk_iterator import Chunk
+from pfmsoft.text_chunk_parser.declarative_schema import compile_schema
+from pfmsoft.text_chunk_parser.enumerated_iterator import Enumerated
+
+LINES = ["  ROW 1 DFW SFO\n", "\n", "  TOTAL 3\n"]
+DEFINITION = {
+    "parsers": {
+        "row": {"first_token": "ROW", "regex": r"^\s*ROW (?P<row>\d+)"},
+        "total": {"first_token": "TOTAL", "new_state": "total"},
+        "blank": {"regex": r"^\n$"},
+    },
+    "states": {"origin": ["row", "total", "blank"], "total": []},
+}
+
+
+def test_tokens_are_computed_once():
+    chunk = Chunk(Enumerated(1, "  ROW 1 DFW SFO\n"))
+    assert chunk.tokens == ("ROW", "1", "DFW", "SFO")
+    assert chunk.tokens is chunk.tokens
+    assert chunk.stripped == "ROW 1 DFW SFO"
+    assert chunk.first_token == "ROW"
+    assert chunk.token_count == 4
+
+
+def test_tokens_of_blank_and_bytes_lines():
+    blank = Chunk(Enumerated(1, " \n"))
+    assert blank.tokens == ()
+    assert blank.first_token == ""
+    assert blank.stripped == ""
+    data = Chunk(Enumerated(1, b"ROW 1\n"))
+    assert data.first_token == b"ROW"
+    assert data.stripped == b"ROW 1"
+    assert Chunk(Enumerated(1, b"\n")).first_token == b""
+
+
+def test_each_window_has_its_own_cache():
+    chunks = list(ChunkIterator(LINES, chunk_filter=None))
+    assert [chunk.first_token for chunk in chunks] == ["ROW", "", "TOTAL"]
+    assert [chunk.token_count for chunk in chunks] == [4, 0, 2]
+
+
+def test_pickle_drops_token_cache():
+    chunk = Chunk(Enumerated(1, "ROW 1\n"))
+    assert chunk.tokens
+    copied = pickle.loads(pickle.dumps(chunk))
+    assert "_tokens" not in copied.__dict__
+    assert copied.tokens == ("ROW", "1")
+
+
+def parse(encoding=None):
+    lines = LINES if encoding is None else [x.encode(encoding) for x in LINES]
+    results: List[ParseResult] = []
+    with JsonResultHandler(results) as handler:
+        Parser(compile_schema(DEFINITION, encoding=encoding)).parse(
+            handler, ChunkIterator(lines, chunk_filter=None)
+        )
+    return results
+
+
+def test_first_token_parser():
+    results = parse()
+    assert [x.parser.name for x in results] == ["row", "blank", "total"]
+    assert results[0].data == {"row": "1"}
+    assert results[-1].new_state == "total"
+    assert not compile_schema(DEFINITION).parsers["total"].matches_any
+
+
+def test_first_token_parser_bytes():
+    results = parse(encoding="utf-8")
+    assert [x.parser.name for x in results] == ["row", "blank", "total"]
+    assert results[0].data == {"row": "1"}
+
+
+def test_first_token_parser_has_no_anchor():
+    schema = compile_schema(
+        {
+            "parsers": {
+                "hdr": {"regex": r"^HEADER (?P<name>\w+)"},
+                "kw": {"first_token": "TOTAL"},
+                "skip": {},
+            },
+            "states": {"origin": ["hdr", "kw", "skip"]},
+        }
+    )
+    assert schema.anchor_literals() == []
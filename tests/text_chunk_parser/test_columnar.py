@@ -0,0 +1,101 @@
+# pylint: disable=missing-docstring
+from array import array
+from io import StringIO
+
+import pytest
+from tests.text_chunk_parser.examples.json_dict import JSON_DICT, JsonParseSchema
+
+from pfmsoft.text_chunk_parser import ChunkIterator, Parser, ParseResult, SkipChunk
+from pfmsoft.text_chunk_parser.chunk_iterator import Chunk
+from pfmsoft.text_chunk_parser.columnar import ColumnarResultHandler, route_by_parser
+from pfmsoft.text_chunk_parser.enumerated_iterator import Enumerated
+
+
+def make_result(state: str, data) -> ParseResult:
+    return ParseResult(state, data, SkipChunk(), Chunk(Enumerated(1, "\n")))
+
+
+def test_columns_by_state():
+    parser = Parser(JsonParseSchema())
+    with ColumnarResultHandler() as handler:
+        parser.parse(handler, ChunkIterator(StringIO(JSON_DICT), "Json Dict"))
+    assert handler.columns("key_value")["key"] == ["Name", "Profession", "Location"]
+    assert len(handler.columns("list_value")["value"]) == 4
+    # list_end and dict_end have no data, and are not stored.
+    assert set(handler.buffers) == {"identifier", "key_value", "key_list", "list_value"}
+
+
+def test_route_by_parser():
+    parser = Parser(JsonParseSchema())
+    with ColumnarResultHandler(route=route_by_parser) as handler:
+        parser.parse(handler, ChunkIterator(StringIO(JSON_DICT), "Json Dict"))
+    assert handler.columns("KeyValueLine")["value"][0] == "B. S. Johnson"
+
+
+def test_typed_and_sparse_columns():
+    handler = ColumnarResultHandler(typecodes={"flight": {"number": "i"}})
+    handler.parsed_data(make_result("flight", {"number": 2019, "station": "DFW"}))
+    handler.parsed_data(make_result("flight", {"number": 2199, "meal": "D"}))
+    columns = handler.columns("flight")
+    assert columns["number"] == array("i", [2019, 2199])
+    assert columns["station"] == ["DFW", None]
+    assert columns["meal"] == [None, "D"]
+    with pytest.raises(ValueError):
+        handler.parsed_data(make_result("flight", {"station": "SFO"}))
+
+
+@pytest.mark.parametrize(
+    "data,exc_type",
+    [
+        ({"station": "SFO"}, ValueError),
+        ({"number": 1, "station": "SFO", "count": 3}, ValueError),
+        ({"station": "SFO", "meal": "B", "number": "not a number"}, TypeError),
+        ({"station": "SFO", "number": 2**40}, OverflowError),
+    ],
+)
+def test_rejected_record_leaves_columns_unchanged(data, exc_type):
+    handler = ColumnarResultHandler(typecodes={"flight": {"number": "i", "count": "i"}})
+    handler.parsed_data(make_result("flight", {"number": 2019, "station": "DFW"}))
+    with pytest.raises(exc_type):
+        handler.parsed_data(make_result("flight", data))
+    handler.parsed_data(make_result("flight", {"number": 2199, "station": "LAX"}))
+    columns = handler.columns("flight")
+    assert set(columns) == {"number", "station"}
+    assert columns["number"] == array("i", [2019, 2199])
+    assert columns["station"] == ["DFW", "LAX"]
+
+
+def test_strings_are_interned():
+    handler = ColumnarResultHandler()
+    # Build equal strings that are not the same object.
+    first, second = "".join(["D", "FW"]), "".join(["DF", "W"])
+    assert first is not second
+    handler.parsed_data(make_result("flight", {"station": first}))
+    handler.parsed_data(make_result("flight", {"station": second}))
+    stations = handler.columns("flight")["station"]
+    assert stations[0] is stations[1]
+
+
+def test_unknown_file_format():
+    with pytest.raises(ValueError):
+        ColumnarResultHandler(file_format="csv")
+
+
+def test_flush_npz(tmp_path):
+    numpy = pytest.importorskip("numpy")
+    handler = ColumnarResultHandler(
+        typecodes={"flight": {"number": "i"}}, output_dir=tmp_path, flush_every=2
+    )
+    with handler:
+        for number in range(5):
+            handler.parsed_data(
+                make_result("flight", {"number": number, "station": "DFW"})
+            )
+    assert [path.name for path in handler.written] == [
+        "flight-00000.npz",
+        "flight-00001.npz",
+        "flight-00002.npz",
+    ]
+    with numpy.load(handler.written[0]) as loaded:
+        assert loaded["number"].tolist() == [0, 1]
+        assert loaded["station"].tolist() == ["DFW", "DFW"]
@@ -0,0 +1,88 @@
+# pylint: disable=missing-docstring
+from importlib import resources
+from io import StringIO
+from typing import List
+
+import pytest
+from tests.text_chunk_parser.examples.json_dict import (
+    JSON_DICT,
+    JsonParseSchema,
+    JsonResultHandler,
+)
+
+from pfmsoft.text_chunk_parser import ChunkIterator, Parser, ParseResult
+from pfmsoft.text_chunk_parser.declarative_schema import (
+    SchemaDefinitionException,
+    compile_schema,
+    literal_prefix,
+    load_schema,
+)
+
+SCHEMA_RESOURCES = "tests.text_chunk_parser.resources.example.schema_resources"
+
+
+def parse_json_dict(schema) -> List[ParseResult]:
+    results: List[ParseResult] = []
+    with JsonResultHandler(results) as handler:
+        Parser(schema).parse(handler, ChunkIterator(StringIO(JSON_DICT), "Json Dict"))
+    return results
+
+
+@pytest.mark.parametrize("file_name", ["json_dict.json", "json_dict.yaml"])
+def test_load_schema_matches_hand_written(file_name):
+    with resources.as_file(resources.files(SCHEMA_RESOURCES) / file_name) as path:
+        schema = load_schema(path)
+    expected = parse_json_dict(JsonParseSchema())
+    results = parse_json_dict(schema)
+    assert [x.new_state for x in results] == [x.new_state for x in expected]
+    assert [x.data for x in results] == [x.data for x in expected]
+    assert schema.state_index["origin"] == 0
+
+
+def test_literal_prefix():
+    assert literal_prefix(r"^}\n$") == "}"
+    assert literal_prefix(r"^SEQ \d+") == "SEQ "
+    assert literal_prefix(r"^abc?d") == "ab"
+    assert literal_prefix(r"^\s*\],\n$") == ""
+    assert literal_prefix(r"^RLS|SEQ") == ""
+    # An escaped backslash does not escape the alternation.
+    assert literal_prefix(r"a\\|b") == ""
+    assert literal_prefix(r"^a\|b") == "a|b"
+    assert literal_prefix(r"(?i)abc") == ""
+
+
+def test_identical_parsers_are_shared():
+    schema = compile_schema(
+        {
+            "parsers": {"a": {"regex": "^a"}, "b": {"regex": "^a"}, "skip": {}},
+            "states": {"origin": ["a", "b", "skip"]},
+        }
+    )
+    assert schema.parsers["a"] is schema.parsers["b"]
+    assert schema.parsers["skip"].prefix == ""
+
+
+@pytest.mark.parametrize(
+    "definition",
+    [
+        {"states": {"origin": []}},
+        {"parsers": {}, "states": {"not_origin": []}},
+        {"parsers": {"a": {"regex": "("}}, "states": {"origin": ["a"]}},
+        {"parsers": {"a": {"pattern": "a"}}, "states": {"origin": ["a"]}},
+        {"parsers": {}, "states": {"origin": ["missing"]}},
+        {
+            "parsers": {"a": {"regex": "^(?P<key>a)", "fields": ["value"]}},
+            "states": {"origin": ["a"]},
+        },
+        {"parsers": {"a": {"fields": ["key"]}}, "states": {"origin": ["a"]}},
+    ],
+)
+def test_invalid_definition(definition):
+    with pytest.raises(SchemaDefinitionException):
+        compile_schema(definition)
+
+
+def test_unknown_state():
+    schema = compile_schema({"parsers": {}, "states": {"origin": []}})
+    with pytest.raises(SchemaDefinitionException):
+        schema.expected("missing")
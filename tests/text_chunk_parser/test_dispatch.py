@@ -0,0 +1,125 @@
+# pylint: disable=missing-docstring
+from io import StringIO
+from typing import List
+
+import pytest
+from tests.text_chunk_parser.examples.json_dict import JsonResultHandler
+
+from pfmsoft.text_chunk_parser import (
+    AllFailedToParseException,
+    ChunkIterator,
+    EmptyLine,
+    FailedParseException,
+    Parser,
+    ParseResult,
+    ParseSchema,
+    SkipChunk,
+)
+
+
+class ListSchema(ParseSchema):
+    def __init__(self, *parsers) -> None:
+        self.parsers = parsers
+
+    def expected(self, state: str):
+        return self.parsers
+
+
+class FalseCatchAll(EmptyLine):
+    """Claims to match any chunk, but does not."""
+
+    matches_any = True
+
+
+class CountingEmptyLine(EmptyLine):
+    """Counts its parse attempts."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    def parse(self, chunk, state, parse_hints=None):
+        self.calls += 1
+        return super().parse(chunk, state, parse_hints)
+
+
+class CountingFalseCatchAll(CountingEmptyLine):
+    matches_any = True
+
+
+def parse(parser: Parser, text: str) -> List[ParseResult]:
+    results: List[ParseResult] = []
+    chunks = ChunkIterator(StringIO(text), "text", chunk_filter=None)
+    parser.parse(JsonResultHandler(results), chunks)
+    return results
+
+
+def test_dispatcher_choice():
+    parser = Parser(ListSchema())
+    empty, skip = EmptyLine(), SkipChunk()
+    # pylint: disable=protected-access
+    assert parser._dispatcher((empty,)) == parser._attempt_first
+    assert parser._dispatcher((skip, empty)) == parser._attempt_first
+    assert parser._dispatcher((empty, skip)) == parser._attempt_catch_all
+    assert parser._dispatcher((empty, EmptyLine())) == parser._attempt_parse
+
+
+def test_single_candidate_failure():
+    empty = EmptyLine()
+    with pytest.raises(AllFailedToParseException) as exc_info:
+        parse(Parser(ListSchema(empty)), "\nnot empty\n")
+    assert exc_info.value.chunk.count == 2
+    assert [exc.parser for exc in exc_info.value.excs] == [empty]
+
+
+def test_catch_all_last():
+    empty, skip = EmptyLine(), SkipChunk()
+    results = parse(Parser(ListSchema(empty, skip)), "\ntext\n")
+    assert [result.parser for result in results] == [empty, skip]
+
+
+def test_false_catch_all_falls_back():
+    false_catch_all, empty = FalseCatchAll(), EmptyLine()
+    results = parse(Parser(ListSchema(EmptyLine(), false_catch_all)), "\n")
+    assert results[0].parser is not false_catch_all
+    with pytest.raises(AllFailedToParseException) as exc_info:
+        parse(Parser(ListSchema(false_catch_all, empty)), "text\n")
+    assert [exc.parser for exc in exc_info.value.excs] == [false_catch_all, empty]
+
+
+def test_failed_parse_message_is_lazy():
+    chunk = next(ChunkIterator(StringIO("text\n"), "source"))
+    exc = FailedParseException(None, "no match", chunk, EmptyLine(), "origin")
+    assert exc.msg is None
+    assert "no match" in str(exc)
+    assert "source" in str(exc)
+    assert str(FailedParseException("custom", None, chunk, EmptyLine(), "")) == (
+        "custom"
+    )
+
+
+def test_failed_parse_repr_and_args():
+    chunk = next(ChunkIterator(StringIO("text\n"), "source"))
+    exc = FailedParseException(None, "no match", chunk, EmptyLine(), "origin")
+    assert exc.args == (str(exc),)
+    assert repr(exc) == f"FailedParseException({str(exc)!r})"
+    custom = FailedParseException("custom", None, chunk, EmptyLine(), "")
+    assert custom.args == ("custom",)
+    assert repr(custom) == "FailedParseException('custom')"
+
+
+@pytest.mark.parametrize(
+    "candidates",
+    [
+        (CountingEmptyLine,),
+        (CountingFalseCatchAll, CountingEmptyLine),
+        (CountingEmptyLine, CountingFalseCatchAll),
+        (CountingEmptyLine, CountingEmptyLine),
+    ],
+)
+def test_failing_candidates_are_tried_once(candidates):
+    parsers = [candidate() for candidate in candidates]
+    with pytest.raises(AllFailedToParseException) as exc_info:
+        parse(Parser(ListSchema(*parsers)), "text\n")
+    assert [parser.calls for parser in parsers] == [1] * len(parsers)
+    assert [exc.parser for exc in exc_info.value.excs] == parsers
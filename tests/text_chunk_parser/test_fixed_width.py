@@ -0,0 +1,78 @@
+# pylint: disable=missing-docstring
+import re
+from array import array
+
+import pytest
+from tests.text_chunk_parser.examples.flight import FLIGHT, FLIGHT_COLUMNS, FLIGHT_ROWS
+
+from pfmsoft.text_chunk_parser import Chunk, FailedParseException
+from pfmsoft.text_chunk_parser.enumerated_iterator import Enumerated
+from pfmsoft.text_chunk_parser.fixed_width import (
+    Column,
+    FixedWidthChunkParser,
+    columns_from_header,
+)
+
+LINES = FLIGHT.splitlines(keepends=True)
+HEADER = LINES[1]
+
+
+def test_columns_from_header():
+    columns = columns_from_header(HEADER)
+    assert columns[0] == Column("DP", 0, 3)
+    assert [column.name for column in columns[4:9]] == [
+        "STA",
+        "DLCL/DHBT",
+        "ML",
+        "STA_2",
+        "ALCL/AHBT",
+    ]
+    assert columns[-1].end is None
+    with pytest.raises(ValueError):
+        columns_from_header(HEADER, names=["too", "few"])
+
+
+def test_typecode_requires_convert():
+    with pytest.raises(ValueError):
+        FixedWidthChunkParser([Column("dp", 0, 3, typecode="i")], "flight")
+
+
+def test_from_header_parse():
+    parser = FixedWidthChunkParser.from_header(HEADER, "flight")
+    chunk = Chunk(Enumerated(6, FLIGHT_ROWS[0]))
+    result = parser.parse(chunk, "sequence")
+    assert result.new_state == "flight"
+    assert result.data["FLT#"] == "2019"
+    assert result.data["STA"] == "DFW"
+    assert result.data["ML"] == "L"
+    assert result.data["STA_2"] == "SFO"
+    assert result.data["BLOCK"] == "3.51"
+
+
+def test_parse_with_conversion():
+    parser = FixedWidthChunkParser(FLIGHT_COLUMNS, "flight")
+    result = parser.parse(Chunk(Enumerated(7, FLIGHT_ROWS[1])), "flight")
+    assert result.data["dp"] == 1
+    assert result.data["block"] == 3.38
+    assert result.data["arrival_station"] == "DFW"
+
+
+def test_parse_fail():
+    parser = FixedWidthChunkParser(
+        FLIGHT_COLUMNS, "flight", pattern=re.compile(r"^\d+\s")
+    )
+    with pytest.raises(FailedParseException):
+        parser.parse(Chunk(Enumerated(3, LINES[3])), "sequence")
+    # Passes the pattern, but the block column is not a float.
+    bad_row = FLIGHT_ROWS[0][:48] + "  n/a" + FLIGHT_ROWS[0][53:]
+    with pytest.raises(FailedParseException):
+        parser.parse(Chunk(Enumerated(6, bad_row)), "sequence")
+
+
+def test_extract_block():
+    parser = FixedWidthChunkParser(FLIGHT_COLUMNS, "flight")
+    block = parser.extract_block(FLIGHT_ROWS)
+    assert block["dp"] == array("i", [1, 1, 1])
+    assert block["block"] == array("d", [3.51, 3.38, 1.01])
+    assert block["departure_station"] == ["DFW", "SFO", "DFW"]
+    assert [parser.extract(row) for row in FLIGHT_ROWS][2]["flight"] == "2199"
@@ -0,0 +1,54 @@
+# pylint: disable=missing-docstring
+import os
+import subprocess
+import sys
+from importlib import import_module
+
+import pytest
+
+import pfmsoft.text_chunk_parser as text_chunk_parser
+
+
+def _run_isolated(code: str) -> str:
+    """Run code in a fresh interpreter, so sys.modules starts empty."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(sys.path)
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        check=True,
+        env=env,
+        text=True,
+    )
+    return completed.stdout.strip()
+
+
+def test_import_does_not_load_parser_stack():
+    code = (
+        "import sys\n"
+        "import pfmsoft.text_chunk_parser\n"
+        "print('pfmsoft.text_chunk_parser.chunk_parser' in sys.modules)\n"
+    )
+    assert _run_isolated(code) == "False"
+
+
+def test_attribute_access_loads_parser_stack():
+    code = (
+        "import sys\n"
+        "from pfmsoft.text_chunk_parser import Parser\n"
+        "print('pfmsoft.text_chunk_parser.chunk_parser' in sys.modules)\n"
+    )
+    assert _run_isolated(code) == "True"
+
+
+def test_lazy_names_resolve():
+    # pylint: disable=protected-access
+    for name in text_chunk_parser.__all__:
+        module = import_module(text_chunk_parser._LAZY_ATTRIBUTES[name])
+        assert getattr(text_chunk_parser, name) is getattr(module, name)
+        assert name in dir(text_chunk_parser)
+
+
+def test_unknown_attribute():
+    with pytest.raises(AttributeError):
+        _ = text_chunk_parser.NotAParser  # type: ignore
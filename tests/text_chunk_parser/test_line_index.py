@@ -0,0 +1,101 @@
+# pylint: disable=missing-docstring
+import gzip
+import os
+from pathlib import Path
+
+import pytest
+
+from pfmsoft.text_chunk_parser import ChunkIterator
+from pfmsoft.text_chunk_parser.line_index import (
+    LineIndex,
+    build_line_index,
+    index_path_for,
+)
+from pfmsoft.text_chunk_parser.sharding import shard_chunks
+
+LINES = [f"line {count}\n" if count % 5 else "\n" for count in range(1, 101)]
+
+
+@pytest.fixture(name="text_file")
+def text_file_(tmp_path: Path) -> Path:
+    path = tmp_path / "data.txt"
+    path.write_text("".join(LINES) + "last")
+    return path
+
+
+def test_build_and_load(text_file: Path):
+    index = build_line_index(text_file, step=8)
+    assert index.line_count == 101
+    assert len(index.offsets) == 13
+    loaded = LineIndex.load(index_path_for(text_file))
+    assert loaded.offsets == index.offsets
+    assert loaded.kept == index.kept
+    assert (loaded.step, loaded.line_count, loaded.size) == (8, 101, index.size)
+    assert not loaded.is_kept(5)
+    assert loaded.is_kept(6)
+
+
+@pytest.mark.parametrize("start,end", [(1, 3), (9, 20), (17, 17), (95, None)])
+def test_from_index(text_file: Path, start, end):
+    build_line_index(text_file, step=8)
+    chunks = list(ChunkIterator.from_index(text_file, start, end))
+    text = (LINES + ["last"])[start - 1 : end]
+    expected = [
+        (count, line)
+        for count, line in enumerate(text, start)
+        if line.strip() and count % 5
+    ]
+    assert [(chunk.count, chunk.text) for chunk in chunks] == expected
+    assert chunks[0].source == str(text_file)
+
+
+def test_from_index_bytes_and_filter(text_file: Path):
+    index = build_line_index(text_file, step=8, chunk_filter=None)
+    assert index.kept is None
+    chunks = ChunkIterator.from_index(
+        text_file, 4, 6, index=index, encoding=None, chunk_filter=None
+    )
+    assert [chunk.text for chunk in chunks] == [b"line 4\n", b"\n", b"line 6\n"]
+
+
+def test_out_of_date(text_file: Path):
+    build_line_index(text_file)
+    with text_file.open("a") as stream:
+        stream.write("more\n")
+    with pytest.raises(ValueError):
+        ChunkIterator.from_index(text_file, 1)
+
+
+def test_bad_arguments(tmp_path: Path, text_file: Path):
+    with pytest.raises(FileNotFoundError):
+        ChunkIterator.from_index(text_file, 1)
+    index = build_line_index(text_file)
+    with pytest.raises(ValueError):
+        ChunkIterator.from_index(text_file, 102, index=index)
+    with pytest.raises(ValueError):
+        build_line_index(text_file, step=0)
+    compressed = tmp_path / "data.gz"
+    compressed.write_bytes(gzip.compress(b"line\n"))
+    with pytest.raises(ValueError):
+        build_line_index(compressed)
+
+
+def test_split_shards(text_file: Path):
+    index = build_line_index(text_file, step=8, chunk_filter=None)
+    shards = index.split_shards(3)
+    assert len(shards) == 3
+    assert shards[0].start == 0
+    assert shards[-1].end == os.path.getsize(text_file)
+    counts = []
+    for shard in shards:
+        chunks = shard_chunks(text_file, shard, chunk_options={"chunk_filter": None})
+        counts.extend(chunk.count for chunk in chunks)
+    assert counts == list(range(1, 102))
+
+
+def test_empty_file(tmp_path: Path):
+    path = tmp_path / "empty.txt"
+    path.write_text("")
+    index = build_line_index(path)
+    assert index.line_count == 0
+    assert [(shard.start, shard.end) for shard in index.split_shards(4)] == [(0, 0)]
@@ -0,0 +1,98 @@
+# pylint: disable=missing-docstring
+from io import StringIO
+from typing import List
+
+import pytest
+from tests.text_chunk_parser.examples.json_dict import (
+    JSON_DICT,
+    JsonParseSchema,
+    JsonResultHandler,
+)
+
+from pfmsoft.text_chunk_parser import (
+    AllFailedToParseException,
+    ChunkIterator,
+    EmptyLine,
+    MultiParser,
+    Parser,
+    ParseResult,
+    ParseSchema,
+    SkipChunk,
+)
+
+
+class BlankLineSchema(ParseSchema):
+    """Counts the blank lines, skips everything else."""
+
+    def __init__(self) -> None:
+        self.parsers = (EmptyLine(), SkipChunk())
+
+    def expected(self, state: str):
+        return self.parsers
+
+
+class EmptyOnlySchema(ParseSchema):
+    def expected(self, state: str):
+        return (EmptyLine(),)
+
+
+def chunks(text: str = JSON_DICT) -> ChunkIterator:
+    return ChunkIterator(StringIO(text), "json", chunk_filter=None)
+
+
+def test_matches_separate_parses():
+    expected: List[List[ParseResult]] = [[], []]
+    Parser(JsonParseSchema()).parse(JsonResultHandler(expected[0]), chunks())
+    Parser(BlankLineSchema()).parse(JsonResultHandler(expected[1]), chunks())
+    results: List[List[ParseResult]] = [[], []]
+    multi = MultiParser([Parser(JsonParseSchema()), BlankLineSchema()])
+    states = multi.parse([JsonResultHandler(items) for items in results], chunks())
+    assert states == ["dict_end", "empty_line"]
+    for got, want in zip(results, expected):
+        assert [(r.chunk.count, r.new_state, r.data) for r in got] == [
+            (r.chunk.count, r.new_state, r.data) for r in want
+        ]
+    # Both parsers saw the same chunk objects.
+    assert results[0][0].chunk is results[1][0].chunk
+
+
+def test_start_states():
+    multi = MultiParser([BlankLineSchema(), BlankLineSchema()])
+    handlers = [JsonResultHandler([]), JsonResultHandler([])]
+    states = multi.parse(handlers, chunks("text\n"), states=["a", "b"])
+    assert states == ["a", "b"]
+
+
+def test_failure_raises():
+    multi = MultiParser([JsonParseSchema(), EmptyOnlySchema()])
+    with pytest.raises(AllFailedToParseException):
+        multi.parse([JsonResultHandler([]), JsonResultHandler([])], chunks())
+
+
+def test_failure_closes_read_ahead():
+    lines = (f"line {count}\n" for count in range(100000))
+    chunk_iterator = ChunkIterator(lines, read_ahead=2, batch_size=10)
+    multi = MultiParser([EmptyOnlySchema()])
+    with pytest.raises(AllFailedToParseException):
+        multi.parse([JsonResultHandler([])], chunk_iterator)
+    assert chunk_iterator.reader is not None
+    assert not chunk_iterator.reader.thread.is_alive()
+
+
+def test_isolated_failure():
+    results: List[List[ParseResult]] = [[], []]
+    multi = MultiParser([JsonParseSchema(), EmptyOnlySchema()], isolate_failures=True)
+    states = multi.parse([JsonResultHandler(items) for items in results], chunks())
+    assert states == ["dict_end", "empty_line"]
+    assert list(multi.failures) == [1]
+    assert multi.failures[1].chunk.count == 2
+    assert len(results[0]) == len(JSON_DICT.splitlines())
+    assert len(results[1]) == 1
+
+
+def test_handler_count():
+    multi = MultiParser([JsonParseSchema(), BlankLineSchema()])
+    with pytest.raises(ValueError):
+        multi.parse([JsonResultHandler([])], chunks())
+    with pytest.raises(ValueError):
+        MultiParser([])
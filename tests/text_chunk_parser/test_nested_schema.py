@@ -0,0 +1,169 @@
+# pylint: disable=missing-docstring
+from io import StringIO
+from typing import List
+
+import pytest
+from tests.text_chunk_parser.examples.json_dict import JsonResultHandler
+
+from pfmsoft.text_chunk_parser import ChunkIterator, Parser, ParseResult, compile_schema
+from pfmsoft.text_chunk_parser.nested_schema import (
+    _CACHE_SIZE,
+    NestedParseSchema,
+    NestedStateException,
+)
+from pfmsoft.text_chunk_parser.schema_analysis import (
+    SchemaValidationException,
+    validate_schema,
+)
+
+NESTED_JSON = """
+foo = {
+    "Name": "B. S. Johnson",
+    "Notable Creations": [
+        "Archchancellor's Bathroom",
+        "Colossus of Ankh-Morpork",
+    ],
+    "Address": {
+        "City": "Ankh-Morpork",
+        "Streets": [
+            "Broad Way",
+        ],
+    },
+    "Profession": "Engineer",
+}
+"""
+KEY = r'^\s*"(?P<key>[\w\s]+)":\s*'
+SCHEMAS = {
+    "document": {
+        "parsers": {
+            "identifier": {
+                "regex": r"^(?P<identifier>\w+)\s+=\s+\{\n$",
+                "new_state": "push:dict",
+            }
+        },
+        "states": {"origin": ["identifier"]},
+    },
+    "dict": {
+        "parsers": {
+            "key_value": {
+                "regex": KEY + r'"(?P<value>[\w\s.\-]+)",\n$',
+                "new_state": "key_value",
+            },
+            "key_list": {"regex": KEY + r"\[\n$", "new_state": "push:list"},
+            "key_dict": {"regex": KEY + r"\{\n$", "new_state": "push:dict"},
+            "dict_end": {"regex": r"^\s*},?\n$", "new_state": "pop"},
+        },
+        "states": {
+            "origin": ["key_value", "key_list", "key_dict", "dict_end"],
+            "key_value": ["key_value", "key_list", "key_dict", "dict_end"],
+        },
+    },
+    "list": {
+        "parsers": {
+            "list_value": {"regex": r'^\s*"(?P<value>[\w\s\'\-]+)",\n$'},
+            "list_end": {"regex": r"^\s*\],\n$", "new_state": "pop"},
+        },
+        "states": {"origin": ["list_value", "list_end"]},
+    },
+}
+
+
+def nested_schema() -> NestedParseSchema:
+    return NestedParseSchema(
+        {name: compile_schema(definition) for name, definition in SCHEMAS.items()},
+        root="document",
+    )
+
+
+def test_nested_parse():
+    schema = nested_schema()
+    results: List[ParseResult] = []
+    end_state = Parser(schema).parse(
+        JsonResultHandler(results), ChunkIterator(StringIO(NESTED_JSON))
+    )
+    assert end_state == "origin"
+    states = [result.new_state for result in results]
+    assert states[:3] == [
+        "origin/dict:origin",
+        "origin/dict:key_value",
+        "origin/dict:key_value/list:origin",
+    ]
+    assert "origin/dict:key_value/dict:key_value/list:origin" in states
+    assert states[-2] == "origin/dict:key_value"
+    assert max(NestedParseSchema.depth(state) for state in states) == 3
+    streets = [result for result in results if result.data.get("value") == "Broad Way"]
+    assert streets[0].new_state.endswith("/dict:key_value/list:origin")
+    # Each state only tries the parsers of its own sub-schema.
+    assert max(len(schema.expected(state)) for state in states) == 4
+
+
+def test_resolve():
+    schema = nested_schema()
+    assert schema.next_state("origin", "push:list") == "origin/list:origin"
+    assert schema.next_state("a/dict:b/list:c", "pop") == "a/dict:b"
+    assert schema.next_state("a/dict:b/list:c", "pop:x") == "a/dict:x"
+    assert schema.next_state("a/dict:b", "x") == "a/dict:x"
+    assert schema.next_state("origin", "x") == "x"
+    assert NestedParseSchema.top("a/dict:b", "document") == ("dict", "b")
+    assert NestedParseSchema.top("a", "document") == ("document", "a")
+
+
+@pytest.mark.parametrize("new_state", ["pop", "push:missing", "a/b"])
+def test_resolve_errors(new_state):
+    with pytest.raises(NestedStateException):
+        nested_schema().next_state("origin", new_state)
+
+
+def test_invalid_names():
+    with pytest.raises(ValueError):
+        NestedParseSchema({"a:b": compile_schema(SCHEMAS["list"])}, root="a:b")
+    with pytest.raises(ValueError):
+        NestedParseSchema({}, root="document")
+
+
+def test_validate_nested_schema():
+    flat = dict(SCHEMAS)
+    # Without nested dicts the paths are bounded.
+    parsers = ["key_value", "key_list", "dict_end"]
+    flat["dict"] = {
+        "parsers": SCHEMAS["dict"]["parsers"],
+        "states": {"origin": parsers, "key_value": parsers},
+    }
+    schema = NestedParseSchema(
+        {name: compile_schema(definition) for name, definition in flat.items()},
+        root="document",
+    )
+    Parser(schema, validate=True)
+    report = validate_schema(schema)
+    assert report.complete
+    assert "origin/dict:key_value/list:origin" in report.graph
+    # Recursive dicts are walked up to max_states.
+    report = validate_schema(nested_schema(), max_states=50)
+    assert report.truncated and not report.complete
+    assert len(report.graph) == 50
+    assert not any(":" in state and "/" not in state for state in report.graph)
+
+
+def test_validate_nested_schema_bad_push():
+    definitions = dict(SCHEMAS)
+    definitions["document"] = {
+        "parsers": {"identifier": {"regex": r"^\w+", "new_state": "push:missing"}},
+        "states": {"origin": ["identifier"]},
+    }
+    schema = NestedParseSchema(
+        {name: compile_schema(definition) for name, definition in definitions.items()},
+        root="document",
+    )
+    with pytest.raises(SchemaValidationException, match="push:missing"):
+        Parser(schema, validate=True)
+
+
+def test_caches_are_bounded():
+    schema = nested_schema()
+    state = "origin"
+    for _ in range(3000):
+        schema.expected(state)
+        state = schema.next_state(state, "push:dict")
+    # pylint: disable=protected-access
+    assert len(schema._expected) <= _CACHE_SIZE
+    assert len(schema._transitions) <= _CACHE_SIZE
@@ -0,0 +1,50 @@
+# pylint: disable=missing-docstring
+from io import StringIO
+from typing import List
+
+import pytest
+from tests.text_chunk_parser.examples.json_dict import (
+    JSON_DICT,
+    JsonParseSchema,
+    JsonResultHandler,
+)
+
+from pfmsoft.text_chunk_parser import ChunkIterator, Parser, ParseResult
+
+
+def parse(retain: str) -> List[ParseResult]:
+    results: List[ParseResult] = []
+    Parser(JsonParseSchema(), retain=retain).parse(
+        JsonResultHandler(results), ChunkIterator(StringIO(JSON_DICT))
+    )
+    return results
+
+
+def test_full():
+    results = parse("full")
+    assert results[1].chunk.peek
+    assert results[1].chunk.past
+
+
+def test_line_only():
+    full = parse("full")
+    results = parse("line_only")
+    assert [(result.chunk.count, result.chunk.text) for result in results] == [
+        (result.chunk.count, result.chunk.text) for result in full
+    ]
+    assert [result.data for result in results] == [result.data for result in full]
+    for result in results:
+        assert result.chunk.peek == ()
+        assert result.chunk.past == ()
+        assert result.chunk.cache is None
+
+
+def test_none():
+    results = parse("none")
+    assert all(result.chunk is None for result in results)
+    assert results[0].new_state == "identifier"
+
+
+def test_unsupported_mode():
+    with pytest.raises(ValueError):
+        Parser(JsonParseSchema(), retain="some")
@@ -0,0 +1,123 @@
+# pylint: disable=missing-docstring
+import pickle
+import random
+import re
+from typing import List
+
+import pytest
+from tests.text_chunk_parser.examples.json_dict import JsonResultHandler
+
+from pfmsoft.text_chunk_parser import ChunkIterator, Parser, ParseResult, compile_schema
+from pfmsoft.text_chunk_parser.declarative_schema import SchemaDefinitionException
+from pfmsoft.text_chunk_parser.pattern_engines import (
+    ENGINES,
+    DfaPattern,
+    UnsupportedPatternException,
+    compile_pattern,
+)
+from pfmsoft.text_chunk_parser.regex_lint import lint_parsers
+
+PATTERNS = [
+    r"^PAGE (?P<page>\d+)",
+    r"^TITLE (?P<title>.*)\n",
+    r"^END$",
+    r"^}\n$",
+    r'^\s*"(?P<key>[\w\s]+)":\s*"(?P<value>[\w\s.]+)",\n$',
+    r"^\s*(\w+\s?)*:\n$",
+    r"a{2,4}b?",
+    r"(ab|a)*?c\Z",
+    r"[^,x-z]+,",
+    r"\S+\s\W",
+    r"(?s).*x",
+    r"(?a)\w+$",
+]
+TEXTS = ["PAGE 12", "END\n", "END", "}\n", "ab ab:\n", "aab", ' "k": "v",\n']
+ALPHABET = 'abcx,: \n1é٣ _".PAGE}'
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_dfa_agrees_with_re(pattern):
+    rng = random.Random(pattern)
+    for kind in (str, bytes):
+        regex = re.compile(pattern if kind is str else pattern.encode())
+        dfa = DfaPattern(regex)
+        for _ in range(500):
+            text = rng.choice(TEXTS) if rng.random() < 0.3 else ""
+            text += "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 8)))
+            value = text if kind is str else text.encode()
+            assert dfa.accepts(value) == bool(regex.match(value)), value
+
+
+@pytest.mark.parametrize(
+    "pattern", [r"(a)\1", r"(?=a)a", r"\bword", r"(?i)abc", r"a*+", r"(?i:a)b"]
+)
+def test_dfa_unsupported(pattern):
+    with pytest.raises(UnsupportedPatternException):
+        DfaPattern(re.compile(pattern))
+    assert compile_pattern(pattern, "dfa")[1] == "re"
+
+
+def test_dfa_match_and_pickle():
+    pattern, engine = compile_pattern(r"^PAGE (?P<page>\d+)", "dfa")
+    assert engine == "dfa"
+    assert pattern.match("PAGE 7\n").group("page") == "7"
+    assert pattern.match("PAGES\n") is None
+    assert pattern.groupindex == {"page": 1}
+    copied = pickle.loads(pickle.dumps(pattern))
+    assert copied.match("PAGE 8").group("page") == "8"
+
+
+def test_dfa_rejects_in_linear_time():
+    dfa = DfaPattern(re.compile(r"^\s*(\w+\s?)*:\n$"))
+    # Backtracks about 2**40 ways with re.
+    assert dfa.match("a" * 40 + "\n") is None
+
+
+def test_dfa_state_limit():
+    dfa = DfaPattern(re.compile(r"[ab]*a[ab]{6}$"), max_states=4)
+    rng = random.Random(1)
+    for _ in range(200):
+        text = "".join(rng.choice("ab") for _ in range(12))
+        assert dfa.accepts(text) == bool(dfa.regex.match(text))
+    assert len(dfa._states) == 4  # pylint: disable=protected-access
+
+
+def test_compile_pattern_fallback():
+    assert compile_pattern("a", ["re2", "dfa"])[1] == (
+        "re2" if ENGINES["re2"].available() else "dfa"
+    )
+    assert isinstance(compile_pattern("a")[0], re.Pattern)
+    with pytest.raises(ValueError):
+        compile_pattern("a", "pcre")
+    with pytest.raises(re.error):
+        compile_pattern("(", "dfa")
+
+
+DEFINITION = {
+    "parsers": {
+        "page": {"regex": r"^PAGE (?P<page>\d+)", "new_state": "page"},
+        "words": {"regex": r"^(\w+\s?)*:\n$", "engine": "re"},
+        "skip": {},
+    },
+    "states": {"origin": ["page", "words", "skip"], "page": ["words", "skip"]},
+}
+
+
+def test_schema_engine():
+    schema = compile_schema(DEFINITION, engine="dfa")
+    assert schema.parsers["page"].engine == "dfa"
+    assert schema.parsers["words"].engine == "re"
+    assert schema.parsers["skip"].engine is None
+    # Only the pattern compiled with re is linted.
+    assert [x.name for x, _ in lint_parsers(schema.parsers.values())] == ["words"]
+    results: List[ParseResult] = []
+    lines = ["PAGE 3\n", "alpha beta:\n", "other\n"]
+    with JsonResultHandler(results) as handler:
+        Parser(schema).parse(handler, ChunkIterator(lines))
+    assert [x.parser.name for x in results] == ["page", "words", "skip"]
+    assert results[0].data == {"page": "3"}
+
+
+def test_schema_unknown_engine():
+    with pytest.raises(SchemaDefinitionException):
+        compile_schema(DEFINITION, engine="pcre")
@@ -0,0 +1,94 @@
+# pylint: disable=missing-docstring
+import json
+import time
+from pathlib import Path
+from typing import List
+
+import pytest
+from tests.text_chunk_parser.examples.json_dict import JsonResultHandler
+
+from pfmsoft.text_chunk_parser import (
+    ChunkIterator,
+    ChunkParser,
+    Parser,
+    ParseResult,
+    ParseSchema,
+    SamplingProfiler,
+)
+
+# Lines 1-20 are fast, 21-30 are slow, 31-40 are fast.
+LINES = ["fast\n"] * 20 + ["slow\n"] * 10 + ["fast\n"] * 10
+
+
+class LineState(ChunkParser):
+    """Moves to a state named after the line, slow lines take a while."""
+
+    def parse(self, chunk, state, parse_hints=None) -> ParseResult:
+        if chunk.text == "slow\n":
+            time.sleep(0.002)
+        return ParseResult(chunk.text.strip(), {}, self, chunk)
+
+
+class Schema(ParseSchema):
+    def __init__(self) -> None:
+        self.parsers = (LineState(),)
+
+    def expected(self, state: str):
+        return self.parsers
+
+
+def profile(every: int) -> SamplingProfiler:
+    profiler = SamplingProfiler(every=every)
+    results: List[ParseResult] = []
+    Parser(Schema(), profiler=profiler).parse(
+        JsonResultHandler(results), ChunkIterator(LINES, "data", chunk_filter=None)
+    )
+    assert len(results) == len(LINES)
+    return profiler
+
+
+def test_sampling_interval():
+    profiler = profile(every=7)
+    assert [sample.count for sample in profiler.samples] == [7, 14, 21, 28, 35]
+    # The sample keeps the state the chunk was parsed in, set by the line before.
+    assert [sample.state for sample in profiler.samples] == [
+        "fast",
+        "fast",
+        "fast",
+        "slow",
+        "fast",
+    ]
+
+
+def test_by_state_and_region():
+    profiler = profile(every=1)
+    by_state = profiler.by_state()
+    # Lines 22-31 are parsed in the "slow" state.
+    assert list(by_state)[0] == "slow"
+    assert by_state["slow"]["samples"] == 10
+    regions = profiler.by_region(lines=10)
+    assert [region["first_line"] for region in regions] == [1, 11, 21, 31]
+    slowest = max(regions, key=lambda region: region["mean_seconds"])
+    assert slowest["first_line"] == 21
+    assert slowest["lines_per_second"] < regions[0]["lines_per_second"]
+
+
+def test_exports(tmp_path: Path):
+    profiler = profile(every=5)
+    profiler.write_json(tmp_path / "profile.json", lines=10)
+    loaded = json.loads((tmp_path / "profile.json").read_text())
+    assert loaded["every"] == 5
+    assert len(loaded["samples"]) == 8
+    assert len(loaded["by_region"]) == 4
+    profiler.write_collapsed(tmp_path / "profile.folded", lines=10)
+    stacks = (tmp_path / "profile.folded").read_text().splitlines()
+    assert "data;lines 21-30;slow " in "\n".join(stacks)
+    for stack in stacks:
+        frames, value = stack.rsplit(" ", 1)
+        assert len(frames.split(";")) == 3
+        assert int(value) >= 0
+
+
+def test_every_must_be_positive():
+    with pytest.raises(ValueError):
+        SamplingProfiler(every=0)
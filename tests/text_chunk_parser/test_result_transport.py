@@ -0,0 +1,78 @@
+# pylint: disable=missing-docstring
+from io import StringIO
+from multiprocessing import shared_memory
+
+import pytest
+from tests.text_chunk_parser.examples.json_dict import JSON_DICT, JsonParseSchema
+
+from pfmsoft.text_chunk_parser import (
+    ChunkIterator,
+    Parser,
+    compile_schema,
+    result_transport,
+)
+from pfmsoft.text_chunk_parser.result_transport import (
+    EncodingHandler,
+    decode_results,
+    encode_results,
+    release_block,
+)
+
+
+def encoded(schema, chunk_context: bool):
+    handler = EncodingHandler(schema, "origin", chunk_context)
+    Parser(schema).parse(
+        handler, ChunkIterator(StringIO(JSON_DICT * 3), "json", chunk_filter=None)
+    )
+    return handler, encode_results(handler)
+
+
+@pytest.mark.parametrize("chunk_context", [False, True])
+@pytest.mark.parametrize("batch", [5, 1024])
+def test_round_trip(chunk_context, batch, monkeypatch):
+    monkeypatch.setattr(result_transport, "_PICKLE_BATCH", batch)
+    schema = JsonParseSchema()
+    handler, block = encoded(schema, chunk_context)
+    results = list(decode_results(block, schema))
+    assert [result.chunk.count for result in results] == list(handler.counts)
+    assert [result.chunk.text for result in results] == handler.texts
+    assert [result.data for result in results] == handler.data
+    key_value = results[2]
+    assert key_value.new_state == "key_value"
+    assert key_value.parser is schema.expected("identifier")[0]
+    assert key_value.chunk.source == "json"
+    assert bool(key_value.chunk.peek) is chunk_context
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=block.name)
+
+
+@pytest.mark.parametrize("chunk_context", [False, True])
+def test_round_trip_bytes(chunk_context):
+    schema = compile_schema(
+        {
+            "parsers": {"word": {"regex": r"^(?P<word>\S+)"}},
+            "states": {"origin": ["word"]},
+        },
+        encoding="utf-8",
+    )
+    handler = EncodingHandler(schema, "origin", chunk_context)
+    lines = [b"alpha\n", b"caf\xc3\xa9\n"]
+    Parser(schema).parse(handler, ChunkIterator(lines, "bytes"))
+    block = encode_results(handler)
+    assert block.binary
+    results = list(decode_results(block, schema))
+    assert [result.chunk.text for result in results] == lines
+    assert [result.data for result in results] == [{"word": "alpha"}, {"word": "café"}]
+    assert results[0].parser is schema.parsers["word"]
+    assert results[0].chunk.peek == (handler.context[0][0] if chunk_context else ())
+
+
+def test_empty_and_release():
+    schema = JsonParseSchema()
+    empty = encode_results(EncodingHandler(schema, "origin", False))
+    assert empty.name is None
+    assert not list(decode_results(empty, schema))
+    _, block = encoded(schema, False)
+    release_block(block)
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=block.name)
@@ -0,0 +1,93 @@
+# pylint: disable=missing-docstring
+from typing import Sequence
+
+import pytest
+from tests.text_chunk_parser.examples.json_dict import (
+    DictEndLine,
+    JsonParseSchema,
+    KeyValueLine,
+)
+
+from pfmsoft.text_chunk_parser import (
+    ChunkParser,
+    EmptyLine,
+    Parser,
+    ParseSchema,
+    SkipChunk,
+    compile_schema,
+)
+from pfmsoft.text_chunk_parser.schema_analysis import (
+    SchemaValidationException,
+    analyze_schema,
+    validate_schema,
+)
+
+
+class DictSchema(ParseSchema):
+    def __init__(self, schema):
+        self.schema = schema
+
+    def expected(self, state: str) -> Sequence[ChunkParser]:
+        parsers = self.schema.get(state, None)
+        if parsers is None:
+            raise NotImplementedError()
+        return parsers
+
+    def defined_states(self) -> Sequence[str]:
+        return list(self.schema)
+
+
+def test_json_schema_is_valid():
+    report = validate_schema(JsonParseSchema())
+    assert report.complete
+    assert report.graph["key_value"] == {"key_value", "key_list"}
+    Parser(JsonParseSchema(), validate=True)
+
+
+def test_problems():
+    schema = DictSchema(
+        {
+            "origin": [EmptyLine(), SkipChunk(), KeyValueLine()],
+            "empty_line": [DictEndLine()],
+            "dict_end": [],
+            "orphan": [EmptyLine()],
+        }
+    )
+    report = analyze_schema(schema)
+    assert set(report.missing_states) == set()
+    assert report.empty_states == ["dict_end"]
+    assert report.unreachable_states == ["orphan"]
+    assert [(state, type(parser)) for state, parser, _ in report.shadowed_parsers] == [
+        ("origin", KeyValueLine)
+    ]
+    assert len(report.problems()) == 3
+    with pytest.raises(SchemaValidationException):
+        Parser(schema, validate=True)
+
+
+def test_missing_state():
+    schema = DictSchema({"origin": [KeyValueLine()]})
+    report = analyze_schema(schema)
+    assert "NotImplementedError" in report.missing_states["key_value"]
+
+
+def test_undeclared_parser():
+    class Undeclared(ChunkParser):
+        pass
+
+    schema = DictSchema({"origin": [Undeclared()], "orphan": [EmptyLine()]})
+    report = validate_schema(schema)
+    assert not report.complete
+    # Undeclared parsers could reach any state, so nothing is unreachable.
+    assert report.unreachable_states == []
+
+
+def test_compiled_schema():
+    schema = compile_schema(
+        {
+            "parsers": {"header": {"regex": "^SEQ", "new_state": "seq"}, "skip": {}},
+            "states": {"origin": ["header", "skip"], "seq": ["skip"]},
+        }
+    )
+    report = validate_schema(schema)
+    assert report.graph == {"origin": {"origin", "seq"}, "seq": {"seq"}}
@@ -0,0 +1,136 @@
+# pylint: disable=missing-docstring
+from io import StringIO
+from typing import List
+
+import pytest
+from tests.text_chunk_parser.examples.json_dict import (
+    JSON_DICT,
+    JsonParseSchema,
+    JsonResultHandler,
+)
+
+from pfmsoft.text_chunk_parser import (
+    ChunkIterator,
+    Parser,
+    ParseResult,
+    ParseSchema,
+    SkipChunk,
+)
+from pfmsoft.text_chunk_parser.chunk_parser import ChunkParserException
+from pfmsoft.text_chunk_parser.sharding import (
+    ShardParseException,
+    parse_sharded,
+    split_shards,
+)
+
+# The example schema parses the blank lines between dicts.
+CHUNK_OPTIONS = {"chunk_filter": None}
+
+
+def summary(results: List[ParseResult]):
+    return [(result.chunk.count, result.new_state, result.data) for result in results]
+
+
+@pytest.fixture(name="json_path")
+def json_path_(tmp_path):
+    path = tmp_path / "json_dicts.txt"
+    path.write_text(JSON_DICT * 40)
+    return path
+
+
+def sequential_results(text: str) -> List[ParseResult]:
+    results: List[ParseResult] = []
+    Parser(JsonParseSchema()).parse(
+        JsonResultHandler(results), ChunkIterator(StringIO(text), **CHUNK_OPTIONS)
+    )
+    return results
+
+
+class AnyState(ParseSchema):
+    def expected(self, state):
+        return [SkipChunk()]
+
+
+def test_split_shards(tmp_path):
+    path = tmp_path / "lines.txt"
+    text = "".join(f"line {index}\n" for index in range(100)) + "no newline"
+    path.write_text(text)
+    shards = split_shards(path, 7, block_size=64)
+    assert len(shards) == 7
+    assert shards[0].start == 0
+    assert shards[-1].end == len(text)
+    assert shards[-1].end_count == 101
+    for shard, following in zip(shards, shards[1:]):
+        assert shard.end == following.start
+        assert shard.end_count == following.start_count
+        assert text[shard.end - 1] == "\n"
+        assert text[: shard.end].count("\n") == shard.end_count
+
+
+def test_split_shards_long_line(tmp_path):
+    path = tmp_path / "lines.txt"
+    path.write_text("x" * 1000 + "\nshort\n")
+    assert [shard.start for shard in split_shards(path, 4, block_size=64)] == [
+        0,
+        1001,
+    ]
+
+
+def test_start_count_and_state():
+    chunks = ChunkIterator(StringIO('    "Name": "B. S. Johnson",\n'), start_count=41)
+    results: List[ParseResult] = []
+    end_state = Parser(JsonParseSchema()).parse(
+        JsonResultHandler(results), chunks, "identifier"
+    )
+    assert end_state == "key_value"
+    assert results[0].chunk.count == 42
+
+
+@pytest.mark.parametrize(
+    "max_workers,transport", [(0, "pickle"), (2, "pickle"), (2, "shared_memory")]
+)
+def test_parse_sharded(json_path, max_workers, transport):
+    results: List[ParseResult] = []
+    end_state = parse_sharded(
+        json_path,
+        Parser(JsonParseSchema()),
+        JsonResultHandler(results),
+        shards=5,
+        max_workers=max_workers,
+        chunk_options=CHUNK_OPTIONS,
+        transport=transport,
+    )
+    assert end_state == "dict_end"
+    assert summary(results) == summary(sequential_results(JSON_DICT * 40))
+
+
+@pytest.mark.parametrize("max_workers", [0, 2])
+def test_parse_sharded_failure(tmp_path, max_workers):
+    path = tmp_path / "bad.txt"
+    path.write_text("not json\n" + JSON_DICT * 20)
+    with pytest.raises(ShardParseException) as exc_info:
+        parse_sharded(
+            path,
+            Parser(JsonParseSchema()),
+            JsonResultHandler([]),
+            shards=4,
+            prescan_schema=AnyState(),
+            max_workers=max_workers,
+            chunk_options=CHUNK_OPTIONS,
+        )
+    assert exc_info.value.shard.index == 0
+    assert "failed to parse" in str(exc_info.value)
+
+
+def test_prescan_mismatch(json_path):
+    # Every shard after the first starts in "origin", which the parse disagrees with.
+    with pytest.raises(ChunkParserException):
+        parse_sharded(
+            json_path,
+            Parser(JsonParseSchema()),
+            JsonResultHandler([]),
+            shards=3,
+            prescan_schema=AnyState(),
+            max_workers=0,
+            chunk_options=CHUNK_OPTIONS,
+        )
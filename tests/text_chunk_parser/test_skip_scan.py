@@ -0,0 +1,74 @@
+# pylint: disable=missing-docstring
+import random
+from typing import List
+
+import pytest
+from tests.text_chunk_parser.examples.buried_text import BURIED_TEXT
+
+from pfmsoft.text_chunk_parser import ChunkIterator, compile_schema
+from pfmsoft.text_chunk_parser.enumerated_iterator import Enumerated
+from pfmsoft.text_chunk_parser.skip_scan import SkipScanner
+
+
+def split_blocks(text: str, rng: random.Random) -> List[str]:
+    """Split text into blocks that end on random line boundaries."""
+    lines = text.splitlines(keepends=True)
+    blocks = []
+    while lines:
+        size = rng.randint(1, 4)
+        blocks.append("".join(lines[:size]))
+        lines = lines[size:]
+    return blocks
+
+
+def expected_lines(text: str, anchors, before: int, after: int) -> List[Enumerated]:
+    lines = text.splitlines(keepends=True)
+    keep = set()
+    for index, line in enumerate(lines):
+        if any(anchor in line for anchor in anchors):
+            keep.update(range(index - before, index + after + 1))
+    return [
+        Enumerated(index + 1, line) for index, line in enumerate(lines) if index in keep
+    ]
+
+
+def test_buried_text():
+    scanner = SkipScanner(["Some Useful Data"], after=3)
+    chunks = list(ChunkIterator(scanner.scan([BURIED_TEXT]), enumerated=True))
+    assert [chunk.count for chunk in chunks] == [9, 10, 11, 12]
+    assert chunks[1].text == "Name: B. S. Johnson\n"
+
+
+@pytest.mark.parametrize("before", [0, 1, 3])
+@pytest.mark.parametrize("after", [0, 2, 5])
+def test_scan_matches_reference(before, after):
+    rng = random.Random(before * 10 + after)
+    words = ["filler"] * 20 + ["SEQ", "RLS", "text"]
+    lines = [" ".join(rng.choices(words, k=3)) + "\n" for _ in range(200)]
+    text = "".join(lines) + "last RLS line without a newline"
+    anchors = ["SEQ RLS", "RLS"]
+    scanner = SkipScanner(anchors, before=before, after=after)
+    expected = expected_lines(text, anchors, before, after)
+    for _ in range(5):
+        assert list(scanner.scan(split_blocks(text, rng))) == expected
+    assert list(scanner.scan([text])) == expected
+
+
+def test_no_anchors():
+    with pytest.raises(ValueError):
+        SkipScanner([])
+
+
+def test_anchor_literals():
+    schema = compile_schema(
+        {
+            "parsers": {
+                "header": {"regex": r"^Some Useful Data\n$"},
+                "skip": {},
+                "any": {"regex": r"^\s*\w+"},
+            },
+            "states": {"origin": ["header", "skip"], "data": ["any", "skip"]},
+        }
+    )
+    assert schema.anchor_literals() == ["Some Useful Data"]
+    assert schema.anchor_literals("data") == []
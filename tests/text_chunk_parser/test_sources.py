@@ -0,0 +1,94 @@
+# pylint: disable=missing-docstring
+import bz2
+import gzip
+import io
+import lzma
+from pathlib import Path
+
+import pytest
+from tests.text_chunk_parser.examples.flight import FLIGHT
+
+from pfmsoft.text_chunk_parser import ChunkIterator
+from pfmsoft.text_chunk_parser.read_ahead import ReadAheadIterator
+from pfmsoft.text_chunk_parser.sources import (
+    decompressing_stream,
+    detect_compression,
+    iter_lines,
+    open_lines,
+)
+
+COMPRESSORS = {
+    "plain": lambda data: data,
+    "gzip": gzip.compress,
+    "bz2": bz2.compress,
+    "xz": lzma.compress,
+}
+
+
+@pytest.fixture(name="flight_files")
+def flight_files_(tmp_path: Path):
+    data = FLIGHT.encode("utf-8")
+    files = {}
+    for name, compress in COMPRESSORS.items():
+        # No suffix, detection only uses the magic bytes.
+        file_path = tmp_path / name
+        file_path.write_bytes(compress(data))
+        files[name] = file_path
+    return files
+
+
+@pytest.mark.parametrize("compression", list(COMPRESSORS))
+@pytest.mark.parametrize("read_ahead", [0, 2])
+def test_open_lines(flight_files, compression, read_ahead):
+    lines = list(
+        open_lines(flight_files[compression], block_size=64, read_ahead=read_ahead)
+    )
+    assert lines == FLIGHT.splitlines(keepends=True)
+
+
+def test_detect_compression(flight_files):
+    for name, file_path in flight_files.items():
+        expected = None if name == "plain" else name
+        assert detect_compression(file_path.read_bytes()[:6]) == expected
+
+
+def test_decompressing_stream_without_peek():
+    raw = io.BytesIO(gzip.compress(b"a\nb\n"))
+    assert decompressing_stream(raw).read() == b"a\nb\n"
+
+
+def test_zstd():
+    zstandard = pytest.importorskip("zstandard")
+    data = zstandard.ZstdCompressor().compress(FLIGHT.encode("utf-8"))
+    assert detect_compression(data) == "zstd"
+    assert list(open_lines(io.BytesIO(data))) == FLIGHT.splitlines(keepends=True)
+
+
+def test_iter_lines_split_blocks():
+    blocks = [b"ab", b"c\nde", b"f", b"\r\ngh\n", b"no newline"]
+    assert list(iter_lines(blocks)) == ["abc\n", "def\r\n", "gh\n", "no newline"]
+
+
+def test_chunk_iterator_from_compressed(flight_files):
+    chunks = list(ChunkIterator(open_lines(flight_files["gzip"]), "flight"))
+    assert chunks[0].count == 2
+    assert chunks[0].text.startswith("DP D/A")
+
+
+def test_read_ahead_error():
+    def failing():
+        yield 1
+        raise ValueError("bad block")
+
+    reader = ReadAheadIterator(failing())
+    assert next(reader) == 1
+    with pytest.raises(ValueError):
+        next(reader)
+    with pytest.raises(StopIteration):
+        next(reader)
+
+
+def test_read_ahead_close_early():
+    with ReadAheadIterator(iter(range(1000)), max_items=2) as reader:
+        assert next(reader) == 0
+    assert not reader.thread.is_alive()
@@ -0,0 +1,79 @@
+# pylint: disable=missing-docstring
+from io import StringIO
+from pathlib import Path
+from typing import List
+
+import pytest
+from tests.text_chunk_parser.examples.json_dict import (
+    JSON_DICT,
+    JsonParseSchema,
+    JsonResultHandler,
+)
+
+from pfmsoft.text_chunk_parser import (
+    ChunkIterator,
+    Parser,
+    ParseResult,
+    SpillingResultHandler,
+)
+
+REPEATS = 20
+
+
+def chunks() -> ChunkIterator:
+    return ChunkIterator(StringIO(JSON_DICT * REPEATS), "json", chunk_filter=None)
+
+
+def expected_results() -> List[ParseResult]:
+    results: List[ParseResult] = []
+    Parser(JsonParseSchema(), retain="line_only").parse(
+        JsonResultHandler(results), chunks()
+    )
+    return results
+
+
+def summary(results):
+    return [(r.chunk.count, r.chunk.text, r.new_state, r.data) for r in results]
+
+
+def test_spills_by_record_count(tmp_path: Path):
+    schema = JsonParseSchema()
+    with SpillingResultHandler(max_records=25, spill_dir=tmp_path) as handler:
+        Parser(schema, retain="line_only").parse(handler, chunks())
+        total = len(JSON_DICT.splitlines()) * REPEATS
+        assert len(handler) == total
+        assert handler.spills == total // 25
+        assert len(handler.batch) == total % 25
+        results = list(handler.results())
+        assert summary(results) == summary(expected_results())
+        # Results keep the schema's parser objects, and read back twice.
+        parsers = {id(parser) for state in schema.schema.values() for parser in state}
+        assert {id(result.parser) for result in results} <= parsers
+        assert len(list(handler.results())) == total
+    assert len(handler) == 0
+    assert not list(tmp_path.iterdir())
+
+
+def test_spills_by_bytes():
+    with SpillingResultHandler(max_bytes=4096, sample_size=8) as handler:
+        Parser(JsonParseSchema(), retain="line_only").parse(handler, chunks())
+        assert handler.spills > 1
+        assert summary(handler.results()) == summary(expected_results())
+
+
+def test_keep_filters_results():
+    class KeyValues(SpillingResultHandler):
+        def keep(self, parse_result):
+            return parse_result if parse_result.new_state == "key_value" else None
+
+    with KeyValues(max_records=5) as handler:
+        Parser(JsonParseSchema(), retain="none").parse(handler, chunks())
+        assert len(handler) == 3 * REPEATS
+        assert all(r.new_state == "key_value" for r in handler.results())
+
+
+def test_bad_budget():
+    with pytest.raises(ValueError):
+        SpillingResultHandler(max_records=0)
+    with pytest.raises(ValueError):
+        SpillingResultHandler(max_bytes=0)
@@ -0,0 +1,74 @@
+# pylint: disable=missing-docstring
+from io import StringIO
+from typing import Dict, List
+
+from tests.text_chunk_parser.examples.json_dict import JsonResultHandler
+
+from pfmsoft.text_chunk_parser import (
+    Chunk,
+    ChunkIterator,
+    ChunkParser,
+    Parser,
+    ParseResult,
+    ParseSchema,
+)
+from pfmsoft.text_chunk_parser.string_pool import StringPool
+
+
+class FirstTokenLine(ChunkParser):
+    """Builds a new string for each state and value, as a regex group would."""
+
+    def parse(
+        self,
+        chunk: Chunk,
+        state: str,
+        parse_hints: Dict | None = None,
+    ) -> ParseResult:
+        token = chunk.text.split()[0]
+        new_state = "".join(["st", "ate"])
+        return ParseResult(
+            new_state, {"token": self.intern(token, parse_hints)}, self, chunk
+        )
+
+
+class FirstTokenSchema(ParseSchema):
+    def expected(self, state: str):
+        return [FirstTokenLine()]
+
+
+def parse_tokens(parser: Parser) -> List[ParseResult]:
+    results: List[ParseResult] = []
+    with JsonResultHandler(results) as handler:
+        parser.parse(handler, ChunkIterator(StringIO("DFW 1\nDFW 2\nDFW 3\n")))
+    return results
+
+
+def test_string_pool():
+    pool = StringPool()
+    first, second = "".join(["D", "FW"]), "".join(["DF", "W"])
+    assert pool.intern(first) is first
+    assert pool.intern(second) is first
+    assert pool.encode("SFO") == 0
+    assert pool.encode(second) == 1
+    assert pool.encode("SFO") == 0
+    assert pool.decode(1) is first
+    assert pool.values == ["SFO", "DFW"]
+    assert "DFW" in pool
+    assert len(pool) == 2
+
+
+def test_parser_interns_states_and_values():
+    results = parse_tokens(Parser(FirstTokenSchema()))
+    assert results[0].new_state is results[2].new_state
+    assert results[0].data["token"] is results[2].data["token"]
+
+
+def test_parser_intern_states_off():
+    results = parse_tokens(Parser(FirstTokenSchema(), intern_states=False))
+    assert results[0].new_state == results[2].new_state
+    assert results[0].new_state is not results[2].new_state
+
+
+def test_intern_without_pool():
+    value = "".join(["D", "FW"])
+    assert FirstTokenLine().intern(value, None) is value
@@ -0,0 +1,94 @@
+# pylint: disable=missing-docstring
+import pickle
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from importlib import resources
+from io import StringIO
+from typing import List, Tuple
+
+import pytest
+from tests.text_chunk_parser.examples.json_dict import (
+    JSON_DICT,
+    JsonParseSchema,
+    JsonResultHandler,
+)
+
+from pfmsoft.text_chunk_parser import ChunkIterator, NestedParseSchema, Parser
+from pfmsoft.text_chunk_parser.declarative_schema import load_schema
+
+SCHEMA_RESOURCES = "tests.text_chunk_parser.resources.example.schema_resources"
+FILES = 200
+
+
+@pytest.fixture(name="fast_switching")
+def fast_switching_():
+    # Switch threads often, so parses interleave within a chunk.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def make_text(index: int) -> str:
+    """A JSON dict with its own values, so mixed up results are noticed."""
+    return JSON_DICT.replace("Engineer", f"Engineer {index}").replace(
+        "Quirm Memorial", f"Quirm Memorial {index}"
+    )
+
+
+def parse_text(parser: Parser, index: int) -> Tuple[str, List]:
+    results: List = []
+    with JsonResultHandler(results) as handler:
+        chunks = ChunkIterator(StringIO(make_text(index)), f"file {index}")
+        state = parser.parse(handler, chunks)
+    return state, [(x.chunk.source, x.new_state, x.data) for x in results]
+
+
+def schemas():
+    with resources.as_file(
+        resources.files(SCHEMA_RESOURCES) / "json_dict.yaml"
+    ) as path:
+        compiled = load_schema(path)
+    return {
+        "hand_written": JsonParseSchema(),
+        "compiled": compiled,
+        "nested": NestedParseSchema({"json": compiled}, root="json"),
+    }
+
+
+@pytest.mark.usefixtures("fast_switching")
+@pytest.mark.parametrize("name", ["hand_written", "compiled", "nested"])
+def test_one_parser_many_threads(name):
+    parser = Parser(schemas()[name], slow_threshold=0)
+    expected = [parse_text(parser, index) for index in range(FILES)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(
+            executor.map(lambda index: parse_text(parser, index), range(FILES))
+        )
+    assert results == expected
+
+
+def test_slow_parses_are_per_thread():
+    parser = Parser(JsonParseSchema(), slow_threshold=0)
+    parse_text(parser, 0)
+    main_slow = parser.slow_parses
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        thread_slow = executor.submit(
+            lambda: (parse_text(parser, 1), parser.slow_parses)[1]
+        ).result()
+    assert parser.slow_parses is main_slow
+    assert {slow.source for slow in main_slow} == {"file 0"}
+    assert {slow.source for slow in thread_slow} == {"file 1"}
+
+
+def test_compiled_schema_is_immutable():
+    compiled = schemas()["compiled"]
+    with pytest.raises(AttributeError):
+        compiled.states = {}
+    with pytest.raises(TypeError):
+        compiled.states["origin"] = ()  # type: ignore
+    with pytest.raises(TypeError):
+        compiled.parsers["new"] = compiled.parsers["empty_line"]  # type: ignore
+    copied = pickle.loads(pickle.dumps(compiled))
+    assert list(copied.states) == list(compiled.states)
+    assert copied.state_index == compiled.state_index
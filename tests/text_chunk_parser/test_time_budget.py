@@ -0,0 +1,260 @@
+# pylint: disable=missing-docstring
+import re
+import signal
+import threading
+import time
+from io import StringIO
+from typing import List
+
+import pytest
+from tests.text_chunk_parser.examples.json_dict import JsonResultHandler
+
+from pfmsoft.text_chunk_parser import (
+    AllFailedToParseException,
+    ChunkIterator,
+    ChunkParser,
+    MultiParser,
+    Parser,
+    ParseResult,
+    ParseSchema,
+    compile_schema,
+)
+from pfmsoft.text_chunk_parser.chunk_parser import ParseTimeoutException, _ParseTimer
+from pfmsoft.text_chunk_parser.regex_lint import lint_parsers, nested_quantifiers
+
+# Backtracks for a very long time on a run of "a" that does not end the line.
+PATHOLOGICAL = r"^(a+)+$"
+TEXT = "ok\n" + "a" * 40 + "b\n" + "ok\n"
+
+
+class Line(ChunkParser):
+    def __init__(self, regex: str) -> None:
+        self.pattern = re.compile(regex)
+
+    def parse(self, chunk, state, parse_hints=None) -> ParseResult:
+        self.regex_match_or_fail(self.pattern, chunk, state)
+        return ParseResult("line", {}, self, chunk)
+
+    def __repr__(self):
+        return f"Line({self.pattern.pattern!r})"
+
+
+class Schema(ParseSchema):
+    def __init__(self, *parsers: ChunkParser) -> None:
+        self.parsers = parsers
+
+    def expected(self, state: str):
+        return self.parsers
+
+
+def parse(parser: Parser) -> List[ParseResult]:
+    results: List[ParseResult] = []
+    parser.parse(JsonResultHandler(results), ChunkIterator(StringIO(TEXT), "text"))
+    return results
+
+
+def test_time_budget_interrupts_backtracking():
+    slow = Line(PATHOLOGICAL)
+    parser = Parser(Schema(slow, Line(r"^.*\n$")), time_budget=0.05)
+    results = parse(parser)
+    # The slow parser timed out on line 2, and the catch all parsed it.
+    assert [result.parser for result in results] == [parser.schema.parsers[1]] * 3
+    assert len(parser.slow_parses) == 1
+    slow_parse = parser.slow_parses[0]
+    assert slow_parse.timed_out
+    assert slow_parse.count == 2
+    assert slow_parse.parser is slow
+    assert slow_parse.seconds < 1
+    assert "line 2" in parser.slow_report()
+
+
+def test_parser_budget_overrides():
+    slow = Line(PATHOLOGICAL)
+    slow.time_budget = 0.02
+    parser = Parser(Schema(slow, Line("^ok")), slow_threshold=10)
+    with pytest.raises(AllFailedToParseException) as exc_info:
+        parse(parser)
+    assert "time budget" in str(exc_info.value)
+
+
+def test_slow_threshold_only():
+    parser = Parser(Schema(Line(r"^.*\n$")), slow_threshold=0)
+    parse(parser)
+    assert [slow.count for slow in parser.slow_parses] == [1, 2, 3]
+    assert not any(slow.timed_out for slow in parser.slow_parses)
+
+
+def test_untimed_off_main_thread():
+    parser = Parser(Schema(Line(r"^.*\n$")), time_budget=1)
+    results = []
+    thread = threading.Thread(target=lambda: results.extend(parse(parser)))
+    thread.start()
+    thread.join()
+    assert len(results) == 3
+
+
+class Sleep(ChunkParser):
+    def parse(self, chunk, state, parse_hints=None) -> ParseResult:
+        time.sleep(0.05)
+        return ParseResult("line", {}, self, chunk)
+
+
+def test_zero_parser_budget_is_not_unset():
+    sleep = Sleep()
+    sleep.time_budget = 0
+    parser = Parser(Schema(sleep, Line("^")), time_budget=10, budget_tick=0.005)
+    results = parse(parser)
+    assert all(result.parser is not sleep for result in results)
+    assert all(slow.timed_out for slow in parser.slow_parses)
+
+
+class AlarmHandler(ChunkParser):
+    """Records the SIGALRM handler during each attempt."""
+
+    def __init__(self) -> None:
+        self.handlers: List = []
+
+    def parse(self, chunk, state, parse_hints=None) -> ParseResult:
+        self.handlers.append(signal.getsignal(signal.SIGALRM))
+        return ParseResult("line", {}, self, chunk)
+
+
+@pytest.fixture(name="application_alarm")
+def fixture_application_alarm():
+    """An application alarm in 100s, with a handler that records it firing."""
+    fired = []
+
+    def handler(*args):
+        fired.append(args)
+
+    previous = signal.signal(signal.SIGALRM, handler)
+    signal.setitimer(signal.ITIMER_REAL, 100)
+    try:
+        yield handler, fired
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def test_no_alarm_without_a_budget(application_alarm):
+    handler, fired = application_alarm
+    alarm = AlarmHandler()
+    parse(Parser(Schema(alarm), slow_threshold=1.0, budget_tick=0.001))
+    assert alarm.handlers == [handler] * 3
+    assert not fired
+    assert signal.getitimer(signal.ITIMER_REAL)[0] > 99
+
+
+def test_application_alarm_is_kept(application_alarm):
+    handler, fired = application_alarm
+    alarm = AlarmHandler()
+    parse(Parser(Schema(Sleep(), alarm), time_budget=0.01, budget_tick=0.001))
+    assert handler not in alarm.handlers
+    # The ticks were not passed on, and what is left of the alarm is restored.
+    assert not fired
+    assert signal.getsignal(signal.SIGALRM) is handler
+    assert 99 < signal.getitimer(signal.ITIMER_REAL)[0] < 100
+
+
+def test_application_alarm_fires_during_a_parse():
+    def handler(*args):
+        raise TimeoutError("job watchdog fired")
+
+    previous = signal.signal(signal.SIGALRM, handler)
+    signal.setitimer(signal.ITIMER_REAL, 0.02)
+    try:
+        parser = Parser(Schema(Sleep()), time_budget=10, budget_tick=0.005)
+        with pytest.raises(TimeoutError):
+            parse(parser)
+        assert signal.getsignal(signal.SIGALRM) is handler
+        assert signal.getitimer(signal.ITIMER_REAL)[0] == 0
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def test_nested_timers_keep_their_budgets():
+    slow = Line(PATHOLOGICAL)
+    first = Parser(Schema(Line("^")), time_budget=10, budget_tick=0.005)
+    second = Parser(Schema(slow, Line("^")), time_budget=0.05)
+    handler = signal.getsignal(signal.SIGALRM)
+    multi = MultiParser([first, second])
+    states = multi.parse(
+        [JsonResultHandler([]), JsonResultHandler([])],
+        ChunkIterator(StringIO(TEXT), "text"),
+    )
+    assert states == ["line", "line"]
+    assert [slow_parse.parser for slow_parse in second.slow_parses] == [slow]
+    assert signal.getsignal(signal.SIGALRM) is handler
+    assert signal.getitimer(signal.ITIMER_REAL)[0] == 0
+
+
+def test_timeout_while_stopping_the_timer(monkeypatch):
+    stop = _ParseTimer.stop
+    fired = []
+
+    def interrupted_stop(timer):
+        if not fired:
+            # As if the alarm fired after the attempt, before the timer stopped.
+            fired.append(True)
+            timer.deadline = None
+            raise ParseTimeoutException("Parse attempt ran over its time budget.")
+        return stop(timer)
+
+    monkeypatch.setattr(_ParseTimer, "stop", interrupted_stop)
+    parser = Parser(Schema(Line("^ok"), Line("^")), time_budget=10)
+    results = parse(parser)
+    assert [result.parser for result in results] == [
+        parser.schema.parsers[1],
+        parser.schema.parsers[1],
+        parser.schema.parsers[0],
+    ]
+    assert [slow.count for slow in parser.slow_parses] == [1]
+    assert parser.slow_parses[0].timed_out
+
+
+def test_timeout_while_starting_the_timer(monkeypatch):
+    start = _ParseTimer.start
+
+    def interrupted_start(timer, budget):
+        start(timer, budget)
+        if budget == 0:
+            # As if the alarm fired straight after the zero budget was set.
+            timer.deadline = None
+            raise ParseTimeoutException("Parse attempt ran over its time budget.")
+
+    monkeypatch.setattr(_ParseTimer, "start", interrupted_start)
+    first = Line("^")
+    first.time_budget = 0
+    parser = Parser(Schema(first, Line("^")), time_budget=10)
+    results = parse(parser)
+    assert [result.parser for result in results] == [parser.schema.parsers[1]] * 3
+    assert all(slow.timed_out for slow in parser.slow_parses)
+
+
+@pytest.mark.parametrize(
+    "pattern,nested",
+    [
+        (r"^(a+)+$", 1),
+        (r"^(\w+\s?)*$", 1),
+        (r"^(?:(?:ab)*c)+", 1),
+        (r"^(a|b+)*", 1),
+        (r"^\s*(?P<key>[\w\s]+):\s*(?P<value>\d+)?$", 0),
+        (r"^(ab)?c+", 0),
+        (rb"^(a+)+$", 1),
+    ],
+)
+def test_nested_quantifiers(pattern, nested):
+    assert len(nested_quantifiers(pattern)) == nested
+
+
+def test_compile_schema_lint(caplog):
+    schema = compile_schema(
+        {
+            "parsers": {"bad": {"regex": PATHOLOGICAL}, "good": {"regex": "^ok"}},
+            "states": {"origin": ["bad", "good"]},
+        }
+    )
+    assert [parser.name for parser, _ in schema.lint_findings] == ["bad"]
+    assert "backtrack" in caplog.text
+    assert lint_parsers([Line("^ok")]) == []
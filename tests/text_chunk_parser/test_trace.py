@@ -0,0 +1,131 @@
+# pylint: disable=missing-docstring
+import gc
+import logging
+import weakref
+from io import BytesIO, StringIO
+from pathlib import Path
+
+import pytest
+from tests.text_chunk_parser.examples.json_dict import (
+    JSON_DICT,
+    JsonParseSchema,
+    JsonResultHandler,
+)
+
+from pfmsoft.text_chunk_parser import ChunkIterator, Parser
+from pfmsoft.text_chunk_parser.trace import (
+    ByWinsStrategy,
+    MoveToFrontStrategy,
+    Trace,
+    TraceWriter,
+    iter_trace,
+    main,
+    read_trace,
+    replay,
+)
+
+
+def trace_parse(path: Path) -> Trace:
+    with TraceWriter(path) as trace:
+        Parser(JsonParseSchema(), trace=trace).parse(
+            JsonResultHandler([]),
+            ChunkIterator(StringIO(JSON_DICT), "json", chunk_filter=None),
+        )
+    return read_trace(path)
+
+
+def test_trace_round_trip(tmp_path: Path):
+    trace = trace_parse(tmp_path / "parse.trace")
+    assert [record.count for record in trace.records] == list(
+        range(1, len(JSON_DICT.splitlines()) + 1)
+    )
+    assert trace.states[0] == "origin"
+    for record in trace.records:
+        candidates = trace.candidates[record.candidates]
+        assert 0 <= record.winner < len(candidates)
+        # Parsers are tried in order, up to the winner.
+        assert len(record.nanoseconds) == record.winner + 1
+        assert all(nanoseconds >= 0 for nanoseconds in record.nanoseconds)
+    origin = JsonParseSchema().expected("origin")
+    assert set(trace.parsers) >= {repr(parser) for parser in origin}
+
+
+def test_replay_recorded_order(tmp_path: Path):
+    trace = trace_parse(tmp_path / "parse.trace")
+    report = replay(trace)
+    assert report.chunks == len(trace.records)
+    assert report.attempts == sum(len(record.nanoseconds) for record in trace.records)
+    assert report.nanoseconds == sum(map(sum, (r.nanoseconds for r in trace.records)))
+    assert report.estimated_attempts == 0
+
+
+def test_replay_strategies(tmp_path: Path):
+    trace = trace_parse(tmp_path / "parse.trace")
+    recorded = replay(trace)
+    by_wins = replay(trace, ByWinsStrategy(trace))
+    assert by_wins.chunks == recorded.chunks
+    assert by_wins.attempts <= recorded.attempts
+    assert by_wins.wins == recorded.wins
+    assert replay(trace, MoveToFrontStrategy()).chunks == recorded.chunks
+
+
+def test_failed_chunk_and_file_object():
+    buffer = BytesIO()
+    writer = TraceWriter(buffer)
+    parsers = ("first", "second")
+    writer.record(1, "origin", parsers, [10, 20], 1)
+    writer.record(2, "origin", parsers, [10, 20], -1)
+    writer.close()
+    buffer.seek(0)
+    trace = Trace()
+    trace.records = list(iter_trace(buffer, trace))
+    assert trace.parsers == ["'first'", "'second'"]
+    assert [record.winner for record in trace.records] == [1, -1]
+    report = replay(trace)
+    assert report.attempts == 4
+    assert dict(report.wins["origin"]) == {1: 1}
+
+
+def test_bad_trace():
+    with pytest.raises(ValueError):
+        list(iter_trace(BytesIO(b"not a trace"), Trace()))
+
+
+def test_main(tmp_path: Path, capsys):
+    trace_parse(tmp_path / "parse.trace")
+    main([str(tmp_path / "parse.trace")])
+    output = capsys.readouterr().out
+    assert "by_wins" in output
+    assert "Busiest states" in output
+
+
+def test_fresh_candidate_lists_are_not_kept():
+    class Candidates(list):
+        pass
+
+    lists = []
+
+    class FreshListSchema(JsonParseSchema):
+        def expected(self, state: str):
+            candidates = Candidates(super().expected(state))
+            lists.append(weakref.ref(candidates))
+            return candidates
+
+    schema = FreshListSchema()
+    sizes = []
+    # Captured log records could keep the lists alive.
+    logging.disable(logging.CRITICAL)
+    try:
+        with TraceWriter(BytesIO()) as writer:
+            for _ in range(5):
+                Parser(schema, trace=writer).parse(
+                    JsonResultHandler([]),
+                    ChunkIterator(StringIO(JSON_DICT), "json", chunk_filter=None),
+                )
+                # pylint: disable=protected-access
+                sizes.append((len(writer._lists), len(writer._parsers)))
+            gc.collect()
+            assert not any(ref() is not None for ref in lists)
+    finally:
+        logging.disable(logging.NOTSET)
+    assert len(set(sizes)) == 1